@@ -19,18 +19,23 @@ from .service import (
     app_lifecycle,
     peer,
     app_usage_reporting,
+    container_state,
     websocket,
     migration,
     portal_controller,
     backup,
     disk,
     telemetry,
+    path_policy,
+    last_access_buffer,
+    prewarm,
 )
 from .service.app_installation.util import (
     write_traefik_dyn_config,
     render_all_docker_compose_templates,
 )
 from .service.app_tools import (
+    load_all_app_metadata,
     docker_shutdown_all_apps,
     scheduled_docker_prune_images,
 )
@@ -38,10 +43,14 @@ from .service.backup import start_backup
 from .service.pairing import make_pairing_code
 from .settings import settings
 from .util.async_util import PeriodicTask, BackgroundTask, CronTask
+from .util.subprocess import executor as subprocess_executor
 from .web import internal, public, protected, management
+from .web.util import RequestMetricsMiddleware
 
 log = logging.getLogger(__name__)
 
+CONTAINER_STATE_STARTUP_TIMEOUT = 10
+
 
 def create_app():
     configure_logging()
@@ -60,6 +69,7 @@ def create_app():
     app.include_router(public.router)
     app.include_router(protected.router)
     app.include_router(management.router)
+    app.add_middleware(RequestMetricsMiddleware)
 
     return app
 
@@ -77,14 +87,29 @@ def configure_logging():
 
 @asynccontextmanager
 async def lifespan(_):
+    docker_settings = settings().apps.docker
+    subprocess_executor.configure(
+        docker_settings.max_concurrent_commands,
+        docker_settings.command_timeout,
+        docker_settings.pull_timeout or None,
+    )
     await database.init_database()
     await identity.init_default_identity()
 
+    await load_all_app_metadata()
     await write_traefik_dyn_config()
     await render_all_docker_compose_templates()
+    await path_policy.compile_all_path_policies()
     await app_installation.login_docker_registries()
     await migration.migrate()
+    # Live before anything reconciles app state, so that it reads from the cache.
+    container_state.container_state_watcher.start()
+    if not await container_state.container_state_watcher.wait_until_live(
+        CONTAINER_STATE_STARTUP_TIMEOUT
+    ):
+        log.warning("container state not available yet, using compose for now")
     await app_installation.reconcile_interrupted_uninstalls()
+    await app_lifecycle.restore_last_access()
     await app_installation.refresh_init_apps()
     await backup.ensure_backup_passphrase()
     try:
@@ -105,6 +130,7 @@ async def lifespan(_):
         t.stop()
     for t in background_tasks:
         await t.wait()
+    await last_access_buffer.flush_last_access()
     await docker_shutdown_all_apps(force=True)
     await database.shutdown_database()
 
@@ -112,8 +138,14 @@ async def lifespan(_):
 def _make_background_tasks() -> List[BackgroundTask]:
     s = settings()
     return [
+        container_state.container_state_watcher,
         app_installation.worker.installation_worker,
-        PeriodicTask(app_lifecycle.control_apps, s.apps.lifecycle.refresh_interval),
+        app_lifecycle.lifecycle_scheduler,
+        app_lifecycle.psi_monitor,
+        PeriodicTask(
+            app_lifecycle.control_memory_pressure, s.apps.lifecycle.refresh_interval
+        ),
+        PeriodicTask(prewarm.prewarm_apps, prewarm.PREWARM_INTERVAL),
         PeriodicTask(peer.update_all_peer_pubkeys, 60),
         CronTask(
             app_usage_reporting.track_currently_installed_apps,
@@ -133,6 +165,9 @@ def _make_background_tasks() -> List[BackgroundTask]:
             max_random_delay=s.services.backup.timing.max_random_delay,
         ),
         PeriodicTask(disk.update_disk_space, 30),
+        PeriodicTask(
+            last_access_buffer.flush_last_access, last_access_buffer.FLUSH_INTERVAL
+        ),
         websocket.ws_worker,
         PeriodicTask(telemetry.send_telemetry, s.telemetry.send_interval_seconds),
     ]
@@ -172,11 +172,9 @@ async def update_last_access(app: InstalledApp):
     )
     if app.last_access and now - app.last_access < max_update_frequency:
         return
-    from shard_core.database.connection import db_conn
-    from shard_core.database import installed_apps as db_installed_apps
+    from shard_core.service import last_access_buffer
 
-    async with db_conn() as conn:
-        await db_installed_apps.update_last_access(conn, app.name, now)
+    last_access_buffer.record_app_access(app.name, now)
     app.last_access = now
 
 
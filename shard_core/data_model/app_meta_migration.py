@@ -14,8 +14,8 @@ def migrate_1_2_to_1_3(values):
     # becomes idle_for_pause; idle_for_stop stays unset and falls back to the
     # global default. Legacy apps with an aggressive shutdown time now pause at
     # that threshold (low user impact) and stop only at the longer default.
-    # App-repository files are not regenerated — this runs on every read of a
-    # v1.2 app_meta.json.
+    # App-repository files are not regenerated; app_tools.get_app_metadata
+    # writes the migrated app_meta.json back on first read of an installed app.
     lifecycle = values.get("lifecycle") or {}
     if not lifecycle.get("always_on"):
         idle_time_for_shutdown = lifecycle.pop("idle_time_for_shutdown", None)
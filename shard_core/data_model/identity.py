@@ -3,7 +3,7 @@ from typing import Optional
 from email_validator import validate_email, EmailNotValidError
 from pydantic import field_validator, BaseModel, computed_field
 
-from shard_core.service import crypto
+from shard_core.service import crypto, identity_keys
 from shard_core.settings import settings
 
 
@@ -46,14 +46,18 @@ class Identity(BaseModel):
     def short_id(self) -> str:
         return self.id[0:6]
 
+    @property
+    def key_material(self) -> identity_keys.KeyMaterial:
+        return identity_keys.get_key_material(self.id, self.private_key)
+
     @property
     def public_key(self) -> crypto.PublicKey:
-        return crypto.PrivateKey(self.private_key).get_public_key()
+        return self.key_material.public_key
 
     @computed_field
     @property
     def public_key_pem(self) -> str:
-        return self.public_key.to_bytes().decode()
+        return self.key_material.public_key_pem
 
     @computed_field
     @property
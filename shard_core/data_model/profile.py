@@ -1,3 +1,5 @@
+import time
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
@@ -7,9 +9,14 @@ from shard_core.data_model.backend.shard_model import (
     ShardBase,
     ShardSubscriptionSummary,
 )
-from shard_core.database.database import set_value, get_value
+from shard_core.database import database
+from shard_core.database.database import set_value, get_value, set_cache_ttl
 from shard_core.data_model.app_meta import VMSize
 
+STORE_KEY_PROFILE = "profile"
+# only ever changed by set_profile, which writes through the cache
+set_cache_ttl(STORE_KEY_PROFILE, None)
+
 
 class Profile(BaseModel):
     vm_id: str
@@ -47,10 +54,51 @@ class Profile(BaseModel):
         )
 
 
+@dataclass(frozen=True)
+class _CachedProfile:
+    profile: Profile | None
+    # monotonic time of the controller fetch, None if only read from the store
+    fetched_at: float | None
+    kv_generation: int
+
+
+# The validated profile, so that reading it is an attribute access instead of a
+# deep copy and validation of the stored value.
+_cached: _CachedProfile | None = None
+
+
+def _get_cached() -> _CachedProfile | None:
+    if _cached is None or _cached.kv_generation != database.kv_cache.generation:
+        return None
+    return _cached
+
+
+def _remember(profile: Profile | None, fetched_at: float | None):
+    global _cached
+    _cached = _CachedProfile(profile, fetched_at, database.kv_cache.generation)
+
+
 async def set_profile(profile: Profile | None):
-    await set_value("profile", profile.model_dump() if profile else "None")
+    """Store a profile freshly fetched from the controller."""
+    await set_value(STORE_KEY_PROFILE, profile.model_dump() if profile else "None")
+    _remember(profile, fetched_at=time.monotonic())
 
 
 async def get_profile() -> Profile | None:
-    value = await get_value("profile")
-    return None if value == "None" else Profile.model_validate(value)
+    """The last known profile. Raises KeyError if it was never fetched."""
+    if cached := _get_cached():
+        return cached.profile
+    version = database.kv_cache.version(STORE_KEY_PROFILE)
+    value = await get_value(STORE_KEY_PROFILE)
+    profile = None if value == "None" else Profile.model_validate(value)
+    if version == database.kv_cache.version(STORE_KEY_PROFILE):
+        _remember(profile, fetched_at=None)
+    return profile
+
+
+def profile_age() -> float | None:
+    """Seconds since the profile was fetched, None if unknown or not fetched by this process."""
+    cached = _get_cached()
+    if cached is None or cached.fetched_at is None:
+        return None
+    return time.monotonic() - cached.fetched_at
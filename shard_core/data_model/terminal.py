@@ -41,10 +41,8 @@ class InputTerminal(BaseModel):
 
 @on_terminal_auth.connect
 async def update_terminal_last_connection(terminal: Terminal):
-    from shard_core.database.connection import db_conn
-    from shard_core.database import terminals as db_terminals
+    from shard_core.service import last_access_buffer
 
-    async with db_conn() as conn:
-        await db_terminals.update(
-            conn, terminal.id, {"last_connection": datetime.now(timezone.utc)}
-        )
+    last_access_buffer.record_terminal_connection(
+        terminal.id, datetime.now(timezone.utc)
+    )
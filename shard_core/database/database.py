@@ -6,7 +6,8 @@ The main database access pattern is:
 
 This module provides init/shutdown lifecycle functions and convenience wrappers
 for the kv_store that handle connection management internally (for callers that
-only need a single kv operation).
+only need a single kv operation). The wrappers read and write through an
+in-process cache, see kv_cache.
 """
 
 import logging
@@ -20,9 +21,12 @@ from shard_core.database.migration import migrate
 from shard_core.database.tinydb_migration import migrate_tinydb_data
 from shard_core.database.db_snapshot import restore_db_snapshot
 from shard_core.database import kv_store
+from shard_core.database.kv_cache import KvCache, MISS
 
 log = logging.getLogger(__name__)
 
+kv_cache = KvCache(default_ttl=300)
+
 
 async def init_database():
     """Run migrations and open the connection pool.
@@ -33,26 +37,46 @@ async def init_database():
     await make_and_open_connection_pool()
     await migrate_tinydb_data()
     await restore_db_snapshot()
+    kv_cache.clear()
     log.info("database initialized")
 
 
 async def shutdown_database():
     """Close the connection pool. Call during app shutdown."""
     await close_connection_pool()
+    kv_cache.clear()
     log.info("database shut down")
 
 
 # Convenience wrappers for kv_store (used by callers that don't need a conn for anything else)
 async def get_value(key: str):
+    value = kv_cache.get(key)
+    if value is not MISS:
+        return value
+    version = kv_cache.version(key)
     async with db_conn() as conn:
-        return await kv_store.get_value(conn, key)
+        try:
+            value = await kv_store.get_value(conn, key)
+        except KeyError:
+            kv_cache.put_missing(key, version)
+            raise
+    kv_cache.put(key, value, version)
+    return value
 
 
 async def set_value(key: str, value):
     async with db_conn() as conn:
         await kv_store.set_value(conn, key, value)
+    kv_cache.write(key, value)
 
 
 async def remove_value(key: str) -> bool:
     async with db_conn() as conn:
-        return await kv_store.remove_value(conn, key)
+        removed = await kv_store.remove_value(conn, key)
+    kv_cache.remove(key)
+    return removed
+
+
+def set_cache_ttl(key: str, ttl: float | None):
+    """Override how long a kv_store key is cached, see KvCache.set_ttl."""
+    kv_cache.set_ttl(key, ttl)
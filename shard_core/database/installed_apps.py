@@ -48,6 +48,18 @@ async def update_last_access(
         return await cur.fetchone()
 
 
+async def update_last_access_many(
+    conn: AsyncConnection, last_access: dict[str, datetime]
+):
+    sql: LiteralString = """UPDATE installed_apps SET last_access = v.last_access
+        FROM unnest(%(names)s::text[], %(last_access)s::timestamptz[]) AS v(name, last_access)
+        WHERE installed_apps.name = v.name"""
+    await conn.execute(
+        sql,
+        {"names": list(last_access.keys()), "last_access": list(last_access.values())},
+    )
+
+
 async def contains(conn: AsyncConnection, name: str) -> bool:
     sql: LiteralString = "SELECT 1 FROM installed_apps WHERE name = %s"
     async with conn.cursor() as cur:
@@ -0,0 +1,102 @@
+"""In-process cache for kv_store values.
+
+The kv_store holds values that change a few times a year (profile, secrets,
+flags) but are read on every request. database.get_value reads through this
+cache and database.set_value/remove_value write through it, so a cached value
+is never older than the last write made by this process. The per-key TTL only
+bounds how long a value written by something else can go unnoticed.
+"""
+
+import copy
+import json
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from shard_core.database.kv_store import _DateTimeEncoder
+
+# stands in for a key known to be absent from kv_store
+_MISSING = object()
+# returned by KvCache.get when the database has to be asked
+MISS = object()
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float | None
+
+
+class KvCache:
+    def __init__(self, default_ttl: float | None):
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        # bumped by clear(), so values derived from cached entries can tell
+        # that the database may have been replaced underneath them
+        self.generation = 0
+        self._ttls: dict[str, float | None] = {}
+        self._entries: dict[str, _Entry] = {}
+        self._versions: dict[str, int] = {}
+
+    def set_ttl(self, key: str, ttl: float | None):
+        """Set the TTL of one key in seconds. None caches until the next write, 0 disables caching."""
+        self._ttls[key] = ttl
+        self._entries.pop(key, None)
+
+    def get(self, key: str):
+        """Return the cached value, raise KeyError for a cached absence, or return MISS."""
+        entry = self._entries.get(key)
+        if entry is None or (
+            entry.expires_at is not None and entry.expires_at < time.monotonic()
+        ):
+            self.misses += 1
+            return MISS
+        self.hits += 1
+        if entry.value is _MISSING:
+            raise KeyError(key)
+        return copy.deepcopy(entry.value)
+
+    def version(self, key: str) -> int:
+        return self._versions.get(key, 0)
+
+    def put(self, key: str, value, version: int | None = None):
+        """Cache a value as stored in the database.
+
+        A read-through passes the version it saw before querying, so a write that
+        landed in between is not overwritten with the older value it read.
+        """
+        if version is not None and version != self.version(key):
+            return
+        ttl = self._ttls.get(key, self.default_ttl)
+        if ttl == 0:
+            return
+        self._entries[key] = _Entry(
+            value=_as_stored(value),
+            expires_at=None if ttl is None else time.monotonic() + ttl,
+        )
+
+    def put_missing(self, key: str, version: int | None = None):
+        self.put(key, _MISSING, version)
+
+    def write(self, key: str, value):
+        self._versions[key] = self.version(key) + 1
+        self.put(key, value)
+
+    def remove(self, key: str):
+        self._versions[key] = self.version(key) + 1
+        self.put_missing(key)
+
+    def clear(self):
+        self._entries.clear()
+        self.generation += 1
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+def _as_stored(value):
+    """Normalize a value the way a round trip through the JSONB column would."""
+    if value is _MISSING:
+        return value
+    return json.loads(json.dumps(value, cls=_DateTimeEncoder))
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import LiteralString
 
 from psycopg import AsyncConnection
@@ -54,6 +55,21 @@ async def update(conn: AsyncConnection, id: str, data: dict) -> dict | None:
         return await cur.fetchone()
 
 
+async def update_last_connection_many(
+    conn: AsyncConnection, last_connection: dict[str, datetime]
+):
+    sql: LiteralString = """UPDATE terminals SET last_connection = v.last_connection
+        FROM unnest(%(ids)s::text[], %(last_connection)s::timestamptz[]) AS v(id, last_connection)
+        WHERE terminals.id = v.id"""
+    await conn.execute(
+        sql,
+        {
+            "ids": list(last_connection.keys()),
+            "last_connection": list(last_connection.values()),
+        },
+    )
+
+
 async def remove(conn: AsyncConnection, id: str):
     sql: LiteralString = "DELETE FROM terminals WHERE id = %s"
     await conn.execute(sql, (id,))
@@ -9,7 +9,12 @@ from shard_core.data_model.app_meta import InstallationReason, InstalledApp, Sta
 from shard_core.util import signals
 from shard_core.settings import settings
 from shard_core.service.app_tools import get_installed_apps_path
-from shard_core.util.subprocess import subprocess, SubprocessError
+from shard_core.util.subprocess import (
+    Priority,
+    SubprocessError,
+    priority as subprocess_priority,
+    subprocess,
+)
 from . import util, worker
 from .exceptions import AppAlreadyInstalled, AppDoesNotExist, AppNotInstalled
 
@@ -152,9 +157,10 @@ async def login_docker_registries():
     registries = settings().apps.registries
     for r in registries:
         try:
-            await subprocess(
-                "docker", "login", "-u", r.username, "-p", r.password, r.uri
-            )
+            with subprocess_priority(Priority.MAINTENANCE):
+                await subprocess(
+                    "docker", "login", "-u", r.username, "-p", r.password, r.uri
+                )
         except (SubprocessError, OSError) as e:
             log.error(f"could not log in to registry {r.uri}: {e}")
         else:
@@ -21,6 +21,7 @@ from shard_core.service.app_tools import (
 )
 from shard_core.settings import settings
 from shard_core.util import signals
+from shard_core.util.subprocess import Priority, priority as subprocess_priority
 from .app_zip import extract_app_zip
 from .exceptions import AppDoesNotExist
 from .util import (
@@ -51,6 +52,10 @@ class InstallationWorker:
         self.current_task = None
         self._task = None
 
+    @property
+    def queued(self) -> int:
+        return self._task_queue.qsize()
+
     def enqueue(self, task: InstallationTask):
         self._task_queue.put_nowait(task)
         log.debug(f"enqueued {task}, queue size: {self._task_queue.qsize()}")
@@ -72,24 +77,26 @@ class InstallationWorker:
             await self._task
 
     async def _run(self):
-        while True:
-            self.current_task = await self._task_queue.get()
-            log.info(f"processing {self.current_task}")
-            try:
-                if self.current_task.task_type == "install from store":
-                    await _install_app_from_store(self.current_task.app_name)
-                elif self.current_task.task_type == "install from zip":
-                    await _install_app_from_existing_zip(self.current_task.app_name)
-                elif self.current_task.task_type == "uninstall":
-                    await _uninstall_app(self.current_task.app_name)
-                elif self.current_task.task_type == "reinstall":
-                    await _reinstall_app(self.current_task.app_name)
-                log.info(f"finished {self.current_task}")
-            except Exception as e:
-                log.error(f"Error during {self.current_task}: {e}")
-            finally:
-                self._task_queue.task_done()
-                self.current_task = None
+        # installing must not hold up the apps a user is waiting for
+        with subprocess_priority(Priority.MAINTENANCE):
+            while True:
+                self.current_task = await self._task_queue.get()
+                log.info(f"processing {self.current_task}")
+                try:
+                    if self.current_task.task_type == "install from store":
+                        await _install_app_from_store(self.current_task.app_name)
+                    elif self.current_task.task_type == "install from zip":
+                        await _install_app_from_existing_zip(self.current_task.app_name)
+                    elif self.current_task.task_type == "uninstall":
+                        await _uninstall_app(self.current_task.app_name)
+                    elif self.current_task.task_type == "reinstall":
+                        await _reinstall_app(self.current_task.app_name)
+                    log.info(f"finished {self.current_task}")
+                except Exception as e:
+                    log.error(f"Error during {self.current_task}: {e}")
+                finally:
+                    self._task_queue.task_done()
+                    self.current_task = None
 
 
 installation_worker = InstallationWorker()
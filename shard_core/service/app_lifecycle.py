@@ -1,69 +1,162 @@
 import asyncio
+import dataclasses
+import heapq
 import logging
 import time
+from contextlib import suppress
 from typing import Dict, List
 
 from shard_core.database.connection import db_conn
 from shard_core.database import installed_apps as db_installed_apps
-from shard_core.data_model.app_meta import InstalledApp, Status
-from shard_core.service import disk, memory_pressure, pause_metrics
+from shard_core.data_model.app_meta import AppMeta, InstalledApp, Status
+from shard_core.service import cold_start, disk, memory_pressure, pause_metrics
 from shard_core.service.app_tools import (
     start_app,
     docker_stop_app,
     docker_pause_app,
     get_app_metadata,
     size_is_compatible,
+    is_verified_running,
+    MetadataNotFound,
 )
 from shard_core.settings import settings
 from shard_core.util import signals
+from shard_core.util.async_util import BackgroundTask
+from shard_core.util.subprocess import Priority, priority as subprocess_priority
 
 log = logging.getLogger(__name__)
 
 last_access_dict: Dict[str, float] = dict()
+# app name -> until when idling must not pause or stop it, e.g. after a pre-warm
+keep_alive_until: Dict[str, float] = dict()
 background_tasks = set()
+# the candidates and victim of the latest pressure demotion
+last_demotion: dict = {}
 
 # Pressure demotion never touches an app accessed within this window (seconds).
 RECENT_ACCESS_GRACE = 5
 
+# An app start_app saw running within this window (seconds) is not revived again
+# on access; a crash is noticed by the first request after the window.
+RUNNING_VERIFICATION_MAX_AGE = 10
+
+# Restart time assumed for an app whose cold starts were not measured (seconds).
+DEFAULT_UNPAUSE_COST = 1.0
+DEFAULT_START_COST = 10.0
+# Swap freed by stopping an app is worth this fraction of the same amount of RAM.
+SWAP_BENEFIT_WEIGHT = 0.25
+
+# The scheduler acts on deadlines; this full pass over all apps only catches what
+# no deadline covers (always_on apps that went down, state changed out-of-band).
+SAFETY_SWEEP_INTERVAL = 300
+
+# Statuses the lifecycle leaves alone while the installation worker owns the app.
+_INSTALLING_STATUS = (Status.INSTALLATION_QUEUED, Status.INSTALLING)
+
+
+async def restore_last_access():
+    """Seed last_access_dict from installed_apps.last_access after a restart.
+
+    The column is written by last_access_buffer at most every
+    max_update_frequency seconds, so a restored time can be that much early.
+    Without it every app would count as idle since the epoch.
+    """
+    async with db_conn() as conn:
+        all_apps = await db_installed_apps.get_all(conn)
+    restored = 0
+    for app in all_apps:
+        if app["last_access"] is None:
+            continue
+        last_access = app["last_access"].timestamp()
+        if last_access > last_access_dict.get(app["name"], 0.0):
+            last_access_dict[app["name"]] = last_access
+            restored += 1
+    log.debug(f"restored last access of {restored} apps")
+
 
 @signals.on_request_to_app.connect
 async def ensure_app_is_running(app: InstalledApp):
+    global last_access_dict
     if disk.current_disk_usage.disk_space_low:
         return
+    if is_verified_running(app.name, RUNNING_VERIFICATION_MAX_AGE):
+        last_access_dict[app.name] = time.time()
+        return
     app_meta = get_app_metadata(app.name)
     if await size_is_compatible(app_meta.minimum_portal_size):
-        global last_access_dict
         last_access_dict[app.name] = time.time()
+        cold_start.begin(app_meta)
         # One idempotent revive primitive decides unpause vs up from the real
         # container state, so a paused stack unfreezes and an out-of-band exit
         # (crash, OOM, core-upgrade converge) still starts instead of 502-looping.
-        task = asyncio.create_task(
-            start_app(app.name), name=f"ensure {app.name} is running"
-        )
+        with subprocess_priority(Priority.WAKE):
+            task = asyncio.create_task(
+                start_app(app.name), name=f"ensure {app.name} is running"
+            )
         background_tasks.add(task)
         task.add_done_callback(background_tasks.discard)
 
 
 async def control_apps():
+    """Evaluate every app once. Run by the scheduler's safety sweep."""
+    pause_enabled = settings().apps.lifecycle.pause_enabled
+    installed_apps = await _get_controllable_apps()
+    tasks = [_control_app_time(app, pause_enabled) for app in installed_apps]
+    await asyncio.gather(*tasks)
+    await control_memory_pressure(installed_apps)
+
+
+async def control_memory_pressure(installed_apps: List[InstalledApp] = None):
+    """Demote the LRU app while PSI is above the threshold."""
     lifecycle_settings = settings().apps.lifecycle
-    pause_enabled = lifecycle_settings.pause_enabled
-    psi = memory_pressure.read_memory_pressure() if pause_enabled else 0.0
-    pressure_high = pause_enabled and psi > lifecycle_settings.psi_threshold
-    if pause_enabled:
-        pause_metrics.record_psi_snapshot(psi)
+    if not lifecycle_settings.pause_enabled:
+        return
+    psi = memory_pressure.read_memory_pressure()
+    pause_metrics.record_psi_snapshot(psi)
+    # with a PSI trigger registered, the monitor responds to pressure on its own
+    if psi > lifecycle_settings.psi_threshold and not psi_monitor.is_active:
+        log.info(f"memory pressure high (PSI some avg10 = {psi}), demoting LRU app")
+        if installed_apps is None:
+            installed_apps = await _get_controllable_apps()
+        await _demote_lru(installed_apps)
+
 
+async def _get_controllable_apps() -> List[InstalledApp]:
     async with db_conn() as conn:
         all_apps = await db_installed_apps.get_all(conn)
-    installed_apps = [
+    return [
         InstalledApp.model_validate(a)
         for a in all_apps
-        if a["status"] not in (Status.INSTALLATION_QUEUED, Status.INSTALLING)
+        if a["status"] not in _INSTALLING_STATUS
     ]
-    tasks = [_control_app_time(app, pause_enabled) for app in installed_apps]
-    await asyncio.gather(*tasks)
-    if pressure_high:
-        log.info(f"memory pressure high (PSI some avg10 = {psi}), demoting LRU app")
-        await _demote_lru(installed_apps)
+
+
+def _idle_thresholds(app_meta: AppMeta) -> tuple[float, float]:
+    lifecycle_settings = settings().apps.lifecycle
+    t1 = app_meta.lifecycle.idle_for_pause or lifecycle_settings.default_idle_for_pause
+    t2 = app_meta.lifecycle.idle_for_stop or lifecycle_settings.default_idle_for_stop
+    return t1, t2
+
+
+def _next_deadline(
+    app: InstalledApp, app_meta: AppMeta, pause_enabled: bool
+) -> float | None:
+    """When _control_app_time would next act on the app, None if idling never will."""
+    if app_meta.lifecycle.always_on:
+        return None
+    last_access = last_access_dict.get(app.name, 0.0)
+    t1, t2 = _idle_thresholds(app_meta)
+    if not pause_enabled or app_meta.lifecycle.skip_pause:
+        deadline = last_access + t2 if app.status == Status.RUNNING else None
+    elif app.status == Status.RUNNING:
+        deadline = last_access + t1
+    elif app.status == Status.PAUSED:
+        deadline = last_access + t2
+    else:
+        deadline = None
+    if deadline is None:
+        return None
+    return max(deadline, keep_alive_until.get(app.name, 0.0))
 
 
 async def _control_app_time(app: InstalledApp, pause_enabled: bool):
@@ -82,11 +175,11 @@ async def _control_app_time(app: InstalledApp, pause_enabled: bool):
             await start_app(app.name)
         return
 
-    idle = time.time() - last_access_dict.get(app.name, 0.0)
-    t2 = (
-        app_meta.lifecycle.idle_for_stop
-        or settings().apps.lifecycle.default_idle_for_stop
-    )
+    now = time.time()
+    if now < keep_alive_until.get(app.name, 0.0):
+        return
+    idle = now - last_access_dict.get(app.name, 0.0)
+    t1, t2 = _idle_thresholds(app_meta)
 
     # Feature flag off, or app opts out of the pause tier: legacy stop-only.
     if not pause_enabled or app_meta.lifecycle.skip_pause:
@@ -94,49 +187,271 @@ async def _control_app_time(app: InstalledApp, pause_enabled: bool):
             await docker_stop_app(app.name)
         return
 
-    t1 = (
-        app_meta.lifecycle.idle_for_pause
-        or settings().apps.lifecycle.default_idle_for_pause
-    )
     if app.status == Status.RUNNING and idle >= t1:
         await docker_pause_app(app.name)
     elif app.status == Status.PAUSED and idle >= t2:
         await docker_stop_app(app.name)
 
 
-async def _demote_lru(apps: List[InstalledApp]):
-    """Demote the least-recently-used demotable app one tier.
+@dataclasses.dataclass
+class DemotionScore:
+    app_name: str
+    action: str  # "pause" or "stop"
+    benefit_bytes: int | None  # memory freed, None without accounting
+    idle_seconds: float
+    restart_cost_seconds: float
+    score: float
+
+
+async def _demote_lru(apps: List[InstalledApp]) -> bool:
+    """Demote the demotable app with the best score one tier, if there is one.
 
     RUNNING apps are considered first: pausing has less user impact than
     stopping, and paused apps mostly have older last-access times — a single
-    LRU sort across both tiers would systematically stop paused apps instead.
-    Only when nothing is left to pause does the LRU paused app get stopped.
+    sort across both tiers would systematically stop paused apps instead.
+    Only when nothing is left to pause does a paused app get stopped.
+
+    Within a tier, the app whose demotion frees the most memory for the least
+    expected restart time, weighted by how long it has been idle, is chosen
+    (see _score_demotion). Without memory accounting, that is the least
+    recently used app.
 
-    One demotion per control cycle: the next cycle re-reads PSI and demotes
-    again only if pressure is still high, so a spike frees memory gradually
-    instead of stopping everything at once.
+    One demotion per call: the next control cycle, or the PSI monitor after a
+    trigger window, demotes again only if pressure is still high, so a spike
+    frees memory gradually instead of stopping everything at once.
     """
+    now = time.time()
     running = []
     paused = []
     for app in apps:
         app_meta = get_app_metadata(app.name)
         if app_meta.lifecycle.always_on:
             continue
-        if time.time() - last_access_dict.get(app.name, 0.0) <= RECENT_ACCESS_GRACE:
+        if now - last_access_dict.get(app.name, 0.0) <= RECENT_ACCESS_GRACE:
             continue
         if app.status == Status.RUNNING:
-            running.append(app)
+            action = "stop" if app_meta.lifecycle.skip_pause else "pause"
+            running.append(_score_demotion(app.name, app_meta, action, now))
         elif app.status == Status.PAUSED:
-            paused.append(app)
-
-    def lru(candidates: List[InstalledApp]) -> InstalledApp:
-        return min(candidates, key=lambda app: last_access_dict.get(app.name, 0.0))
-
-    if running:
-        victim = lru(running)
-        if get_app_metadata(victim.name).lifecycle.skip_pause:
-            await docker_stop_app(victim.name)
-        else:
-            await docker_pause_app(victim.name)
-    elif paused:
-        await docker_stop_app(lru(paused).name)
+            paused.append(_score_demotion(app.name, app_meta, "stop", now))
+
+    candidates = running or paused
+    if not candidates:
+        return False
+    victim = max(candidates, key=lambda c: (c.score, c.idle_seconds))
+    last_demotion.clear()
+    last_demotion.update(
+        at=now,
+        victim=victim.app_name,
+        candidates=[dataclasses.asdict(c) for c in candidates],
+    )
+    log.info(f"demoting app {victim.app_name}: {victim}")
+    log.debug(f"demotion candidates: {candidates}")
+    if victim.action == "stop":
+        await docker_stop_app(victim.app_name)
+    else:
+        await docker_pause_app(victim.app_name)
+    return True
+
+
+def _score_demotion(
+    app_name: str, app_meta: AppMeta, action: str, now: float
+) -> DemotionScore:
+    usage = memory_pressure.read_stack_memory(app_name)
+    if usage is None:
+        benefit = None
+    elif action == "pause":
+        benefit = usage.current
+    else:
+        benefit = usage.current + int(SWAP_BENEFIT_WEIGHT * usage.swap)
+
+    idle = now - last_access_dict.get(app_name, 0.0)
+    t1, _ = _idle_thresholds(app_meta)
+    # approaches 1 for apps idle much longer than their pause threshold
+    idle_weight = idle / (idle + t1)
+
+    if action == "pause":
+        start_types = (cold_start.UNPAUSE_PREFETCH, cold_start.UNPAUSE)
+        default_cost = DEFAULT_UNPAUSE_COST
+    else:
+        start_types, default_cost = (cold_start.START,), DEFAULT_START_COST
+    measured_ms = next(
+        filter(
+            None,
+            (pause_metrics.get_mean_cold_start_ms(app_name, t) for t in start_types),
+        ),
+        None,
+    )
+    restart_cost = measured_ms / 1000 if measured_ms else default_cost
+
+    return DemotionScore(
+        app_name=app_name,
+        action=action,
+        benefit_bytes=benefit,
+        idle_seconds=idle,
+        restart_cost_seconds=restart_cost,
+        score=(benefit or 0) / 2**20 * idle_weight / max(restart_cost, 0.1),
+    )
+
+
+async def _demote_on_pressure() -> bool:
+    if not settings().apps.lifecycle.pause_enabled:
+        return False
+    return await _demote_lru(await _get_controllable_apps())
+
+
+class LifecycleScheduler(BackgroundTask):
+    """Pauses and stops idle apps when their idle thresholds expire.
+
+    Keeps a min-heap of each app's next deadline and sleeps until the earliest
+    one, so an app is paused on time and a quiet shard does no work at all. An
+    access only moves last_access_dict: when the old deadline comes up, the app
+    is re-evaluated and rescheduled from its new last access. Status changes
+    (on_apps_update) rebuild the heap from the database. A full control_apps
+    pass runs every SAFETY_SWEEP_INTERVAL and whenever disk space runs low.
+    An app whose pause or stop fails is retried after a backoff that doubles
+    with each failure, instead of at its past deadline right away.
+    """
+
+    def __init__(self):
+        self.is_started = False
+        self._task: asyncio.Task | None = None
+        self._heap: list[tuple[float, str]] = []
+        # the valid deadline per app; heap entries not matching it are stale
+        self._deadlines: dict[str, float] = {}
+        # app name -> (consecutive failures, earliest retry)
+        self._failures: dict[str, tuple[int, float]] = {}
+        self._wakeup = asyncio.Event()
+        self._resync_requested = True
+        self._sweep_requested = True
+
+    def start(self):
+        if not self.is_started:
+            self.is_started = True
+            self._wakeup = asyncio.Event()
+            self._resync_requested = True
+            self._sweep_requested = True
+            self._task = asyncio.create_task(self._run(), name="LifecycleScheduler")
+            log.debug("started lifecycle scheduler")
+
+    def stop(self):
+        if self.is_started:
+            self.is_started = False
+            self._task.cancel()
+            log.debug("stopped lifecycle scheduler")
+
+    async def wait(self):
+        with suppress(asyncio.CancelledError):
+            await self._task
+
+    def request_resync(self):
+        self._resync_requested = True
+        self._wakeup.set()
+
+    def request_sweep(self):
+        self._sweep_requested = True
+        self._wakeup.set()
+
+    def next_deadline(self) -> float | None:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    async def _run(self):
+        next_sweep = 0.0
+        while True:
+            # cleared before the work, so that a request made during it is not lost
+            self._wakeup.clear()
+            wake_at = None
+            try:
+                if self._sweep_requested or time.time() >= next_sweep:
+                    self._sweep_requested = False
+                    next_sweep = time.time() + SAFETY_SWEEP_INTERVAL
+                    await control_apps()
+                    self._resync_requested = True
+                if self._resync_requested:
+                    self._resync_requested = False
+                    await self._resync()
+                await self._run_due()
+            except Exception as e:
+                log.error(f"error in lifecycle scheduler: {type(e).__name__}({e})")
+                self._resync_requested = True
+                wake_at = time.time() + settings().apps.lifecycle.refresh_interval
+            for t in (next_sweep, self.next_deadline()):
+                if t is not None and (wake_at is None or t < wake_at):
+                    wake_at = t
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=max(0.0, wake_at - time.time())
+                )
+
+    async def _resync(self):
+        self._heap.clear()
+        self._deadlines.clear()
+        for app in await _get_controllable_apps():
+            self._schedule(app)
+
+    async def _run_due(self):
+        now = time.time()
+        while (deadline := self.next_deadline()) is not None and deadline <= now:
+            _, name = heapq.heappop(self._heap)
+            del self._deadlines[name]
+            async with db_conn() as conn:
+                row = await db_installed_apps.get_by_name(conn, name)
+            if not row or row["status"] in _INSTALLING_STATUS:
+                continue
+            pause_enabled = settings().apps.lifecycle.pause_enabled
+            try:
+                await _control_app_time(InstalledApp.model_validate(row), pause_enabled)
+            except Exception as e:
+                failures = self._failures.get(name, (0, 0.0))[0] + 1
+                backoff = min(
+                    settings().apps.lifecycle.refresh_interval * 2 ** (failures - 1),
+                    SAFETY_SWEEP_INTERVAL,
+                )
+                self._failures[name] = failures, now + backoff
+                log.error(
+                    f"error controlling app {name}, retrying in {backoff}s:"
+                    f" {type(e).__name__}({e})"
+                )
+            else:
+                self._failures.pop(name, None)
+            # not due yet after a recent access, or in its next tier after acting
+            async with db_conn() as conn:
+                row = await db_installed_apps.get_by_name(conn, name)
+            if row and row["status"] not in _INSTALLING_STATUS:
+                self._schedule(InstalledApp.model_validate(row))
+
+    def _schedule(self, app: InstalledApp):
+        try:
+            app_meta = get_app_metadata(app.name)
+        except MetadataNotFound:
+            return
+        pause_enabled = settings().apps.lifecycle.pause_enabled
+        deadline = _next_deadline(app, app_meta, pause_enabled)
+        if deadline is None:
+            self._deadlines.pop(app.name, None)
+            self._failures.pop(app.name, None)
+            return
+        if app.name in self._failures:
+            deadline = max(deadline, self._failures[app.name][1])
+        self._deadlines[app.name] = deadline
+        heapq.heappush(self._heap, (deadline, app.name))
+
+    def _drop_stale(self):
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+
+lifecycle_scheduler = LifecycleScheduler()
+psi_monitor = memory_pressure.PsiMonitor(_demote_on_pressure)
+
+
+@signals.on_apps_update.connect
+async def _reschedule_on_apps_update(_):
+    lifecycle_scheduler.request_resync()
+
+
+@signals.on_disk_usage_update.connect
+def _sweep_on_low_disk(usage: disk.DiskUsage):
+    if usage.disk_space_low:
+        lifecycle_scheduler.request_sweep()
@@ -1,15 +1,24 @@
 import asyncio
 import json
 import logging
+import os
 import time
 from collections import defaultdict
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Literal
 
 import shard_core.data_model.profile
 from shard_core.database.connection import db_conn
 from shard_core.database import installed_apps as db_installed_apps
-from shard_core.service import memory_pressure, pause_metrics
+from shard_core.service import (
+    cold_start,
+    container_runtime,
+    container_state,
+    memory_pressure,
+    pause_metrics,
+)
+from shard_core.service.container_runtime import ContainerRuntimeError
 from shard_core.data_model.app_meta import (
     Status,
     AppMeta,
@@ -19,7 +28,14 @@ from shard_core.data_model.app_meta import (
 from shard_core.settings import settings
 from shard_core.util import signals
 from shard_core.util.misc import throttle
-from shard_core.util.subprocess import subprocess, SubprocessError, app_compose_command
+from shard_core.util.subprocess import (
+    Priority,
+    priority as subprocess_priority,
+    subprocess,
+    SubprocessError,
+    app_compose_command,
+    normalize_project_name,
+)
 
 log = logging.getLogger(__name__)
 
@@ -28,9 +44,19 @@ def _app_compose(name: str) -> tuple[str, ...]:
     return app_compose_command(get_installed_apps_path() / name)
 
 
+def _app_project(name: str) -> str:
+    """The compose project of an app, for acting on its containers by label.
+
+    Checked like every compose command, so that an app without a compose file
+    never resolves to the core project.
+    """
+    _app_compose(name)
+    return normalize_project_name(name)
+
+
 async def docker_create_app_containers(name: str):
     log.debug(f"creating containers for app {name}")
-    await subprocess(*_app_compose(name), "up", "--no-start")
+    await subprocess(*_app_compose(name), "up", "--no-start", pulls_images=True)
 
 
 ContainerState = Literal["running", "paused", "exited", "missing"]
@@ -50,13 +76,39 @@ def app_op_lock(name: str) -> asyncio.Lock:
     return _app_op_locks[name]
 
 
+# When start_app last saw an app's containers running (monotonic seconds). Every
+# pause, stop or teardown forgets the app, so wake-on-access can trust a recent
+# entry and skip the revive path entirely.
+_verified_running: dict[str, float] = {}
+
+
+def is_verified_running(name: str, max_age: float) -> bool:
+    verified_at = _verified_running.get(name)
+    return verified_at is not None and time.monotonic() - verified_at < max_age
+
+
+def _set_verified_running(name: str):
+    _verified_running[name] = time.monotonic()
+
+
+def _forget_verified_running(name: str):
+    _verified_running.pop(name, None)
+
+
 async def get_app_container_state(name: str) -> ContainerState:
     """Real docker state of an app's containers: running | paused | exited | missing.
 
     Reads the daemon rather than the stored app status, so a caller can revive an
     app whose containers changed state out-of-band (crash, OOM, core-upgrade
-    converge stop) while the database still says PAUSED or RUNNING.
+    converge stop) while the database still says PAUSED or RUNNING. Served from
+    container_state while its event stream is up, from compose otherwise.
     """
+    containers = container_state.get_project_containers(normalize_project_name(name))
+    if containers is not None:
+        if not containers:
+            return "missing"
+        return _categorize_states([c.state for c in containers])
+
     compose = _app_compose(name)
     try:
         ids_out = await subprocess(*compose, "ps", "-a", "-q")
@@ -69,6 +121,10 @@ async def get_app_container_state(name: str) -> ContainerState:
     except SubprocessError:
         return "missing"
     states = [line.strip() for line in states_out.splitlines() if line.strip()]
+    return _categorize_states(states)
+
+
+def _categorize_states(states: list[str]) -> ContainerState:
     if any(s == "paused" for s in states):
         return "paused"
     if states and all(s == "running" for s in states):
@@ -78,29 +134,56 @@ async def get_app_container_state(name: str) -> ContainerState:
 
 async def _compose_up(name: str):
     try:
-        await subprocess(*_app_compose(name), "up", "-d")
+        await subprocess(*_app_compose(name), "up", "-d", pulls_images=True)
     except SubprocessError as e:
         if "network" in str(e) and "not found" in str(e):
             log.warning(
                 f"stale network reference for app {name=}, recreating containers"
             )
             await subprocess(*_app_compose(name), "down")
-            await subprocess(*_app_compose(name), "up", "-d")
+            await subprocess(*_app_compose(name), "up", "-d", pulls_images=True)
         elif "Conflict" in str(e) and "already in use" in str(e):
             log.warning(f"stale containers for app {name=}, removing and recreating")
             await subprocess(*_app_compose(name), "down")
-            await subprocess(*_app_compose(name), "up", "-d")
+            await subprocess(*_app_compose(name), "up", "-d", pulls_images=True)
         else:
             raise
 
 
 async def _do_unpause(name: str):
+    project = _app_project(name)
     unpause_started = time.monotonic()
-    await subprocess(*_app_compose(name), "unpause")
+    await container_runtime.get_container_runtime().unpause(project)
     pause_metrics.record_unpause_latency((time.monotonic() - unpause_started) * 1000)
     pause_metrics.record_app_transition(name, Status.PAUSED, Status.RUNNING)
 
 
+_prefetches: set[asyncio.Task] = set()
+
+
+def _start_prefetch(name: str) -> bool:
+    """Swap an unpaused app's memory back in, in the background.
+
+    Started once the app is marked running, so that neither the unpause nor the
+    op lock waits for it. Returns whether a prefetch was started.
+    """
+    if not settings().apps.lifecycle.prefetch_enabled:
+        return False
+    task = asyncio.create_task(_prefetch(name), name=f"prefetch {name}")
+    _prefetches.add(task)
+    task.add_done_callback(_prefetches.discard)
+    return True
+
+
+async def _prefetch(name: str):
+    try:
+        prefetched = await memory_pressure.prefetch_compose_stack(name)
+    except Exception as e:
+        log.error(f"error prefetching app {name=}: {type(e).__name__}({e})")
+    else:
+        log.debug(f"prefetched {prefetched} bytes of app {name=}")
+
+
 async def _mark_running(name: str):
     async with db_conn() as conn:
         await db_installed_apps.update_status(conn, name, Status.RUNNING)
@@ -126,7 +209,9 @@ async def start_app(name: str) -> None:
         db_status = app["status"] if app else None
         if db_status not in _REVIVABLE_STATUS:
             log.debug(f"app {name=} has {db_status=}, skipping start")
+            cold_start.cancel(name)
             return
+        cold_start.reviving(name)
 
         state = await get_app_container_state(name)
 
@@ -136,6 +221,8 @@ async def start_app(name: str) -> None:
                     f"app {name=} container is running but db says {db_status=}; reconciling"
                 )
                 await _mark_running(name)
+            _set_verified_running(name)
+            cold_start.cancel(name)
             return
 
         if state == "paused":
@@ -146,12 +233,18 @@ async def start_app(name: str) -> None:
             log.debug(f"unpausing app {name=}")
             try:
                 await _do_unpause(name)
-            except SubprocessError:
+                start_type = cold_start.UNPAUSE
+            except ContainerRuntimeError:
                 # a partially-paused stack (some containers already exited) can't
                 # be revived by unpause — fall back to a plain start
                 log.warning(f"unpause failed for {name=}, starting instead")
                 await _compose_up(name)
+                start_type = cold_start.START
             await _mark_running(name)
+            _set_verified_running(name)
+            if start_type == cold_start.UNPAUSE and _start_prefetch(name):
+                start_type = cold_start.UNPAUSE_PREFETCH
+            cold_start.started(name, start_type)
             return
 
         # exited / created / missing
@@ -160,8 +253,21 @@ async def start_app(name: str) -> None:
                 f"app {name=} container is {state} but db says {db_status=}; starting it"
             )
         log.debug(f"starting app {name=}")
-        await _compose_up(name)
+        if state == "missing":
+            await _compose_up(name)
+            start_type = cold_start.RECREATE
+        else:
+            start_type = cold_start.START
+            try:
+                await container_runtime.get_container_runtime().start(
+                    _app_project(name)
+                )
+            except ContainerRuntimeError as e:
+                log.debug(f"starting app {name=} with compose: {e}")
+                await _compose_up(name)
         await _mark_running(name)
+        _set_verified_running(name)
+        cold_start.started(name, start_type)
 
 
 async def docker_pause_app(name: str):
@@ -171,8 +277,12 @@ async def docker_pause_app(name: str):
         app_status = app["status"] if app else None
     if app_status == Status.RUNNING:
         log.debug(f"pausing app {name=}")
+        project = _app_project(name)
+        _forget_verified_running(name)
         pause_started = time.monotonic()
-        await subprocess(*_app_compose(name), "pause")
+        await container_runtime.get_container_runtime().pause(project)
+        # again, in case a revive verified the app while the pause was running
+        _forget_verified_running(name)
         await memory_pressure.reclaim_compose_stack(name)
         pause_metrics.record_pause_latency((time.monotonic() - pause_started) * 1000)
         pause_metrics.record_app_transition(name, Status.RUNNING, Status.PAUSED)
@@ -191,6 +301,7 @@ async def docker_unpause_app(name: str):
         log.debug(f"unpausing app {name=}")
         await _do_unpause(name)
         await _mark_running(name)
+        _start_prefetch(name)
     else:
         log.debug(f"app {name=} has {app_status=}, skipping unpause")
 
@@ -200,10 +311,14 @@ async def docker_stop_app(name: str, set_status: bool = True):
         app = await db_installed_apps.get_by_name(conn, name)
         app_status = app["status"] if app else None
     if app_status in [Status.RUNNING, Status.PAUSED, Status.UNINSTALLING]:
+        project = _app_project(name)
+        runtime = container_runtime.get_container_runtime()
+        _forget_verified_running(name)
         if app_status == Status.PAUSED:
             # a frozen container cannot be stopped — unfreeze first
-            await subprocess(*_app_compose(name), "unpause")
-        await subprocess(*_app_compose(name), "stop")
+            await runtime.unpause(project)
+        await runtime.stop(project)
+        _forget_verified_running(name)
         if set_status:
             pause_metrics.record_app_transition(
                 name, Status(app_status), Status.STOPPED
@@ -223,8 +338,10 @@ async def docker_shutdown_app(name: str, set_status: bool = True, force: bool =
         if app_status == Status.PAUSED:
             # only reachable with force=True (process shutdown) — unfreeze so
             # compose down can stop and remove the containers
-            await subprocess(*_app_compose(name), "unpause")
+            await container_runtime.get_container_runtime().unpause(_app_project(name))
+        _forget_verified_running(name)
         await subprocess(*_app_compose(name), "down")
+        _forget_verified_running(name)
         if set_status:
             async with db_conn() as conn:
                 await db_installed_apps.update_status(conn, name, Status.DOWN)
@@ -245,11 +362,18 @@ async def docker_stop_all_apps():
 
 
 async def docker_shutdown_all_apps(force: bool = False):
+    """Take down all apps at once.
+
+    The compose commands bypass the executor's concurrency limit: this runs
+    when the core shuts down, and within the core container's stop_grace_period
+    of 30s, which queueing behind max_concurrent_commands would overrun.
+    """
     async with db_conn() as conn:
         all_apps = await db_installed_apps.get_all(conn)
     apps = [InstalledApp.model_validate(a) for a in all_apps]
     tasks = [docker_shutdown_app(app.name, force=force) for app in apps]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    with subprocess_priority(Priority.SHUTDOWN):
+        results = await asyncio.gather(*tasks, return_exceptions=True)
     for app, result in zip(apps, results):
         if isinstance(result, Exception):
             log.error(f"Error shutting down app {app.name}: {result}")
@@ -259,18 +383,83 @@ def get_installed_apps_path() -> Path:
     return Path(settings().path_root) / "core" / "installed_apps"
 
 
+@dataclass
+class _AppMetaEntry:
+    file_key: tuple[str, int, int, int]
+    meta: AppMeta
+
+
+# Process-wide AppMeta registry. An entry stays valid as long as the stat of its
+# app_meta.json (path, inode, mtime, size) is unchanged, so a reinstall or a
+# rewrite of the file is picked up on the next read without any invalidation.
+_app_meta_registry: dict[str, _AppMetaEntry] = {}
+
+
+def _file_key(meta_file: Path) -> tuple[str, int, int, int]:
+    stat = meta_file.stat()
+    return str(meta_file), stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
 def get_app_metadata(app_name: str) -> AppMeta:
-    app_path = get_installed_apps_path() / app_name
-    if not app_path.exists():
+    meta_file = get_installed_apps_path() / app_name / "app_meta.json"
+    try:
+        file_key = _file_key(meta_file)
+    except OSError:
+        _app_meta_registry.pop(app_name, None)
         raise MetadataNotFound(app_name)
+
+    entry = _app_meta_registry.get(app_name)
+    if entry and entry.file_key == file_key:
+        return entry.meta
+
     try:
-        with open(app_path / "app_meta.json") as f:
-            return AppMeta.model_validate(json.load(f))
+        with open(meta_file) as f:
+            values = json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
         raise MetadataNotFound(app_name)
+    stored_version = values.get("v")
+    meta = AppMeta.model_validate(values)
+    if stored_version != meta.v:
+        file_key = _write_back_migrated_metadata(meta_file, meta) or file_key
+    _app_meta_registry[app_name] = _AppMetaEntry(file_key=file_key, meta=meta)
+    return meta
+
+
+def _write_back_migrated_metadata(meta_file: Path, meta: AppMeta):
+    """Persist a migrated app_meta.json so the migration chain runs only once."""
+    tmp_file = meta_file.with_suffix(".json.tmp")
+    try:
+        tmp_file.write_text(
+            json.dumps(meta.model_dump(mode="json", exclude_unset=True), indent=2)
+        )
+        os.replace(tmp_file, meta_file)
+        log.info(f"migrated {meta_file} to v{meta.v}")
+        return _file_key(meta_file)
+    except OSError as e:
+        log.warning(f"could not write back migrated {meta_file}: {e!r}")
+        tmp_file.unlink(missing_ok=True)
+        return None
+
+
+async def load_all_app_metadata():
+    """Warm the AppMeta registry for every installed app in the thread pool."""
+    apps_path = get_installed_apps_path()
+    if not apps_path.is_dir():
+        return
+    app_names = [p.name for p in apps_path.iterdir() if p.is_dir()]
+
+    def load(app_name: str):
+        try:
+            get_app_metadata(app_name)
+        except Exception as e:
+            log.warning(f"could not load metadata of app {app_name}: {e!r}")
+
+    await asyncio.gather(*[asyncio.to_thread(load, name) for name in app_names])
+    log.debug(f"loaded metadata of {len(_app_meta_registry)} apps")
 
 
 async def size_is_compatible(app_size) -> bool:
+    # served from memory after the first read, refreshed by portal_controller
     try:
         profile = await shard_core.data_model.profile.get_profile()
     except KeyError:
@@ -294,7 +483,8 @@ async def docker_prune_images(apply_filter=True):
     if apply_filter:
         command.extend(["--filter", f"until={settings().apps.pruning.max_age}h"])
     try:
-        stdout = await subprocess(*command)
+        with subprocess_priority(Priority.MAINTENANCE):
+            stdout = await subprocess(*command)
     except SubprocessError as e:
         log.error(f"failed to prune docker images: {e}")
         return
@@ -23,6 +23,7 @@ from shard_core.data_model.backup import (
 from shard_core.settings import settings
 from shard_core.service.portal_controller import get_backup_sas_url
 from shard_core.util import passphrase as passphrase_util, signals
+from shard_core.util.metrics import registry
 
 log = logging.getLogger(__name__)
 
@@ -30,6 +31,19 @@ STORE_KEY_BACKUP_PASSPHRASE = "backup_passphrase"
 STORE_KEY_BACKUP_PASSPHRASE_LAST_ACCESS = "backup_passphrase_last_access"
 BACKUP_IN_PROGESS_LOCK = asyncio.Lock()
 
+backups_total = registry.counter(
+    "shard_core_backups_total", "Finished backups by result.", ["result"]
+)
+backup_seconds = registry.summary(
+    "shard_core_backup_seconds", "Duration of successful backups.", min_value=1e-6
+)
+backup_directory_seconds = registry.summary(
+    "shard_core_backup_directory_seconds",
+    "Duration of backing up a single directory.",
+    ["directory"],
+    min_value=1e-6,
+)
+
 COMMAND_TEMPLATE = """
 rclone
 --azureblob-sas-url {sas_token}
@@ -74,8 +88,10 @@ async def start_backup():
                 "Backup failed\n"
                 + "".join(traceback.format_exception(task.exception()))
             )
+            backups_total.inc(result="failure")
             signals.on_backup_update.send(task.exception())
         else:
+            backups_total.inc(result="success")
             signals.on_backup_update.send()
 
     task.add_done_callback(lambda task: asyncio.create_task(on_task_done(task)))
@@ -112,6 +128,9 @@ async def backup_directories(
                 sas_token,
             )
             end_time = datetime.datetime.now(datetime.timezone.utc)
+            backup_directory_seconds.observe(
+                (end_time - start_time).total_seconds(), directory=str(rel_directory)
+            )
 
             dir_stats.append(
                 BackupStats(
@@ -131,6 +150,7 @@ async def backup_directories(
         async with db_conn() as conn:
             await db_backups.insert(conn, report)
         _write_marker_blob(container_name, sas_token)
+        backup_seconds.observe((overall_end_time - overall_start_time).total_seconds())
         log.info("Backup done")
 
 
@@ -0,0 +1,114 @@
+"""How long a user waits for an app that an access had to wake.
+
+ensure_app_is_running opens a wake when it has to revive an app, start_app
+reports which kind of start it took once the containers are up, and a probe
+then polls the app's upstream until it answers. The time from the access to
+that first answer is recorded in pause_metrics, per app and start type.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+import httpx
+
+from shard_core.data_model.app_meta import AppMeta, EntrypointPort
+from shard_core.service import pause_metrics
+
+log = logging.getLogger(__name__)
+
+UNPAUSE = "unpause"
+UNPAUSE_PREFETCH = "unpause_prefetch"  # unpause with a swap-in prefetch started
+START = "start"  # from stopped containers
+RECREATE = "recreate"  # from missing containers
+
+READY_TIMEOUT = 120
+PROBE_INTERVAL = 0.1
+
+
+@dataclass
+class _Wake:
+    accessed_at: float
+    upstream_url: str | None
+    # when start_app began reviving the app
+    reviving_at: float | None = None
+
+
+_wakes: dict[str, _Wake] = {}
+_probes: set[asyncio.Task] = set()
+
+
+def begin(app_meta: AppMeta):
+    """Open a wake for an access to an app that is not known to be running."""
+    wake = _wakes.get(app_meta.name)
+    now = time.monotonic()
+    if wake is not None and now - wake.accessed_at < READY_TIMEOUT:
+        return
+    _wakes[app_meta.name] = _Wake(now, _upstream_url(app_meta))
+
+
+def reviving(name: str):
+    if (wake := _wakes.get(name)) is not None and wake.reviving_at is None:
+        wake.reviving_at = time.monotonic()
+
+
+def cancel(name: str):
+    """The app did not need a start, so there is no cold start to measure."""
+    _wakes.pop(name, None)
+
+
+def started(name: str, start_type: str):
+    """The app's containers are up; wait for the first answer upstream."""
+    wake = _wakes.pop(name, None)
+    if wake is None:
+        return
+    task = asyncio.create_task(
+        _measure(name, start_type, wake, time.monotonic()),
+        name=f"measure cold start of {name}",
+    )
+    _probes.add(task)
+    task.add_done_callback(_probes.discard)
+
+
+def _upstream_url(app_meta: AppMeta) -> str | None:
+    for entrypoint in app_meta.entrypoints:
+        if entrypoint.entrypoint_port == EntrypointPort.HTTPS_443:
+            return f"http://{entrypoint.container_name}:{entrypoint.container_port}/"
+    return None
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(timeout=httpx.Timeout(5))
+
+
+async def _measure(name: str, start_type: str, wake: _Wake, containers_up_at: float):
+    if wake.upstream_url is not None:
+        if not await _wait_until_serving(wake.upstream_url, wake.accessed_at):
+            log.warning(f"app {name} did not answer within {READY_TIMEOUT}s")
+            return
+    ready_at = time.monotonic()
+    reviving_at = wake.reviving_at or wake.accessed_at
+    pause_metrics.record_cold_start(
+        name, start_type, (ready_at - wake.accessed_at) * 1000
+    )
+    log.info(
+        f"cold start ({start_type}) of app {name} took {ready_at - wake.accessed_at:.2f}s"
+        f" (queued {reviving_at - wake.accessed_at:.2f}s,"
+        f" containers {containers_up_at - reviving_at:.2f}s,"
+        f" ready {ready_at - containers_up_at:.2f}s)"
+    )
+
+
+async def _wait_until_serving(url: str, accessed_at: float) -> bool:
+    async with _client() as client:
+        while True:
+            try:
+                response = await client.get(url)
+                if response.status_code < 500:
+                    return True
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() - accessed_at > READY_TIMEOUT:
+                return False
+            await asyncio.sleep(PROBE_INTERVAL)
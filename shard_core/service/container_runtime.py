@@ -0,0 +1,170 @@
+"""Start, stop, pause and unpause app containers without the compose CLI.
+
+A compose invocation spends most of its time starting up and parsing the
+project before it sends the one API request per container that does the work,
+which makes waking a paused app take about a second. The runtime here acts on
+an app's already-created containers, found by their compose project label,
+through the Docker Engine API. Creating and recreating containers stays with
+compose; start raises ComposeRequired when it would need either.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+import httpx
+
+log = logging.getLogger(__name__)
+
+COMPOSE_PROJECT_LABEL = "com.docker.compose.project"
+COMPOSE_ONEOFF_LABEL = "com.docker.compose.oneoff"
+COMPOSE_DEPENDS_ON_LABEL = "com.docker.compose.depends_on"
+DEFAULT_DOCKER_SOCKET = "/var/run/docker.sock"
+# seconds a container gets to exit before it is killed, as with compose stop
+STOP_TIMEOUT = 10
+
+
+class ContainerRuntimeError(Exception):
+    pass
+
+
+class ComposeRequired(ContainerRuntimeError):
+    """The operation needs compose to create or order containers."""
+
+
+class ContainerRuntime(ABC):
+    @abstractmethod
+    async def start(self, project: str): ...
+
+    @abstractmethod
+    async def stop(self, project: str): ...
+
+    @abstractmethod
+    async def pause(self, project: str): ...
+
+    @abstractmethod
+    async def unpause(self, project: str): ...
+
+
+def get_docker_host() -> str:
+    return os.environ.get("DOCKER_HOST") or f"unix://{DEFAULT_DOCKER_SOCKET}"
+
+
+def engine_client(docker_host: str, timeout: httpx.Timeout) -> httpx.AsyncClient:
+    """An httpx client for the Docker Engine API at docker_host."""
+    if docker_host.startswith("unix://"):
+        transport_args = {"uds": docker_host.removeprefix("unix://")}
+        base_url = "http://docker"
+    else:
+        transport_args = {}
+        base_url = docker_host.replace("tcp://", "http://", 1)
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(**transport_args),
+        base_url=base_url,
+        timeout=timeout,
+    )
+
+
+class DockerEngineRuntime(ContainerRuntime):
+    def __init__(self, docker_host: str):
+        self._docker_host = docker_host
+
+    def _client(self) -> httpx.AsyncClient:
+        return engine_client(self._docker_host, httpx.Timeout(STOP_TIMEOUT + 30))
+
+    async def start(self, project: str):
+        async with self._client() as client:
+            containers = await self._list(client, project)
+            if not containers:
+                raise ComposeRequired(f"no containers for project {project}")
+            if any(
+                (c.get("Labels") or {}).get(COMPOSE_DEPENDS_ON_LABEL)
+                for c in containers
+            ):
+                raise ComposeRequired(f"containers of {project} depend on each other")
+            to_start = [c for c in containers if c["State"] in ("created", "exited")]
+            await self._post_each(client, to_start, "start")
+
+    async def stop(self, project: str):
+        async with self._client() as client:
+            containers = await self._list(client, project)
+            to_stop = [c for c in containers if c["State"] in ("running", "restarting")]
+            await self._post_each(client, to_stop, "stop", {"t": STOP_TIMEOUT})
+
+    async def pause(self, project: str):
+        async with self._client() as client:
+            containers = await self._list(client, project)
+            to_pause = [c for c in containers if c["State"] == "running"]
+            await self._post_each(client, to_pause, "pause")
+
+    async def unpause(self, project: str):
+        # Like compose, only paused containers are unpaused, so exited ones
+        # (e.g. init containers) are left alone. A running container means the
+        # stack was only partially paused, which raises so that the caller can
+        # start it instead.
+        async with self._client() as client:
+            containers = await self._list(client, project)
+            to_unpause = [c for c in containers if c["State"] == "paused"]
+            await self._post_each(client, to_unpause, "unpause")
+            if running := [c for c in containers if c["State"] == "running"]:
+                raise ContainerRuntimeError(
+                    f"{project} was only partially paused, "
+                    f"{len(running)} containers are running"
+                )
+
+    async def _list(self, client: httpx.AsyncClient, project: str) -> list[dict]:
+        filters = {
+            "label": [
+                f"{COMPOSE_PROJECT_LABEL}={project}",
+                f"{COMPOSE_ONEOFF_LABEL}=False",
+            ]
+        }
+        response = await self._request(
+            client,
+            "GET",
+            "/containers/json",
+            {"all": "true", "filters": json.dumps(filters)},
+        )
+        return response.json()
+
+    async def _post_each(
+        self,
+        client: httpx.AsyncClient,
+        containers: list[dict],
+        action: str,
+        params: dict | None = None,
+    ):
+        results = await asyncio.gather(
+            *[
+                self._request(client, "POST", f"/containers/{c['Id']}/{action}", params)
+                for c in containers
+            ],
+            return_exceptions=True,
+        )
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors:
+            raise errors[0]
+
+    @staticmethod
+    async def _request(
+        client: httpx.AsyncClient, method: str, path: str, params: dict | None
+    ) -> httpx.Response:
+        try:
+            response = await client.request(method, path, params=params)
+        except httpx.HTTPError as e:
+            raise ContainerRuntimeError(f"[{method} {path}] failed: {e!r}") from e
+        # 304: already in the requested state
+        if response.status_code >= 400:
+            raise ContainerRuntimeError(
+                f"[{method} {path}] returned {response.status_code}: {response.text}"
+            )
+        log.debug(f"[{method} {path}] {response.status_code}")
+        return response
+
+
+@lru_cache()
+def get_container_runtime() -> ContainerRuntime:
+    return DockerEngineRuntime(get_docker_host())
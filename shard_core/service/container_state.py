@@ -0,0 +1,183 @@
+"""Docker state of the app containers, kept current from the Docker events stream.
+
+Asking compose for an app's containers and then inspecting them forks two CLI
+processes that each cost hundreds of milliseconds of CPU on a small VM, and the
+lifecycle code does that for every revive, pause and splash page. Instead, the
+watcher lists all compose-managed containers once through the Docker Engine API
+and then applies container events as they arrive. While the event stream is
+down, is_live() is False and callers fall back to asking compose.
+
+It talks to the engine with the same async client as container_runtime, so the
+event stream needs no thread of its own.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import suppress
+from dataclasses import dataclass
+
+import httpx
+
+from shard_core.service.container_runtime import (
+    COMPOSE_PROJECT_LABEL,
+    engine_client,
+    get_docker_host,
+)
+from shard_core.util.async_util import BackgroundTask
+
+log = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 5
+
+# container event action -> resulting container state, None for removal
+_EVENT_STATES = {
+    "create": "created",
+    "start": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+    "destroy": None,
+}
+
+
+@dataclass
+class ContainerInfo:
+    name: str
+    state: str
+
+
+# compose project -> container id -> container
+_projects: dict[str, dict[str, ContainerInfo]] = {}
+_live = False
+
+
+def is_live() -> bool:
+    return _live
+
+
+def get_project_containers(project: str) -> list[ContainerInfo] | None:
+    """The containers of a compose project, None if the state is not being watched."""
+    if not _live:
+        return None
+    return list(_projects.get(project, {}).values())
+
+
+def get_project_container_ids(
+    project: str, states: tuple[str, ...]
+) -> list[str] | None:
+    if not _live:
+        return None
+    containers = _projects.get(project, {})
+    return [id_ for id_, c in containers.items() if c.state in states]
+
+
+def _seed(containers: list[dict]):
+    _projects.clear()
+    for c in containers:
+        project = (c.get("Labels") or {}).get(COMPOSE_PROJECT_LABEL)
+        if not project:
+            continue
+        name = c["Names"][0].lstrip("/") if c.get("Names") else c["Id"]
+        _projects.setdefault(project, {})[c["Id"]] = ContainerInfo(name, c["State"])
+    log.debug(f"seeded state of {len(containers)} app containers")
+
+
+def _apply_event(event: dict):
+    action = event.get("Action", "")
+    if action not in _EVENT_STATES:
+        return
+    actor = event.get("Actor") or {}
+    attributes = actor.get("Attributes") or {}
+    project = attributes.get(COMPOSE_PROJECT_LABEL)
+    container_id = actor.get("ID")
+    if not project or not container_id:
+        return
+    containers = _projects.setdefault(project, {})
+    state = _EVENT_STATES[action]
+    if state is None:
+        containers.pop(container_id, None)
+        if not containers:
+            del _projects[project]
+    elif container_id in containers:
+        containers[container_id].state = state
+    else:
+        name = attributes.get("name", container_id)
+        containers[container_id] = ContainerInfo(name, state)
+
+
+def _client() -> httpx.AsyncClient:
+    # no read timeout: the event stream stays quiet while no container changes
+    return engine_client(get_docker_host(), httpx.Timeout(10, read=None))
+
+
+class ContainerStateWatcher(BackgroundTask):
+    def __init__(self):
+        self.is_started = False
+        self._task: asyncio.Task | None = None
+        self._live_event = asyncio.Event()
+
+    def start(self):
+        if not self.is_started:
+            self.is_started = True
+            self._live_event = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="ContainerStateWatcher")
+            log.debug("started container state watcher")
+
+    def stop(self):
+        if self.is_started:
+            self.is_started = False
+            self._task.cancel()
+            log.debug("stopped container state watcher")
+
+    async def wait(self):
+        with suppress(asyncio.CancelledError):
+            await self._task
+
+    async def wait_until_live(self, timeout: float) -> bool:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._live_event.wait(), timeout)
+        return _live
+
+    async def _run(self):
+        global _live
+        while True:
+            try:
+                await self._watch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"container event stream failed: {e!r}")
+            finally:
+                _live = False
+                self._live_event.clear()
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _watch(self):
+        global _live
+        event_filters = {"type": ["container"], "label": [COMPOSE_PROJECT_LABEL]}
+        async with _client() as client:
+            # Subscribe before listing, so that nothing happening in between is
+            # lost. Events already reflected in the list leave it unchanged.
+            async with client.stream(
+                "GET", "/events", params={"filters": json.dumps(event_filters)}
+            ) as events:
+                events.raise_for_status()
+                response = await client.get(
+                    "/containers/json",
+                    params={
+                        "all": "true",
+                        "filters": json.dumps({"label": [COMPOSE_PROJECT_LABEL]}),
+                    },
+                )
+                response.raise_for_status()
+                _seed(response.json())
+                _live = True
+                self._live_event.set()
+                async for line in events.aiter_lines():
+                    if line:
+                        _apply_event(json.loads(line))
+        log.warning("container event stream ended")
+
+
+container_state_watcher = ContainerStateWatcher()
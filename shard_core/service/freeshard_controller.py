@@ -8,6 +8,7 @@ from shard_core.service.signed_call import signed_request
 log = logging.getLogger(__name__)
 
 STORE_KEY_FREESHARD_CONTROLLER_SHARED_KEY = "freeshard_controller_shared_key"
+database.set_cache_ttl(STORE_KEY_FREESHARD_CONTROLLER_SHARED_KEY, None)
 
 
 async def call_freeshard_controller(path: str, method: str = "GET", body: bytes = None):
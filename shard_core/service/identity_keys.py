@@ -0,0 +1,60 @@
+"""Memoized key material derived from an identity's private key.
+
+Loading a 4096-bit PKCS8 key from PEM is by far the most expensive part of
+rendering an identity's public key or signing an outbound request, and both
+happen for every app compose file, forward-auth identity lookup and signed
+call. The parsed key and everything derived from it is kept per identity id
+until the next on_identity_update.
+"""
+
+from dataclasses import dataclass
+
+from http_message_signatures import algorithms
+from requests_http_signature import HTTPSignatureAuth
+
+from shard_core.service import crypto
+from shard_core.util import signals
+
+
+@dataclass(frozen=True)
+class KeyMaterial:
+    private_key_pem: str
+    private_key: crypto.PrivateKey
+    public_key: crypto.PublicKey
+    public_key_pem: str
+    hash_id: str
+    signature_auth: HTTPSignatureAuth
+
+
+_key_material: dict[str, KeyMaterial] = {}
+
+
+def get_key_material(identity_id: str, private_key_pem: str) -> KeyMaterial:
+    material = _key_material.get(identity_id)
+    if material is None or material.private_key_pem != private_key_pem:
+        material = _derive(identity_id, private_key_pem)
+        _key_material[identity_id] = material
+    return material
+
+
+def _derive(identity_id: str, private_key_pem: str) -> KeyMaterial:
+    private_key = crypto.PrivateKey(private_key_pem)
+    public_key = private_key.get_public_key()
+    return KeyMaterial(
+        private_key_pem=private_key_pem,
+        private_key=private_key,
+        public_key=public_key,
+        public_key_pem=public_key.to_bytes().decode(),
+        hash_id=public_key.to_hash_id(),
+        # the parsed key is passed so that signing does not load the PEM again
+        signature_auth=HTTPSignatureAuth(
+            signature_algorithm=algorithms.RSA_PSS_SHA512,
+            key_id=identity_id[0:6],
+            key=private_key.key,
+        ),
+    )
+
+
+@signals.on_identity_update.connect
+async def _invalidate_key_material(_):
+    _key_material.clear()
@@ -0,0 +1,54 @@
+"""Write-behind buffer for last_access and last_connection timestamps.
+
+Every forward-authenticated request marks its app as accessed and its terminal
+as connected. Instead of one UPDATE per request, the latest timestamp per app
+and per terminal is kept here and written in one batch by a periodic flush and
+once more on shutdown.
+"""
+
+import logging
+from datetime import datetime
+
+from shard_core.database.connection import db_conn
+from shard_core.database import installed_apps as db_installed_apps
+from shard_core.database import terminals as db_terminals
+
+log = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 5
+
+_app_last_access: dict[str, datetime] = {}
+_terminal_last_connection: dict[str, datetime] = {}
+
+
+def record_app_access(app_name: str, at: datetime):
+    _app_last_access[app_name] = at
+
+
+def record_terminal_connection(terminal_id: str, at: datetime):
+    _terminal_last_connection[terminal_id] = at
+
+
+async def flush_last_access():
+    global _app_last_access, _terminal_last_connection
+    if not _app_last_access and not _terminal_last_connection:
+        return
+    apps, _app_last_access = _app_last_access, {}
+    terminals, _terminal_last_connection = _terminal_last_connection, {}
+    try:
+        async with db_conn() as conn:
+            if apps:
+                await db_installed_apps.update_last_access_many(conn, apps)
+            if terminals:
+                await db_terminals.update_last_connection_many(conn, terminals)
+    except Exception:
+        _merge_back(_app_last_access, apps)
+        _merge_back(_terminal_last_connection, terminals)
+        raise
+    log.debug(f"flushed last access of {len(apps)} apps and {len(terminals)} terminals")
+
+
+def _merge_back(pending: dict[str, datetime], failed: dict[str, datetime]):
+    for key, at in failed.items():
+        if key not in pending or pending[key] < at:
+            pending[key] = at
@@ -1,11 +1,25 @@
 import asyncio
+import ctypes
 import errno
 import logging
+import os
 import re
+import select
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Awaitable, Callable
 
+from shard_core.service import container_state, pause_metrics
 from shard_core.settings import settings
-from shard_core.util.subprocess import subprocess, app_compose_command
+from shard_core.util.async_util import BackgroundTask
+from shard_core.util.subprocess import (
+    subprocess,
+    app_compose_command,
+    normalize_project_name,
+)
 
 log = logging.getLogger(__name__)
 
@@ -14,8 +28,29 @@ log = logging.getLogger(__name__)
 PSI_PATH = Path("/host/pressure/memory")
 # The host cgroup v2 hierarchy, bind-mounted read-write for memory.reclaim writes.
 CGROUP_ROOT = Path("/sys/fs/cgroup")
+MEMINFO_PATH = Path("/proc/meminfo")
+
+# Chunk sizes for memory.reclaim writes, in bytes
+RECLAIM_CHUNK_MIN = 16 * 2**20
+RECLAIM_CHUNK_MAX = 256 * 2**20
+# Seconds one app's reclaim may take in total
+RECLAIM_TIME_BUDGET = 15
+RECLAIM_THREADS = 2
+
+# Memory kept free when faulting a stack back in after unpause, in KiB
+PREFETCH_RESERVE_KIB = 256 * 1024
+
+# Unprivileged PSI triggers need a window that is a multiple of 2 seconds.
+PSI_TRIGGER_WINDOW_US = 2_000_000
+# The poll events that signal a PSI trigger. Tests stand in an eventfd.
+PSI_TRIGGER_EVENTS = select.EPOLLPRI
 
 _PSI_SOME_AVG10_RE = re.compile(r"some.*?avg10=([\d.]+)")
+_MEMINFO_RE = re.compile(r"^(\w+):\s+(\d+) kB", re.MULTILINE)
+_reclaim_pool = ThreadPoolExecutor(RECLAIM_THREADS, thread_name_prefix="reclaim")
+# apart from the reclaims, so that a woken app never waits behind another's reclaim
+_prefetch_pool = ThreadPoolExecutor(1, thread_name_prefix="prefetch")
+_MEMORY_STAT_ANON_RE = re.compile(r"^anon (\d+)$", re.MULTILINE)
 
 
 def read_memory_pressure() -> float:
@@ -28,41 +63,347 @@ def read_memory_pressure() -> float:
     return float(match.group(1)) if match else 0.0
 
 
-async def reclaim_compose_stack(app_name: str):
-    """Write each container's current RSS to its cgroup memory.reclaim,
-    proactively paging the frozen processes' anonymous pages out to swap."""
-    app_path = Path(settings().path_root) / "core" / "installed_apps" / app_name
-    stdout = await subprocess(*app_compose_command(app_path), "ps", "-q")
-    container_ids = [line.strip() for line in stdout.splitlines() if line.strip()]
+def read_mem_available_kib() -> int | None:
+    """Return MemAvailable from /proc/meminfo, None if unavailable."""
+    return _read_meminfo_kib("MemAvailable")
+
+
+def read_swap_free_kib() -> int | None:
+    return _read_meminfo_kib("SwapFree")
+
+
+def _read_meminfo_kib(field: str) -> int | None:
+    try:
+        text = MEMINFO_PATH.read_text()
+    except OSError:
+        return None
+    values = dict(_MEMINFO_RE.findall(text))
+    return int(values[field]) if field in values else None
+
+
+@dataclass
+class StackMemory:
+    """Memory charged to the cgroups of an app's containers, in bytes."""
+
+    current: int = 0  # resident, freed by reclaim after pausing or by stopping
+    anon: int = 0  # the part of current that reclaim pages out to swap
+    swap: int = 0  # freed only by stopping
+
+
+def read_stack_memory(app_name: str) -> StackMemory | None:
+    """Sum the memory of an app's running and paused containers.
+
+    None while the container state is not being watched: this runs when memory
+    is already short, which is no time to fork compose to find the containers.
+    """
+    container_ids = container_state.get_project_container_ids(
+        normalize_project_name(app_name), ("running", "paused")
+    )
+    if container_ids is None:
+        return None
+    usage = StackMemory()
     for container_id in container_ids:
-        # The memory.reclaim write blocks while the kernel pages out — run it
-        # off the event loop.
-        await asyncio.to_thread(_reclaim_container, container_id)
+        cgroup = _find_cgroup(container_id)
+        if cgroup is None:
+            continue
+        usage.current += _read_int(cgroup / "memory.current")
+        usage.swap += _read_int(cgroup / "memory.swap.current")
+        try:
+            match = _MEMORY_STAT_ANON_RE.search((cgroup / "memory.stat").read_text())
+        except OSError:
+            continue
+        usage.anon += int(match.group(1)) if match else 0
+    return usage
+
+
+def _read_int(path: Path) -> int:
+    try:
+        return int(path.read_text().strip())
+    except (OSError, ValueError):
+        return 0
+
+
+def open_psi_trigger(threshold: float) -> int:
+    """Register a trigger for `some` memory stalls above threshold percent.
+
+    Returns the file descriptor to poll; the trigger lives as long as it is open.
+    """
+    stall_us = int(PSI_TRIGGER_WINDOW_US * threshold / 100)
+    fd = os.open(PSI_PATH, os.O_RDWR | os.O_NONBLOCK)
+    try:
+        os.write(fd, f"some {stall_us} {PSI_TRIGGER_WINDOW_US}\0".encode())
+    except OSError:
+        os.close(fd)
+        raise
+    return fd
+
+
+class PsiMonitor(BackgroundTask):
+    """Calls on_pressure as soon as the kernel reports memory stalls above the
+    PSI threshold, instead of waiting for the next control tick.
+
+    on_pressure demotes one app and returns whether it did. After a demotion the
+    monitor watches one more trigger window: if stalls are still reported, the
+    memory freed was not enough and it demotes again, otherwise the pressure
+    has been relieved and it waits for the next trigger. While is_active is
+    False (no trigger could be registered), polling has to cover for it.
+    """
+
+    def __init__(self, on_pressure: Callable[[], Awaitable[bool]]):
+        self.on_pressure = on_pressure
+        self.is_started = False
+        self.is_active = False
+        self.demotions = 0
+        self._task: asyncio.Task | None = None
 
+    def start(self):
+        if not self.is_started:
+            self.is_started = True
+            self._task = asyncio.create_task(self._run(), name="PsiMonitor")
+            log.debug("started PSI monitor")
 
-def _reclaim_container(container_id: str):
+    def stop(self):
+        if self.is_started:
+            self.is_started = False
+            self._task.cancel()
+            log.debug("stopped PSI monitor")
+
+    async def wait(self):
+        with suppress(asyncio.CancelledError):
+            await self._task
+
+    async def _run(self):
+        try:
+            fd = open_psi_trigger(settings().apps.lifecycle.psi_threshold)
+        except OSError as e:
+            log.info(f"PSI trigger not available, relying on polling: {e!r}")
+            return
+        loop = asyncio.get_running_loop()
+        epoll = select.epoll()
+        stalled = asyncio.Event()
+        broken = asyncio.Event()
+
+        def on_ready():
+            for _, events in epoll.poll(0):
+                if events & (select.EPOLLERR | select.EPOLLHUP):
+                    broken.set()
+                stalled.set()
+
+        try:
+            epoll.register(fd, PSI_TRIGGER_EVENTS)
+            loop.add_reader(epoll.fileno(), on_ready)
+            self.is_active = True
+            while not broken.is_set():
+                await stalled.wait()
+                stalled.clear()
+                await self._relieve(stalled)
+            log.warning("PSI trigger failed, relying on polling")
+        finally:
+            self.is_active = False
+            loop.remove_reader(epoll.fileno())
+            epoll.close()
+            os.close(fd)
+
+    async def _relieve(self, stalled: asyncio.Event):
+        log.info("memory stall threshold crossed, demoting LRU app")
+        while await self.on_pressure():
+            self.demotions += 1
+            stalled.clear()
+            await asyncio.sleep(PSI_TRIGGER_WINDOW_US / 1_000_000)
+            if not stalled.is_set():
+                return
+            log.info("memory still stalling, demoting another app")
+
+
+async def reclaim_compose_stack(app_name: str):
+    """Page the memory of a frozen app's containers out, a chunk at a time.
+
+    Asking memory.reclaim for a container's whole RSS blocks a thread for as
+    long as the kernel takes and then fails with EAGAIN, since some pages always
+    stay resident. Instead, each container is reclaimed in chunks sized by
+    _reclaim_chunk_size, the containers in parallel on a small thread pool,
+    until a chunk fails, RECLAIM_TIME_BUDGET is spent or, if the reclaim
+    started under memory pressure, the pressure has subsided.
+    """
+    container_ids = container_state.get_project_container_ids(
+        normalize_project_name(app_name), ("running", "paused")
+    )
+    if container_ids is None:
+        app_path = Path(settings().path_root) / "core" / "installed_apps" / app_name
+        stdout = await subprocess(*app_compose_command(app_path), "ps", "-q")
+        container_ids = [line.strip() for line in stdout.splitlines() if line.strip()]
+    threshold = settings().apps.lifecycle.psi_threshold
+    until_relieved = read_memory_pressure() > threshold
+    deadline = time.monotonic() + RECLAIM_TIME_BUDGET
+    loop = asyncio.get_running_loop()
+    reclaimed = await asyncio.gather(
+        *[
+            loop.run_in_executor(
+                _reclaim_pool,
+                _reclaim_container,
+                container_id,
+                deadline,
+                threshold if until_relieved else None,
+            )
+            for container_id in container_ids
+        ]
+    )
+    pause_metrics.record_reclaim(app_name, sum(reclaimed))
+    log.debug(f"reclaimed {sum(reclaimed)} bytes of app {app_name}")
+
+
+def _reclaim_container(
+    container_id: str,
+    deadline: float = float("inf"),
+    relieved_below: float | None = None,
+) -> int:
+    """Reclaim up to the container's current usage; return the bytes freed."""
     cgroup = _find_cgroup(container_id)
     if cgroup is None:
         log.warning(f"no cgroup found for container {container_id}, skipping reclaim")
-        return
-    current = int((cgroup / "memory.current").read_text().strip())
-    if current <= 0:
-        return
+        return 0
+    initial = _read_int(cgroup / "memory.current")
+    requested = 0
+    while requested < initial and time.monotonic() < deadline:
+        if relieved_below is not None and read_memory_pressure() <= relieved_below:
+            log.debug(f"memory pressure subsided, stopping reclaim of {container_id}")
+            break
+        chunk = min(_reclaim_chunk_size(), initial - requested)
+        if chunk < RECLAIM_CHUNK_MIN and requested + chunk < initial:
+            log.debug(f"no swap headroom left, stopping reclaim of {container_id}")
+            break
+        try:
+            (cgroup / "memory.reclaim").write_text(f"{chunk}\n")
+        except OSError as e:
+            # Some pages always stay resident, so reclaiming the whole usage
+            # ends in EAGAIN once the kernel has paged out what it can — that
+            # is the expected end, not a failure. Only surface a warning for
+            # genuine errors (missing file, EPERM, ...).
+            if e.errno == errno.EAGAIN:
+                log.debug(
+                    f"memory.reclaim reached EAGAIN for container {container_id} "
+                    "(expected — paged out what it could)"
+                )
+            else:
+                log.warning(f"memory.reclaim failed for container {container_id}: {e}")
+            break
+        requested += chunk
+    return max(0, initial - _read_int(cgroup / "memory.current"))
+
+
+def _reclaim_chunk_size() -> int:
+    """Bigger steps while memory is short, never more than a quarter of free swap."""
+    threshold = settings().apps.lifecycle.psi_threshold
+    urgency = min(1.0, read_memory_pressure() / (2 * threshold)) if threshold else 1.0
+    chunk = RECLAIM_CHUNK_MIN + (RECLAIM_CHUNK_MAX - RECLAIM_CHUNK_MIN) * urgency
+    swap_free_kib = read_swap_free_kib()
+    if swap_free_kib is not None:
+        chunk = min(chunk, swap_free_kib * 1024 // 4)
+    return int(chunk)
+
+
+async def prefetch_compose_stack(app_name: str) -> int:
+    """Ask the kernel to swap an unpaused app's anonymous memory back in.
+
+    Otherwise, the first requests after unpause fault the working set in a
+    page at a time. MADV_WILLNEED, applied through process_madvise to every
+    process of the app's containers, starts the swap-in for whole regions at
+    once. Skipped while memory pressure is high, and bounded by MemAvailable
+    so that it never causes pressure itself. Returns the bytes advised.
+    """
+    if read_memory_pressure() > settings().apps.lifecycle.psi_threshold:
+        log.debug(f"memory pressure high, not prefetching app {app_name}")
+        return 0
+    container_ids = container_state.get_project_container_ids(
+        normalize_project_name(app_name), ("running",)
+    )
+    if not container_ids:
+        return 0
+    cgroups = [c for c in map(_find_cgroup, container_ids) if c is not None]
+    swapped = sum(_read_int(c / "memory.swap.current") for c in cgroups)
+    available_kib = read_mem_available_kib()
+    budget = swapped
+    if available_kib is not None:
+        budget = min(budget, (available_kib - PREFETCH_RESERVE_KIB) * 1024)
+    if budget <= 0:
+        return 0
+    return await asyncio.get_running_loop().run_in_executor(
+        _prefetch_pool, _prefetch_cgroups, cgroups, budget
+    )
+
+
+def _prefetch_cgroups(cgroups: list[Path], budget: int) -> int:
+    advised = 0
+    for cgroup in cgroups:
+        try:
+            pids = [int(p) for p in (cgroup / "cgroup.procs").read_text().split()]
+        except OSError:
+            continue
+        # Processes outside our PID namespace are listed as 0.
+        for pid in filter(None, pids):
+            if advised >= budget:
+                return advised
+            try:
+                maps = Path(f"/proc/{pid}/maps").read_text()
+                advised += _madvise_willneed(pid, _anon_regions(maps, budget - advised))
+            except OSError as e:
+                if e.errno in (errno.EPERM, errno.EINVAL, errno.ENOSYS):
+                    log.debug(f"process_madvise not available: {e}")
+                    return advised
+                # the process exited in the meantime
+    return advised
+
+
+def _anon_regions(maps: str, limit: int) -> list[tuple[int, int]]:
+    """Private writable anonymous mappings from /proc/<pid>/maps, up to limit bytes."""
+    regions = []
+    for line in maps.splitlines():
+        fields = line.split(maxsplit=5)
+        if len(fields) < 5:
+            continue
+        path = fields[5].strip() if len(fields) == 6 else ""
+        perms = fields[1]
+        if "w" not in perms or not perms.endswith("p"):
+            continue
+        if path and path not in ("[heap]", "[stack]"):
+            continue
+        start, end = (int(a, 16) for a in fields[0].split("-"))
+        length = min(end - start, limit)
+        regions.append((start, length))
+        limit -= length
+        if limit <= 0:
+            break
+    return regions
+
+
+class _IoVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+_SYS_PROCESS_MADVISE = 440  # the same on x86_64 and arm64
+_MADV_WILLNEED = 3
+_IOV_MAX = 1024
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.syscall.restype = ctypes.c_long
+
+
+def _madvise_willneed(pid: int, regions: list[tuple[int, int]]) -> int:
+    advised = 0
+    pidfd = os.pidfd_open(pid)
     try:
-        (cgroup / "memory.reclaim").write_text(f"{current}\n")
-    except OSError as e:
-        # We request the container's full RSS, which can never be reclaimed in
-        # whole (some pages are always resident), so memory.reclaim returns
-        # EAGAIN on essentially every pause once it has paged out what it can —
-        # that is the expected terminal signal, not a failure. Only surface a
-        # warning for genuine errors (missing file, EPERM, ...).
-        if e.errno == errno.EAGAIN:
-            log.debug(
-                f"memory.reclaim reached EAGAIN for container {container_id} "
-                "(expected — paged out what it could)"
+        for i in range(0, len(regions), _IOV_MAX):
+            batch = regions[i : i + _IOV_MAX]
+            iovecs = (_IoVec * len(batch))(*batch)
+            result = _libc.syscall(
+                _SYS_PROCESS_MADVISE, pidfd, iovecs, len(batch), _MADV_WILLNEED, 0
             )
-        else:
-            log.warning(f"memory.reclaim failed for container {container_id}: {e}")
+            if result < 0:
+                e = ctypes.get_errno()
+                raise OSError(e, os.strerror(e))
+            advised += result
+    finally:
+        os.close(pidfd)
+    return advised
 
 
 def _find_cgroup(container_id: str) -> Path | None:
@@ -5,6 +5,7 @@ import string
 from datetime import datetime, timedelta, timezone
 
 import jwt
+from cachetools import TTLCache
 from pydantic import BaseModel
 
 from shard_core.database import database
@@ -12,12 +13,27 @@ from shard_core.database.connection import db_conn
 from shard_core.database import terminals as db_terminals
 from shard_core.settings import settings
 from shard_core.data_model.terminal import Terminal
+from shard_core.util.signals import on_terminals_update
 
 STORE_KEY_JWT_SECRET = "terminal_jwt_secret"
 STORE_KEY_PAIRING_CODE = "pairing_code"
+database.set_cache_ttl(STORE_KEY_JWT_SECRET, None)
 
 log = logging.getLogger(__name__)
 
+# Verified tokens, mapped to their terminal. Every forward-authenticated request
+# carries the same cookie, so this spares a terminal lookup per request. Cleared
+# on every terminal change so a deleted or renamed terminal is never served stale.
+_VERIFIED_TERMINAL_CACHE_SIZE = 1024
+_VERIFIED_TERMINAL_CACHE_TTL = 60
+_verified_terminals: TTLCache[str, Terminal] = TTLCache(
+    maxsize=_VERIFIED_TERMINAL_CACHE_SIZE, ttl=_VERIFIED_TERMINAL_CACHE_TTL
+)
+# Bumped on invalidation, so a lookup that raced a terminal change is not cached.
+_verified_terminals_generation = 0
+
+_jwt_secret: str | None = None
+
 
 class PairingCode(BaseModel):
     code: str
@@ -70,32 +86,48 @@ async def verify_terminal_jwt(token: str = None):
     if not token:
         raise InvalidJwt("Missing JWT")
 
-    jwt_secret = await _ensure_jwt_secret()
-
     bearer = "Bearer "
     if token.startswith(bearer):
         token = token[len(bearer) :]
 
+    if terminal := _verified_terminals.get(token):
+        return terminal
+
+    jwt_secret = await _ensure_jwt_secret()
+
     try:
         decoded_token = jwt.decode(token, jwt_secret, algorithms=["HS256"])
     except jwt.InvalidTokenError as e:
         raise InvalidJwt from e
 
+    generation = _verified_terminals_generation
     async with db_conn() as conn:
         terminal = await db_terminals.get_by_id(conn, decoded_token["sub"])
-        if terminal:
-            return Terminal(**terminal)
-        else:
-            raise InvalidJwt
+    if not terminal:
+        raise InvalidJwt
+    terminal = Terminal(**terminal)
+    if generation == _verified_terminals_generation:
+        _verified_terminals[token] = terminal
+    return terminal
 
 
 async def _ensure_jwt_secret():
-    try:
-        return await database.get_value(STORE_KEY_JWT_SECRET)
-    except KeyError:
-        jwt_secret = secrets.token_urlsafe(settings().terminal.jwt_secret_length)
-        await database.set_value(STORE_KEY_JWT_SECRET, jwt_secret)
-        return jwt_secret
+    global _jwt_secret
+    if _jwt_secret is None:
+        try:
+            _jwt_secret = await database.get_value(STORE_KEY_JWT_SECRET)
+        except KeyError:
+            jwt_secret = secrets.token_urlsafe(settings().terminal.jwt_secret_length)
+            await database.set_value(STORE_KEY_JWT_SECRET, jwt_secret)
+            _jwt_secret = jwt_secret
+    return _jwt_secret
+
+
+@on_terminals_update.connect
+async def _invalidate_verified_terminals(_):
+    global _verified_terminals_generation
+    _verified_terminals_generation += 1
+    _verified_terminals.clear()
 
 
 class InvalidPairingCode(Exception):
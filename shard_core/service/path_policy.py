@@ -0,0 +1,112 @@
+"""Precompiled path policies for the forward-auth endpoint.
+
+Every request Traefik forwards to /internal/auth is matched against the `paths`
+table of the app's metadata, longest prefix first. The table is compiled once
+per app into a prefix lookup and kept until the next on_apps_update, so the hot
+path neither re-reads app_meta.json nor re-sorts the paths. Header templates
+are compiled along with the policy, and their rendered values are kept per auth
+state, since a page load sends the same credentials with every asset request.
+"""
+
+import logging
+from typing import Dict, Optional
+
+from cachetools import LRUCache
+from jinja2.sandbox import SandboxedEnvironment
+
+from shard_core.data_model.auth import AuthState
+from shard_core.data_model.identity import SafeIdentity
+from shard_core.database.connection import db_conn
+from shard_core.database import installed_apps as db_installed_apps
+from shard_core.data_model.app_meta import Path
+from shard_core.service.app_tools import get_app_metadata, MetadataNotFound
+from shard_core.util import signals
+
+log = logging.getLogger(__name__)
+
+_template_env = SandboxedEnvironment()
+
+_RENDERED_HEADERS_CACHE_SIZE = 256
+
+
+class CompiledPath:
+    """A path entry of an app with its header templates compiled."""
+
+    def __init__(self, path: Path):
+        self.access = path.access
+        self.headers = path.headers
+        self._header_templates = {
+            key: _template_env.from_string(template)
+            for key, template in (path.headers or {}).items()
+        }
+        self._rendered: LRUCache[tuple, dict[str, str]] = LRUCache(
+            maxsize=_RENDERED_HEADERS_CACHE_SIZE
+        )
+
+    def render_headers(
+        self, auth_state: AuthState, portal: SafeIdentity
+    ) -> dict[str, str]:
+        if not self._header_templates:
+            return {}
+        key = (
+            auth_state.type,
+            auth_state.id,
+            auth_state.name,
+            portal.id,
+            portal.domain,
+        )
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            auth = auth_state.header_values
+            rendered = {
+                header_key: template.render(auth=auth, portal=portal)
+                for header_key, template in self._header_templates.items()
+            }
+            self._rendered[key] = rendered
+        return rendered
+
+
+class PathPolicy:
+    """Longest-prefix lookup over an app's path table.
+
+    Prefixes are grouped by length, so a match costs one dict lookup per
+    distinct prefix length instead of a sort and a scan over all prefixes.
+    """
+
+    def __init__(self, paths: Dict[str, Path]):
+        self._paths = {prefix: CompiledPath(path) for prefix, path in paths.items()}
+        self._prefix_lengths = sorted({len(p) for p in self._paths}, reverse=True)
+
+    def match(self, uri: str) -> Optional[CompiledPath]:
+        for length in self._prefix_lengths:
+            props = self._paths.get(uri[:length])
+            if props is not None:
+                return props
+        return None
+
+
+_policies: dict[str, PathPolicy] = {}
+
+
+def get_path_policy(app_name: str) -> PathPolicy:
+    policy = _policies.get(app_name)
+    if policy is None:
+        policy = PathPolicy(get_app_metadata(app_name).paths)
+        _policies[app_name] = policy
+    return policy
+
+
+async def compile_all_path_policies():
+    async with db_conn() as conn:
+        all_apps = await db_installed_apps.get_all(conn)
+    for app in all_apps:
+        try:
+            get_path_policy(app["name"])
+        except MetadataNotFound:
+            log.debug(f"no metadata for app {app['name']}, no path policy compiled")
+    log.debug(f"compiled path policies for {len(_policies)} apps")
+
+
+@signals.on_apps_update.connect
+async def _invalidate_path_policies(_):
+    _policies.clear()
@@ -6,23 +6,53 @@ controller-client dependency chain — importing telemetry from app_tools
 trips the pre-existing signed_call/portal_controller import cycle.
 
 Reset after each successful telemetry send. Lost on restart, like every
-other telemetry counter.
+other telemetry counter. The cold-start histograms and reclaimed bytes are not
+part of the telemetry payload; they are served by the stats API and accumulate
+until restart. Transitions, pause latencies and memory pressure are also
+counted for the metrics endpoint, whether telemetry is enabled or not, and
+never reset.
 """
 
 from typing import Dict, List
 
 from shard_core.settings import settings
+from shard_core.util.histogram import LogHistogram
+from shard_core.util.metrics import registry
 
 app_transitions: Dict[str, Dict[str, int]] = {}
-pause_latencies_ms: List[float] = []
-unpause_latencies_ms: List[float] = []
+pause_latencies_ms = LogHistogram()
+unpause_latencies_ms = LogHistogram()
+# the latest samples, sent as they are with the telemetry
 psi_snapshots: List[float] = []
 
-_MAX_LATENCY_SAMPLES = 1000
 _MAX_PSI_SNAPSHOTS = 120
 
+# app name -> start type -> time from the waking access to the first response
+cold_starts: Dict[str, Dict[str, LogHistogram]] = {}
+# app name -> bytes paged out by memory.reclaim after pausing
+reclaimed_bytes: Dict[str, int] = {}
+
+transitions_total = registry.counter(
+    "shard_core_app_transitions_total",
+    "App status transitions.",
+    ["app", "from_status", "to_status"],
+)
+pause_seconds = registry.summary(
+    "shard_core_app_pause_seconds", "Time to pause an app.", divisor=1000
+)
+unpause_seconds = registry.summary(
+    "shard_core_app_unpause_seconds", "Time to unpause an app.", divisor=1000
+)
+psi_some_avg10 = registry.summary(
+    "shard_core_memory_psi_some_avg10",
+    "Memory pressure stall percentage (PSI some avg10) sampled by the monitor.",
+)
+
 
 def record_app_transition(app_name: str, from_status, to_status):
+    transitions_total.inc(
+        app=app_name, from_status=from_status.value, to_status=to_status.value
+    )
     if not settings().telemetry.enabled:
         return
     key = f"{from_status.value}_to_{to_status.value}"
@@ -31,24 +61,49 @@ def record_app_transition(app_name: str, from_status, to_status):
 
 
 def record_pause_latency(milliseconds: float):
+    pause_seconds.observe(milliseconds)
     if not settings().telemetry.enabled:
         return
-    if len(pause_latencies_ms) < _MAX_LATENCY_SAMPLES:
-        pause_latencies_ms.append(milliseconds)
+    pause_latencies_ms.record(milliseconds)
 
 
 def record_unpause_latency(milliseconds: float):
+    unpause_seconds.observe(milliseconds)
     if not settings().telemetry.enabled:
         return
-    if len(unpause_latencies_ms) < _MAX_LATENCY_SAMPLES:
-        unpause_latencies_ms.append(milliseconds)
+    unpause_latencies_ms.record(milliseconds)
 
 
-def record_psi_snapshot(psi_some_avg10: float):
+def record_psi_snapshot(psi: float):
+    psi_some_avg10.observe(psi)
     if not settings().telemetry.enabled:
         return
-    if len(psi_snapshots) < _MAX_PSI_SNAPSHOTS:
-        psi_snapshots.append(psi_some_avg10)
+    psi_snapshots.append(psi)
+    if len(psi_snapshots) > _MAX_PSI_SNAPSHOTS:
+        del psi_snapshots[0]
+
+
+def record_cold_start(app_name: str, start_type: str, milliseconds: float):
+    histograms = cold_starts.setdefault(app_name, {})
+    if start_type not in histograms:
+        histograms[start_type] = LogHistogram()
+    histograms[start_type].record(milliseconds)
+
+
+def record_reclaim(app_name: str, num_bytes: int):
+    reclaimed_bytes[app_name] = reclaimed_bytes.get(app_name, 0) + num_bytes
+
+
+def get_mean_cold_start_ms(app_name: str, start_type: str) -> float | None:
+    histogram = cold_starts.get(app_name, {}).get(start_type)
+    return histogram.mean if histogram else None
+
+
+def get_cold_starts() -> Dict[str, Dict[str, dict]]:
+    return {
+        app: {start_type: h.to_dict() for start_type, h in histograms.items()}
+        for app, histograms in cold_starts.items()
+    }
 
 
 def reset():
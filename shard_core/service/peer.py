@@ -11,6 +11,7 @@ from shard_core.database.connection import db_conn
 from shard_core.database import peers as db_peers
 from shard_core.data_model.identity import OutputIdentity
 from shard_core.data_model.peer import Peer
+from shard_core.service import peer_registry
 from shard_core.service.crypto import PublicKey
 from shard_core.util import signals
 
@@ -45,6 +46,7 @@ async def update_peer_meta(peer: Peer):
         log.debug(f"Could not find peer {peer.short_id}: {e}")
         async with db_conn() as conn:
             await db_peers.update_by_id(conn, peer.id, {"is_reachable": False})
+        await signals.on_peers_update.send_async()
         return
 
     try:
@@ -53,6 +55,7 @@ async def update_peer_meta(peer: Peer):
         log.debug(f"Could not update peer meta for {peer.short_id}: {e}")
         async with db_conn() as conn:
             await db_peers.update_by_id(conn, peer.id, {"is_reachable": False})
+        await signals.on_peers_update.send_async()
         return
 
     peer_identity = OutputIdentity(**response.json())
@@ -67,6 +70,7 @@ async def update_peer_meta(peer: Peer):
         await db_peers.update_by_id(
             conn, peer.id, updated_peer.model_dump(exclude={"id"})
         )
+    await signals.on_peers_update.send_async()
 
 
 def output_identity_to_peer(identity: OutputIdentity) -> Peer:
@@ -82,14 +86,8 @@ async def verify_peer_auth(request: Request) -> Peer:
     host = request.headers["X-Forwarded-host"]
     uri = request.headers["X-Forwarded-uri"]
 
-    # Pre-load all peers so the sync key resolver can look them up without DB access
-    async with db_conn() as conn:
-        all_peers = await db_peers.get_all(conn)
-    peers_by_prefix = {}
-    for p in all_peers:
-        peer = Peer(**p)
-        prefix = peer.short_id
-        peers_by_prefix[prefix] = peer
+    # Load the registry up front so the sync key resolver needs no DB access
+    peers_by_short_id = await peer_registry.get_peer_entries()
 
     prepared_request = requests.Request(
         method=method,
@@ -101,24 +99,24 @@ async def verify_peer_auth(request: Request) -> Peer:
     verify_result = HTTPSignatureAuth.verify(
         prepared_request,
         signature_algorithm=algorithms.RSA_PSS_SHA512,
-        key_resolver=_PreloadedKR(peers_by_prefix),
+        key_resolver=_PreloadedKR(peers_by_short_id),
     )
-    return await get_peer_by_id(verify_result.parameters["keyid"])
+    return peers_by_short_id[verify_result.parameters["keyid"]].peer
 
 
 class _PreloadedKR(HTTPSignatureKeyResolver):
     """Key resolver that uses pre-loaded peers to avoid async DB calls in sync context."""
 
-    def __init__(self, peers_by_prefix: dict[str, Peer]):
-        self._peers_by_prefix = peers_by_prefix
+    def __init__(self, peers_by_short_id: dict[str, peer_registry.PeerEntry]):
+        self._peers_by_short_id = peers_by_short_id
 
     def resolve_private_key(self, key_id: str):
         pass
 
     def resolve_public_key(self, key_id: str):
-        peer = self._peers_by_prefix.get(key_id)
-        if peer and peer.public_bytes_b64:
-            return peer.public_bytes_b64.encode()
+        entry = self._peers_by_short_id.get(key_id)
+        if entry and entry.public_key:
+            return entry.public_key
         raise KeyError(f"No public key known for peer id {key_id}")
 
 
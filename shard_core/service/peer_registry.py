@@ -0,0 +1,72 @@
+"""In-memory registry of known peers for peer-signature verification.
+
+Peers are read from the database once and kept with their public key already
+parsed and checked against their id, so verifying a signed request is a dict
+lookup instead of a table scan that parses and hashes every peer's key. The
+registry is dropped on every peer write or deletion and reloaded on next use.
+"""
+
+import logging
+from dataclasses import dataclass
+
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+from pydantic import ValidationError
+
+from shard_core.database.connection import db_conn
+from shard_core.database import peers as db_peers
+from shard_core.data_model.peer import Peer
+from shard_core.util import signals
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PeerEntry:
+    peer: Peer
+    public_key: RSAPublicKey | None
+
+
+_entries: dict[str, PeerEntry] | None = None
+_generation = 0
+
+
+async def get_all_peers() -> list[Peer]:
+    return [e.peer for e in (await get_peer_entries()).values()]
+
+
+async def get_peer_entries() -> dict[str, PeerEntry]:
+    """All valid peers by short id. The returned dict must not be modified."""
+    global _entries
+    if _entries is not None:
+        return _entries
+    generation = _generation
+    async with db_conn() as conn:
+        rows = await db_peers.get_all(conn)
+    entries = {}
+    for row in rows:
+        entry = _make_entry(row)
+        if entry:
+            entries[entry.peer.short_id] = entry
+    if generation == _generation:
+        _entries = entries
+    log.debug(f"loaded {len(entries)} peers into registry")
+    return entries
+
+
+def _make_entry(row: dict) -> PeerEntry | None:
+    try:
+        # validation checks once that the public key hashes to the peer's id
+        peer = Peer(**row)
+    except ValidationError as e:
+        log.warning(f"ignoring invalid peer {row.get('id')}: {e}")
+        return None
+    public_key = peer.pubkey.key if peer.public_bytes_b64 else None
+    return PeerEntry(peer=peer, public_key=public_key)
+
+
+@signals.async_on_peer_write.connect
+@signals.on_peers_update.connect
+async def _invalidate_peer_registry(_):
+    global _entries, _generation
+    _generation += 1
+    _entries = None
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from requests.exceptions import HTTPError
 
@@ -8,6 +9,11 @@ from shard_core.service.signed_call import signed_request
 
 log = logging.getLogger(__name__)
 
+# how long the profile is served without asking the controller again
+PROFILE_MAX_AGE = 3600
+
+_profile_refresh: asyncio.Task | None = None
+
 
 async def _call_freeshard_controller(
     path: str, method: str = "GET", body: bytes = None
@@ -18,7 +24,47 @@ async def _call_freeshard_controller(
     return await signed_request(method, url, data=body)
 
 
+async def get_profile() -> profile.Profile | None:
+    """The profile, served from memory and refreshed in the background once stale.
+
+    Only waits for the controller if the profile was never fetched.
+    """
+    try:
+        p = await profile.get_profile()
+    except KeyError:
+        return await refresh_profile()
+    age = profile.profile_age()
+    if age is None or age > PROFILE_MAX_AGE:
+        _start_profile_refresh()
+    return p
+
+
 async def refresh_profile() -> profile.Profile | None:
+    """Fetch the profile from the controller.
+
+    Concurrent callers share a single outbound call and its result.
+    """
+    return await asyncio.shield(_start_profile_refresh())
+
+
+def _start_profile_refresh() -> asyncio.Task:
+    global _profile_refresh
+    if (
+        _profile_refresh is None
+        or _profile_refresh.done()
+        or _profile_refresh.get_loop() is not asyncio.get_running_loop()
+    ):
+        _profile_refresh = asyncio.create_task(_fetch_profile(), name="refresh profile")
+        _profile_refresh.add_done_callback(_log_refresh_error)
+    return _profile_refresh
+
+
+def _log_refresh_error(task: asyncio.Task):
+    if not task.cancelled() and (e := task.exception()):
+        log.warning(f"could not refresh profile: {e!r}")
+
+
+async def _fetch_profile() -> profile.Profile | None:
     response = await _call_freeshard_controller("shards/self")
     try:
         response.raise_for_status()
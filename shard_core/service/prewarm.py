@@ -0,0 +1,237 @@
+"""Start apps shortly before they are likely to be accessed.
+
+Each app's accesses are counted in 168 hour-of-week buckets (UTC), at most once
+per hour, so a bucket holds the number of weeks the app was used in that hour.
+Every PREWARM_INTERVAL, a stopped or paused app whose estimated probability of
+being accessed in the hour after PREWARM_LEAD crosses PREWARM_THRESHOLD is
+started, as long as there is memory headroom and PSI is below the demotion
+threshold. The estimate is the larger of the weekday-specific and the daily
+rate of that hour. The lifecycle keeps a pre-warmed app running until the end
+of that hour; memory pressure may still demote it.
+
+A pre-warm is a hit if the app is accessed within PREWARM_HIT_WINDOW and wasted
+otherwise; get_stats() reports both.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+
+from shard_core.database import database
+from shard_core.database.connection import db_conn
+from shard_core.database import installed_apps as db_installed_apps
+from shard_core.data_model.app_meta import InstalledApp, Status
+from shard_core.service import app_lifecycle, disk, memory_pressure
+from shard_core.service.app_tools import (
+    get_app_metadata,
+    size_is_compatible,
+    start_app,
+    MetadataNotFound,
+)
+from shard_core.settings import settings
+from shard_core.util import signals
+
+log = logging.getLogger(__name__)
+
+STORE_KEY_ACCESS_HISTOGRAMS = "app_access_histograms"
+
+PREWARM_INTERVAL = 300
+PREWARM_LEAD = 600
+PREWARM_THRESHOLD = 0.5
+PREWARM_HIT_WINDOW = PREWARM_LEAD + 3600
+PREWARM_MIN_AVAILABLE_KIB = 512 * 1024
+# no predictions for an app observed for less than this
+MIN_LEARNING_PERIOD = 3 * 86400
+
+_HOURS_PER_WEEK = 7 * 24
+_PREWARMABLE_STATUS = (Status.STOPPED, Status.DOWN, Status.PAUSED)
+
+
+@dataclass
+class AccessHistogram:
+    first_seen: float
+    hour_of_week: list[int] = field(default_factory=lambda: [0] * _HOURS_PER_WEEK)
+    # hours since the epoch of the last counted access
+    last_hour: int = -1
+
+    def record(self, at: float) -> bool:
+        hour = int(at // 3600)
+        if hour == self.last_hour:
+            return False
+        self.last_hour = hour
+        self.hour_of_week[_hour_of_week(at)] += 1
+        return True
+
+    def probability(self, at: float, now: float) -> float:
+        observed = now - self.first_seen
+        if observed < MIN_LEARNING_PERIOD:
+            return 0.0
+        slot = _hour_of_week(at)
+        weeks = max(1.0, observed / (7 * 86400))
+        days = max(1.0, observed / 86400)
+        weekly = self.hour_of_week[slot] / weeks
+        daily = sum(self.hour_of_week[slot % 24 :: 24]) / days
+        return min(1.0, max(weekly, daily))
+
+
+def _hour_of_week(at: float) -> int:
+    # the epoch was a Thursday; shift so that bucket 0 is Monday 00:00 UTC
+    return int((at // 3600 + 3 * 24) % _HOURS_PER_WEEK)
+
+
+@dataclass
+class PrewarmStats:
+    prewarms: int = 0
+    hits: int = 0
+    wasted: int = 0
+
+    @property
+    def hit_rate(self) -> float | None:
+        resolved = self.hits + self.wasted
+        return self.hits / resolved if resolved else None
+
+
+_histograms: dict[str, AccessHistogram] | None = None
+_dirty = False
+# app name -> when it was pre-warmed, until accessed or the hit window ends
+_pending: dict[str, float] = {}
+# app name -> hours since the epoch of the slot it was last pre-warmed for
+_prewarmed_slot: dict[str, int] = {}
+_stats = PrewarmStats()
+
+
+def get_stats() -> dict:
+    return {
+        "prewarms": _stats.prewarms,
+        "hits": _stats.hits,
+        "wasted": _stats.wasted,
+        "pending": len(_pending),
+        "hit_rate": _stats.hit_rate,
+    }
+
+
+async def _get_histograms() -> dict[str, AccessHistogram]:
+    global _histograms
+    if _histograms is None:
+        try:
+            stored = await database.get_value(STORE_KEY_ACCESS_HISTOGRAMS)
+        except KeyError:
+            stored = {}
+        if _histograms is None:
+            _histograms = {
+                name: AccessHistogram(**values) for name, values in stored.items()
+            }
+    return _histograms
+
+
+@signals.on_request_to_app.connect
+async def record_access(app: InstalledApp):
+    global _dirty
+    now = time.time()
+    prewarmed_at = _pending.pop(app.name, None)
+    if prewarmed_at is not None and now - prewarmed_at <= PREWARM_HIT_WINDOW:
+        _stats.hits += 1
+    histograms = await _get_histograms()
+    histogram = histograms.get(app.name)
+    if histogram is None:
+        histogram = histograms[app.name] = AccessHistogram(first_seen=now)
+    if histogram.record(now):
+        _dirty = True
+
+
+async def prewarm_apps():
+    if not settings().apps.lifecycle.prewarm_enabled:
+        return
+    now = time.time()
+    _expire_pending(now)
+    await _save_histograms()
+
+    if disk.current_disk_usage.disk_space_low:
+        return
+    target = now + PREWARM_LEAD
+    target_hour = int(target // 3600)
+    histograms = await _get_histograms()
+    candidates = [
+        name
+        for name, histogram in histograms.items()
+        if _prewarmed_slot.get(name) != target_hour
+        and histogram.probability(target, now) >= PREWARM_THRESHOLD
+    ]
+    if not candidates:
+        return
+
+    apps = await _get_installed_apps()
+    for name in candidates:
+        app = apps.get(name)
+        if app is None:
+            histograms.pop(name, None)
+            continue
+        if app["status"] not in _PREWARMABLE_STATUS:
+            continue
+        if not _has_headroom():
+            log.debug("not enough memory headroom to pre-warm apps")
+            return
+        try:
+            app_meta = get_app_metadata(name)
+        except MetadataNotFound:
+            continue
+        if app_meta.lifecycle.always_on or not await size_is_compatible(
+            app_meta.minimum_portal_size
+        ):
+            continue
+        _prewarmed_slot[name] = target_hour
+        log.info(f"pre-warming app {name}")
+        # held through the predicted hour, or idling would pause it right away
+        app_lifecycle.keep_alive_until[name] = (target_hour + 1) * 3600
+        try:
+            await start_app(name)
+        except Exception as e:
+            log.error(f"error pre-warming app {name}: {type(e).__name__}({e})")
+            del _prewarmed_slot[name]
+            app_lifecycle.keep_alive_until.pop(name, None)
+            continue
+        _pending[name] = now
+        _stats.prewarms += 1
+
+
+async def _get_installed_apps() -> dict[str, dict]:
+    async with db_conn() as conn:
+        return {a["name"]: a for a in await db_installed_apps.get_all(conn)}
+
+
+def _has_headroom() -> bool:
+    lifecycle_settings = settings().apps.lifecycle
+    psi = memory_pressure.read_memory_pressure()
+    if psi > lifecycle_settings.psi_threshold:
+        return False
+    available = memory_pressure.read_mem_available_kib()
+    return available is None or available >= PREWARM_MIN_AVAILABLE_KIB
+
+
+def _expire_pending(now: float):
+    for name, prewarmed_at in list(_pending.items()):
+        if now - prewarmed_at > PREWARM_HIT_WINDOW:
+            del _pending[name]
+            _stats.wasted += 1
+
+
+async def _save_histograms():
+    global _dirty
+    if not _dirty or _histograms is None:
+        return
+    _dirty = False
+    try:
+        await database.set_value(
+            STORE_KEY_ACCESS_HISTOGRAMS,
+            {
+                name: {
+                    "first_seen": h.first_seen,
+                    "hour_of_week": h.hour_of_week,
+                    "last_hour": h.last_hour,
+                }
+                for name, h in _histograms.items()
+            },
+        )
+    except Exception:
+        _dirty = True
+        raise
@@ -2,8 +2,6 @@ import asyncio
 import logging
 
 import requests
-from http_message_signatures import algorithms
-from requests_http_signature import HTTPSignatureAuth
 
 from shard_core.data_model.identity import Identity
 from shard_core.service import identity as identity_service
@@ -23,8 +21,4 @@ async def signed_request(
 
 async def get_signature_auth(identity: Identity = None):
     identity = identity or await identity_service.get_default_identity()
-    return HTTPSignatureAuth(
-        signature_algorithm=algorithms.RSA_PSS_SHA512,
-        key_id=identity.short_id,
-        key=identity.private_key.encode(),
-    )
+    return identity.key_material.signature_auth
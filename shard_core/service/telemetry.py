@@ -2,7 +2,7 @@ import datetime
 import logging
 import re
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Optional, Tuple
 
 from shard_core.data_model.backend.telemetry_model import Telemetry, PauseTierTelemetry
 from shard_core.service import pause_metrics
@@ -29,13 +29,6 @@ async def record_request(_):
     no_of_requests += 1
 
 
-def _percentile(samples: List[float], fraction: float) -> float:
-    if not 0.0 <= fraction <= 1.0:
-        raise ValueError(f"fraction must be between 0 and 1, was {fraction}")
-    ordered = sorted(samples)
-    return ordered[round(fraction * (len(ordered) - 1))]
-
-
 def _read_swap_kib() -> Tuple[Optional[int], Optional[int]]:
     try:
         text = MEMINFO_PATH.read_text()
@@ -53,8 +46,8 @@ def _build_pause_tier() -> Optional[PauseTierTelemetry]:
     m = pause_metrics
     if not (
         m.app_transitions
-        or m.pause_latencies_ms
-        or m.unpause_latencies_ms
+        or m.pause_latencies_ms.count
+        or m.unpause_latencies_ms.count
         or m.psi_snapshots
     ):
         return None
@@ -63,20 +56,10 @@ def _build_pause_tier() -> Optional[PauseTierTelemetry]:
         transitions={
             app: dict(counters) for app, counters in m.app_transitions.items()
         },
-        pause_latency_ms_p50=(
-            _percentile(m.pause_latencies_ms, 0.5) if m.pause_latencies_ms else None
-        ),
-        pause_latency_ms_p95=(
-            _percentile(m.pause_latencies_ms, 0.95) if m.pause_latencies_ms else None
-        ),
-        unpause_latency_ms_p50=(
-            _percentile(m.unpause_latencies_ms, 0.5) if m.unpause_latencies_ms else None
-        ),
-        unpause_latency_ms_p95=(
-            _percentile(m.unpause_latencies_ms, 0.95)
-            if m.unpause_latencies_ms
-            else None
-        ),
+        pause_latency_ms_p50=m.pause_latencies_ms.quantile(0.5),
+        pause_latency_ms_p95=m.pause_latencies_ms.quantile(0.95),
+        unpause_latency_ms_p50=m.unpause_latencies_ms.quantile(0.5),
+        unpause_latency_ms_p95=m.unpause_latencies_ms.quantile(0.95),
         psi_some_avg10_snapshots=list(m.psi_snapshots),
         swap_total_kib=swap_total_kib,
         swap_free_kib=swap_free_kib,
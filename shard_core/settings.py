@@ -50,6 +50,8 @@ class AppLifecycleSettings(BaseModel):
     )
     psi_threshold: float = 10.0  # /proc/pressure/memory `some avg10` demotion trigger
     pause_enabled: bool = False  # rollout kill-switch for the PAUSED+PAGED tier
+    prewarm_enabled: bool = False  # start apps ahead of predicted accesses
+    prefetch_enabled: bool = False  # swap a paused app back in on unpause
 
 
 class AppLastAccessSettings(BaseModel):
@@ -67,6 +69,13 @@ class AppPruningSettings(BaseModel):
     enabled: bool = False
 
 
+class AppDockerSettings(BaseModel):
+    max_concurrent_commands: int = 3  # docker and compose processes at once
+    command_timeout: int = 600  # seconds before a command is killed
+    # seconds before a command that may pull images is killed, 0 for never
+    pull_timeout: int = 0
+
+
 class AppsSettings(BaseModel):
     app_store: AppStoreSettings
     registries: list[RegistrySettings] = []
@@ -75,6 +84,7 @@ class AppsSettings(BaseModel):
     last_access: AppLastAccessSettings = AppLastAccessSettings()
     usage_reporting: AppUsageReportingSettings
     pruning: AppPruningSettings
+    docker: AppDockerSettings = AppDockerSettings()
 
 
 class TelemetrySettings(BaseModel):
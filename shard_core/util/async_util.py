@@ -8,8 +8,33 @@ from typing import Callable, Awaitable
 
 from croniter import croniter, CroniterBadCronError
 
+from shard_core.util.metrics import registry
+
 log = logging.getLogger(__name__)
 
+task_run_seconds = registry.summary(
+    "shard_core_background_task_run_seconds",
+    "Run time of periodic and cron tasks.",
+    ["task"],
+    min_value=1e-6,
+)
+task_errors_total = registry.counter(
+    "shard_core_background_task_errors_total",
+    "Runs of periodic and cron tasks that raised.",
+    ["task"],
+)
+
+
+async def _run_measured(name: str, func: Callable[[], Awaitable]):
+    started = time.monotonic()
+    try:
+        await func()
+    except Exception:
+        task_errors_total.inc(task=name)
+        raise
+    else:
+        task_run_seconds.observe(time.monotonic() - started, task=name)
+
 
 class BackgroundTask(ABC):
     @abstractmethod
@@ -49,7 +74,7 @@ class PeriodicTask(BackgroundTask):
     async def _run_delay(self):
         while True:
             try:
-                await self.func()
+                await _run_measured(self.name, self.func)
             except Exception as e:
                 log.error(
                     f"error in periodic task {self.name}: {type(e).__name__}({e})"
@@ -96,6 +121,6 @@ class CronTask(BackgroundTask):
             log.debug(f"next execution of cron task {self.name} in {delta:.2f} seconds")
             await asyncio.sleep(delta)
             try:
-                await self.func()
+                await _run_measured(self.name, self.func)
             except Exception as e:
                 log.error(f"error in cron task {self.name}: {type(e).__name__}({e})")
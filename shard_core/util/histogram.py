@@ -0,0 +1,113 @@
+import math
+
+
+class LogHistogram:
+    """Counts values in logarithmically sized buckets.
+
+    A value v lands in bucket ceil(log(v) / log(gamma)), so every bucket spans
+    the same ratio and any quantile is estimated within relative_accuracy of a
+    recorded value. Recording is O(1), memory is bounded by the number of
+    buckets between min_value and max_value (values below min_value count as
+    zero, values above max_value go to the last bucket), and two histograms
+    with the same parameters merge by adding counts. count, sum, min and max
+    are exact.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        min_value: float = 1e-3,
+        max_value: float = 1e9,
+    ):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(
+                f"relative_accuracy must be between 0 and 1, was {relative_accuracy}"
+            )
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._max_index = self._index(max_value)
+        self._buckets: dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def record(self, value: float):
+        if value < 0:
+            raise ValueError(f"value must not be negative, was {value}")
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value < self.min_value:
+            self._zero_count += 1
+            return
+        index = min(self._index(value), self._max_index)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def merge(self, other: "LogHistogram"):
+        if (other.relative_accuracy, other.min_value, other.max_value) != (
+            self.relative_accuracy,
+            self.min_value,
+            self.max_value,
+        ):
+            raise ValueError("cannot merge histograms with different parameters")
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, fraction: float) -> float | None:
+        """The value at rank round(fraction * (count - 1)), None if empty.
+
+        The lowest and highest ranks are the exact min and max.
+        """
+        if not 0.0 <= fraction <= 1.0:
+            raise ValueError(f"fraction must be between 0 and 1, was {fraction}")
+        if not self.count:
+            return None
+        rank = round(fraction * (self.count - 1))
+        if rank == self.count - 1:
+            return self.max
+        seen = self._zero_count
+        if rank < max(seen, 1):
+            return self.min
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                value = 2 * self._gamma**index / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float | None:
+        return self.sum / self.count if self.count else None
+
+    def clear(self):
+        self._buckets.clear()
+        self._zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
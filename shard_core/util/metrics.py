@@ -0,0 +1,182 @@
+"""A minimal metrics registry rendered in the Prometheus text format.
+
+Counters, gauges and summaries live at module level next to the code that
+updates them, created through the module-level registry. Values
+that the services already keep, like queue lengths or the connection pool's
+stats, are read when the metrics are scraped, by collectors that return
+unregistered metrics.
+"""
+
+import math
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from shard_core.util.histogram import LogHistogram
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric(ABC):
+    type: str
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterable[Tuple[str, Dict[str, str], float]]: ...
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {_escape_help(self.documentation)}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_render_labels(labels)} {_render_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError(f"counters only go up, got {amount}")
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = value
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Summary(Metric):
+    """Quantiles, sum and count of a LogHistogram per label set.
+
+    Values are divided by divisor, e.g. 1000 to report milliseconds as seconds.
+    Observed values below min_value count as zero, so it must suit the unit:
+    1e-6 resolves microseconds when observing seconds.
+    """
+
+    type = "summary"
+
+    def __init__(self, *args, divisor: float = 1, min_value: float = 1e-3, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.divisor = divisor
+        self.min_value = min_value
+        self.histograms: Dict[LabelValues, LogHistogram] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        if key not in self.histograms:
+            self.histograms[key] = LogHistogram(min_value=self.min_value)
+        self.histograms[key].record(value)
+
+    def add(self, histogram: LogHistogram, **labels):
+        """Report a histogram that is kept elsewhere."""
+        self.histograms[self._key(labels)] = histogram
+
+    def samples(self):
+        for key, histogram in self.histograms.items():
+            labels = dict(zip(self.labelnames, key))
+            for fraction in SUMMARY_QUANTILES:
+                value = histogram.quantile(fraction)
+                yield (
+                    self.name,
+                    {**labels, "quantile": str(fraction)},
+                    math.nan if value is None else value / self.divisor,
+                )
+            yield f"{self.name}_sum", labels, histogram.sum / self.divisor
+            yield f"{self.name}_count", labels, histogram.count
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))
+
+    def summary(self, *args, **kwargs) -> Summary:
+        return self.register(Summary(*args, **kwargs))
+
+    def register_collector(self, collector: Callable[[], Iterable[Metric]]):
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        metrics = list(self._metrics.values())
+        for collector in self._collectors:
+            metrics.extend(collector())
+        return "".join(metric.render() for metric in metrics)
+
+
+registry = Registry()
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", r"\\").replace("\n", r"\n")
+
+
+def _render_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    rendered = ",".join(
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\""),
+        )
+        for name, value in labels.items()
+    )
+    return "{" + rendered + "}"
+
+
+def _render_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
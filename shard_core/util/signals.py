@@ -11,6 +11,7 @@ on_request_to_app = Signal()
 on_app_install_error = Signal()
 
 async_on_peer_write = Signal()
+on_peers_update = Signal()
 on_peer_auth = Signal()
 
 on_backup_update = Signal()
@@ -1,10 +1,19 @@
 import asyncio
 import functools
+import heapq
+import itertools
 import logging
 import re
 import subprocess as _sp
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
 from pathlib import Path
 
+from shard_core.util.histogram import LogHistogram
+
 log = logging.getLogger(__name__)
 
 COMPOSE_FILE_NAME = "docker-compose.yml"
@@ -68,14 +77,173 @@ def app_compose_command(app_dir: Path) -> tuple[str, ...]:
     )
 
 
-async def subprocess(*args, cwd=None):
+class Priority(IntEnum):
+    """Order in which queued commands get a slot, lowest first."""
+
+    SHUTDOWN = -1  # process shutdown, never queued (see SubprocessExecutor)
+    WAKE = 0  # a user is waiting for the app
+    CONTROL = 1  # lifecycle control
+    MAINTENANCE = 2  # installation, pruning, registry login
+
+
+_priority: ContextVar[Priority] = ContextVar(
+    "subprocess_priority", default=Priority.CONTROL
+)
+
+
+@contextmanager
+def priority(p: Priority):
+    """Run the commands started within, and by tasks created within, at p."""
+    token = _priority.set(p)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@dataclass
+class CommandStats:
+    commands: int = 0
+    timeouts: int = 0
+    # seconds
+    queue_wait: LogHistogram = field(
+        default_factory=lambda: LogHistogram(min_value=1e-6)
+    )
+    run_time: LogHistogram = field(default_factory=lambda: LogHistogram(min_value=1e-6))
+
+    def record(self, queue_wait: float, run_time: float):
+        self.commands += 1
+        self.queue_wait.record(queue_wait)
+        self.run_time.record(run_time)
+
+    def to_dict(self) -> dict:
+        return {
+            "commands": self.commands,
+            "timeouts": self.timeouts,
+            "queue_wait": self.queue_wait.to_dict(),
+            "run_time": self.run_time.to_dict(),
+        }
+
+
+class SubprocessExecutor:
+    """Runs at most max_concurrency commands at a time, by priority.
+
+    Every docker and compose invocation forks a CLI process that takes a good
+    share of a small VM's CPU for a moment, so starting one per app at once
+    starves the event loop and the app a user is waiting for.
+
+    Commands at Priority.SHUTDOWN are not limited: when the core shuts down,
+    all apps are taken down at once, and in batches of max_concurrency that
+    would overrun the core container's stop_grace_period.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 3,
+        timeout: float = 600,
+        pull_timeout: float | None = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        # for commands that may pull images, which take as long as the link needs
+        self.pull_timeout = pull_timeout
+        self.stats = {p: CommandStats() for p in Priority}
+        self._running = 0
+        self._waiting: list[tuple[Priority, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    def configure(
+        self, max_concurrency: int, timeout: float, pull_timeout: float | None
+    ):
+        if max_concurrency < 1:
+            raise ValueError(
+                f"max_concurrency must be at least 1, was {max_concurrency}"
+            )
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.pull_timeout = pull_timeout
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, f in self._waiting if not f.done())
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    async def run(
+        self,
+        *args,
+        cwd=None,
+        timeout: float | None = None,
+        pulls_images: bool = False,
+    ) -> str:
+        if timeout is None:
+            timeout = self.pull_timeout if pulls_images else self.timeout
+        priority = _priority.get()
+        queued_at = time.monotonic()
+        await self._acquire(priority)
+        started_at = time.monotonic()
+        stats = self.stats[priority]
+        try:
+            return await _run(args, cwd, timeout)
+        except SubprocessTimeout:
+            stats.timeouts += 1
+            raise
+        finally:
+            self._release()
+            stats.record(started_at - queued_at, time.monotonic() - started_at)
+
+    async def _acquire(self, priority: Priority):
+        if priority == Priority.SHUTDOWN or (
+            self._running < self.max_concurrency and not self.queued
+        ):
+            self._running += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # the slot was handed over just before the cancellation
+                self._release()
+            raise
+
+    def _release(self):
+        # a finished command hands its slot to the next waiting one, unless
+        # unlimited shutdown commands keep more than max_concurrency running
+        while self._waiting and self._running <= self.max_concurrency:
+            _, _, future = heapq.heappop(self._waiting)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._running -= 1
+
+
+executor = SubprocessExecutor()
+
+
+async def subprocess(
+    *args, cwd=None, timeout: float | None = None, pulls_images: bool = False
+):
+    return await executor.run(
+        *args, cwd=cwd, timeout=timeout, pulls_images=pulls_images
+    )
+
+
+async def _run(args: tuple, cwd, timeout: float | None) -> str:
     process = await asyncio.create_subprocess_exec(
         *args, cwd=cwd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
     )
     log.debug(f'[{" ".join(args)}] started' + ("" if not cwd else f" in {cwd}"))
 
     try:
-        stdout, stderr = await process.communicate()
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise SubprocessTimeout(f'[{" ".join(args)}] timed out after {timeout}s')
     except asyncio.CancelledError:
         process.kill()
         await process.wait()
@@ -95,6 +263,10 @@ class SubprocessError(Exception):
     pass
 
 
+class SubprocessTimeout(SubprocessError):
+    pass
+
+
 class ComposeFileNotFound(Exception):
     pass
 
@@ -10,13 +10,14 @@ from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 
-from shard_core.service import disk
+from shard_core.service import container_state, disk
 from shard_core.service.app_tools import (
     get_app_metadata,
     MetadataNotFound,
     get_installed_apps_path,
     size_is_compatible,
 )
+from shard_core.util.subprocess import normalize_project_name
 
 log = logging.getLogger(__name__)
 
@@ -77,6 +78,11 @@ async def get_splash_behaviour(request: Request):
 
 
 def get_container_status(app_name):
+    containers = container_state.get_project_containers(
+        normalize_project_name(app_name)
+    )
+    if containers is not None:
+        return next((c.state for c in containers if c.name == app_name), "unknown")
     docker_client = get_docker_client()
     try:
         status = docker_client.containers.get(app_name).status
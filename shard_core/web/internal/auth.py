@@ -1,28 +1,35 @@
+import hashlib
 import logging
+from dataclasses import dataclass
 from typing import Optional
 
+from cachetools import LRUCache, TTLCache
 from fastapi import HTTPException, APIRouter, Cookie, Response, status, Header, Request
 from http_message_signatures import InvalidSignature
-from jinja2 import Template
 
 from shard_core.database.connection import db_conn
 from shard_core.database import installed_apps as db_installed_apps
 from shard_core.database import identities as db_identities
-from shard_core.data_model.app_meta import InstalledApp, Access, Path
+from shard_core.data_model.app_meta import InstalledApp, Access
 from shard_core.data_model.auth import AuthState
 from shard_core.data_model.identity import Identity, SafeIdentity
+from shard_core.data_model.terminal import Terminal
 from shard_core.service import pairing, peer as peer_service
-from shard_core.service.app_tools import get_app_metadata
+from shard_core.service.path_policy import get_path_policy, CompiledPath
 from shard_core.service.freeshard_controller import (
     validate_shared_secret,
     SharedSecretInvalid,
 )
+from shard_core.util.metrics import registry
 from shard_core.util.signals import (
     on_terminal_auth,
     on_request_to_app,
     on_peer_auth,
     on_apps_update,
     on_identity_update,
+    on_terminals_update,
+    on_peers_update,
+    async_on_peer_write,
 )
 
 log = logging.getLogger(__name__)
@@ -30,18 +37,56 @@ log = logging.getLogger(__name__)
 router = APIRouter()
 
 _identity_cache: Optional[SafeIdentity] = None
-_app_cache: dict[str, Optional[InstalledApp]] = {}
+# unknown hosts are cached as None, so the cache is bounded against scanners
+_app_cache: LRUCache[str, Optional[InstalledApp]] = LRUCache(maxsize=1024)
+
+
+@dataclass(frozen=True)
+class _AuthDecision:
+    granted: bool
+    headers: dict[str, str]
+    terminal: Optional[Terminal]
+
+
+# A page load sends dozens of requests with the same credentials, so the outcome
+# of /auth is kept for a few seconds per app, matched path and credential.
+_DECISION_TTL = 5
+_decision_cache: TTLCache[tuple, _AuthDecision] = TTLCache(
+    maxsize=4096, ttl=_DECISION_TTL
+)
+_decision_cache_generation = 0
+
+decisions_total = registry.counter(
+    "shard_core_auth_decisions_total",
+    "Forward auth decisions for app requests.",
+    ["decision", "cached"],
+)
+
+
+def _clear_decision_cache():
+    global _decision_cache_generation
+    _decision_cache_generation += 1
+    _decision_cache.clear()
 
 
 @on_identity_update.connect
 async def _invalidate_identity_cache(_):
     global _identity_cache
     _identity_cache = None
+    _clear_decision_cache()
 
 
 @on_apps_update.connect
 async def _invalidate_app_cache(_):
     _app_cache.clear()
+    _clear_decision_cache()
+
+
+@on_terminals_update.connect
+@on_peers_update.connect
+@async_on_peer_write.connect
+async def _invalidate_decision_cache(_):
+    _clear_decision_cache()
 
 
 @router.get("/authenticate_terminal", status_code=status.HTTP_200_OK)
@@ -81,40 +126,81 @@ async def authenticate_and_authorize(
 ):
     app = await _match_app(x_forwarded_host)
     path_object = _match_path(x_forwarded_uri, app)
-    auth_state = await _get_auth_state(request, authorization)
+
+    decision_key = _decision_key(request, authorization, app, path_object)
+    decision = _decision_cache.get(decision_key) if decision_key else None
+    cached = decision is not None
+    if decision is None:
+        generation = _decision_cache_generation
+        decision = await _decide(request, authorization, path_object)
+        if decision_key and generation == _decision_cache_generation:
+            _decision_cache[decision_key] = decision
+    elif decision.terminal:
+        await on_terminal_auth.send_async(decision.terminal)
+
+    decisions_total.inc(
+        decision="granted" if decision.granted else "denied",
+        cached=str(cached).lower(),
+    )
+    if not decision.granted:
+        log.debug(f"denied auth for {x_forwarded_host}{x_forwarded_uri}")
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED)
+
+    response.headers.update(decision.headers)
+    log.debug(
+        f"granted auth for {x_forwarded_host}{x_forwarded_uri} with headers {response.headers.items()}"
+    )
+
+    await on_request_to_app.send_async(app)
+
+
+def _decision_key(
+    request: Request,
+    authorization: Optional[str],
+    app: InstalledApp,
+    path_object: CompiledPath,
+) -> Optional[tuple]:
+    # A peer signature covers the individual request and is verified every time.
+    if "signature" in request.headers:
+        return None
+    credential = (
+        hashlib.sha256(authorization.encode()).digest() if authorization else None
+    )
+    # path_object stands for the matched prefix of the app's path table
+    return app.name, path_object, credential
+
+
+async def _decide(request, authorization, path_object: CompiledPath) -> _AuthDecision:
+    auth_state, terminal = await _get_auth_state(request, authorization)
     log.debug(f"Auth state is {auth_state}")
-    header_values = await _get_identity()
 
     if (
         path_object.access == Access.PRIVATE
         and auth_state.type != AuthState.ClientType.TERMINAL
     ):
-        log.debug(f"denied terminal auth for {x_forwarded_host}{x_forwarded_uri}")
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED)
+        log.debug("terminal auth required")
+        return _AuthDecision(granted=False, headers={}, terminal=terminal)
 
     if (
         path_object.access == Access.PEER
         and auth_state.type != AuthState.ClientType.PEER
     ):
-        log.debug(f"denied peer auth for {x_forwarded_host}{x_forwarded_uri}")
-        raise HTTPException(status.HTTP_401_UNAUTHORIZED)
-
-    if path_object.headers:
-        for header_key, header_template in path_object.headers.items():
-            response.headers[header_key] = Template(header_template).render(
-                auth=auth_state.header_values, portal=header_values
-            )
-    log.debug(
-        f"granted auth for {x_forwarded_host}{x_forwarded_uri} with headers {response.headers.items()}"
+        log.debug("peer auth required")
+        return _AuthDecision(granted=False, headers={}, terminal=terminal)
+
+    portal = await _get_identity()
+    return _AuthDecision(
+        granted=True,
+        headers=path_object.render_headers(auth_state, portal),
+        terminal=terminal,
     )
 
-    await on_request_to_app.send_async(app)
-
 
 async def _match_app(x_forwarded_host) -> InstalledApp:
     app_name = x_forwarded_host.split(".")[0]
     app = await _find_app(app_name)
     if not app:
+        decisions_total.inc(decision="unknown_app", cached="false")
         log.debug(f"denied auth for {x_forwarded_host} -> unknown app")
         raise HTTPException(status.HTTP_404_NOT_FOUND)
     return app
@@ -131,34 +217,36 @@ async def _get_identity():
 
 
 async def _find_app(app_name) -> Optional[InstalledApp]:
-    if app_name not in _app_cache:
-        async with db_conn() as conn:
-            result = await db_installed_apps.get_by_name(conn, app_name)
-        _app_cache[app_name] = InstalledApp(**result) if result else None
-    return _app_cache[app_name]
+    try:
+        return _app_cache[app_name]
+    except KeyError:
+        pass
+    async with db_conn() as conn:
+        result = await db_installed_apps.get_by_name(conn, app_name)
+    app = InstalledApp(**result) if result else None
+    _app_cache[app_name] = app
+    return app
 
 
-def _match_path(uri, app: InstalledApp) -> Path:
-    app_meta = get_app_metadata(app.name)
-    for path, props in sorted(
-        app_meta.paths.items(), key=lambda x: len(x[0]), reverse=True
-    ):  # type: (str, Path)
-        if uri.startswith(path):
-            return props
+def _match_path(uri, app: InstalledApp) -> CompiledPath:
+    return get_path_policy(app.name).match(uri)
 
 
-async def _get_auth_state(request, authorization) -> AuthState:
+async def _get_auth_state(
+    request, authorization
+) -> tuple[AuthState, Optional[Terminal]]:
     try:
         terminal = await pairing.verify_terminal_jwt(authorization)
     except pairing.InvalidJwt as e:
         log.debug(f"invalid terminal JWT: {e}")
     else:
         await on_terminal_auth.send_async(terminal)
-        return AuthState(
+        auth_state = AuthState(
             x_ptl_client_type=AuthState.ClientType.TERMINAL,
             x_ptl_client_id=terminal.id,
             x_ptl_client_name=terminal.name,
         )
+        return auth_state, terminal
 
     try:
         peer = await peer_service.verify_peer_auth(request)
@@ -168,12 +256,14 @@ async def _get_auth_state(request, authorization) -> AuthState:
         log.debug(f"no such peer: {e}")
     else:
         on_peer_auth.send(peer)
-        return AuthState(
+        auth_state = AuthState(
             x_ptl_client_type=AuthState.ClientType.PEER,
             x_ptl_client_id=peer.id,
             x_ptl_client_name=peer.name,
         )
+        return auth_state, None
 
-    return AuthState(
+    auth_state = AuthState(
         x_ptl_client_type=AuthState.ClientType.ANONYMOUS,
     )
+    return auth_state, None
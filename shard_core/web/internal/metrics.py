@@ -0,0 +1,127 @@
+import logging
+
+from fastapi import APIRouter, Response
+
+from shard_core.database import connection
+from shard_core.service import app_lifecycle, pause_metrics, prewarm, websocket
+from shard_core.service.app_installation import worker
+from shard_core.util.metrics import CONTENT_TYPE, Counter, Gauge, Summary, registry
+from shard_core.util.subprocess import executor as subprocess_executor
+
+log = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+@registry.register_collector
+def _collect_db_pool():
+    try:
+        pool = connection.get_connection_pool()
+    except RuntimeError:
+        return []
+    gauge = Gauge(
+        "shard_core_db_pool",
+        "Statistics of the database connection pool, as reported by psycopg_pool.",
+        ["stat"],
+    )
+    for stat, value in pool.get_stats().items():
+        gauge.set(value, stat=stat)
+    return [gauge]
+
+
+@registry.register_collector
+def _collect_queues():
+    installation_queue = Gauge(
+        "shard_core_installation_queue_length",
+        "App installation tasks waiting for the worker.",
+    )
+    installation_queue.set(worker.installation_worker.queued)
+    ws_connections = Gauge(
+        "shard_core_websocket_connections", "Open websocket connections."
+    )
+    ws_connections.set(len(websocket.ws_worker.active_sockets))
+    ws_queue = Gauge(
+        "shard_core_websocket_queue_length", "Websocket messages waiting to be sent."
+    )
+    ws_queue.set(websocket.ws_worker.outgoing_messages.qsize())
+    return [installation_queue, ws_connections, ws_queue]
+
+
+@registry.register_collector
+def _collect_subprocesses():
+    queued = Gauge(
+        "shard_core_subprocess_queued", "Docker commands waiting for a slot."
+    )
+    queued.set(subprocess_executor.queued)
+    running = Gauge("shard_core_subprocess_running", "Docker commands running.")
+    running.set(subprocess_executor.running)
+    commands = Counter(
+        "shard_core_subprocess_commands_total",
+        "Finished docker commands by priority.",
+        ["priority"],
+    )
+    timeouts = Counter(
+        "shard_core_subprocess_timeouts_total",
+        "Docker commands killed after the timeout, by priority.",
+        ["priority"],
+    )
+    queue_wait = Summary(
+        "shard_core_subprocess_queue_wait_seconds",
+        "Time docker commands waited for a slot, by priority.",
+        ["priority"],
+    )
+    run_time = Summary(
+        "shard_core_subprocess_run_seconds",
+        "Run time of docker commands, by priority.",
+        ["priority"],
+    )
+    for p, stats in subprocess_executor.stats.items():
+        name = p.name.lower()
+        commands.inc(stats.commands, priority=name)
+        timeouts.inc(stats.timeouts, priority=name)
+        queue_wait.add(stats.queue_wait, priority=name)
+        run_time.add(stats.run_time, priority=name)
+    return [queued, running, commands, timeouts, queue_wait, run_time]
+
+
+@registry.register_collector
+def _collect_app_tier():
+    cold_starts = Summary(
+        "shard_core_app_cold_start_seconds",
+        "Time from an access that woke an app to its first response.",
+        ["app", "start_type"],
+        divisor=1000,
+    )
+    for app, histograms in pause_metrics.cold_starts.items():
+        for start_type, histogram in histograms.items():
+            cold_starts.add(histogram, app=app, start_type=start_type)
+    reclaimed = Counter(
+        "shard_core_app_reclaimed_bytes_total",
+        "Memory paged out of paused apps.",
+        ["app"],
+    )
+    for app, num_bytes in pause_metrics.reclaimed_bytes.items():
+        reclaimed.inc(num_bytes, app=app)
+    demotions = Counter(
+        "shard_core_pressure_demotions_total",
+        "Apps demoted in response to memory pressure stalls.",
+    )
+    demotions.inc(app_lifecycle.psi_monitor.demotions)
+    stats = prewarm.get_stats()
+    prewarms = Counter(
+        "shard_core_prewarms_total", "Apps started ahead of a predicted access."
+    )
+    prewarms.inc(stats["prewarms"])
+    prewarm_outcomes = Counter(
+        "shard_core_prewarm_outcomes_total",
+        "Pre-warmed apps that were accessed in time (hit) or not (wasted).",
+        ["outcome"],
+    )
+    prewarm_outcomes.inc(stats["hits"], outcome="hit")
+    prewarm_outcomes.inc(stats["wasted"], outcome="wasted")
+    return [cold_starts, reclaimed, demotions, prewarms, prewarm_outcomes]
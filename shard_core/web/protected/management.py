@@ -18,10 +18,7 @@ async def get_profile(refresh: bool = False):
     if refresh:
         p = await portal_controller.refresh_profile()
     else:
-        try:
-            p = await profile.get_profile()
-        except KeyError:
-            p = await portal_controller.refresh_profile()
+        p = await portal_controller.get_profile()
     if p:
         return p
     else:
@@ -8,6 +8,7 @@ from shard_core.database import peers as db_peers
 from shard_core.data_model.peer import Peer, InputPeer
 from shard_core.util import signals
 import shard_core.service.peer as peer_service
+from shard_core.service import peer_registry
 
 log = logging.getLogger(__name__)
 
@@ -18,11 +19,10 @@ router = APIRouter(
 
 @router.get("", response_model=List[Peer])
 async def list_all_peers(name: str = None):
-    async with db_conn() as conn:
-        if name:
+    if name:
+        async with db_conn() as conn:
             return await db_peers.search_by_name(conn, name)
-        else:
-            return await db_peers.get_all(conn)
+    return await peer_registry.get_all_peers()
 
 
 @router.get("/{id}", response_model=Peer)
@@ -57,6 +57,7 @@ async def put_peer(p: InputPeer):
 async def delete_peer(id):
     async with db_conn() as conn:
         deleted = await db_peers.remove_by_id_prefix(conn, id)
+    await signals.on_peers_update.send_async()
     if deleted > 1:
         log.critical(f"during deleting of peer {id}, {deleted} peers were deleted")
     log.info(f"removed peer {id}")
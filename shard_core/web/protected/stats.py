@@ -2,8 +2,9 @@ import logging
 
 from fastapi import APIRouter, status
 
-from shard_core.service import disk
+from shard_core.service import app_lifecycle, disk, pause_metrics, prewarm
 from shard_core.service.app_installation.worker import installation_worker
+from shard_core.util.subprocess import executor as subprocess_executor
 
 log = logging.getLogger(__name__)
 
@@ -30,3 +31,35 @@ async def tasks():
             ],
         }
     }
+
+
+@router.get("/reclaim", status_code=status.HTTP_200_OK)
+async def reclaim():
+    return pause_metrics.reclaimed_bytes
+
+
+@router.get("/subprocesses", status_code=status.HTTP_200_OK)
+async def subprocesses():
+    return {
+        "max_concurrency": subprocess_executor.max_concurrency,
+        "queued": subprocess_executor.queued,
+        "by_priority": {
+            p.name.lower(): stats.to_dict()
+            for p, stats in subprocess_executor.stats.items()
+        },
+    }
+
+
+@router.get("/prewarm", status_code=status.HTTP_200_OK)
+async def prewarm_stats():
+    return prewarm.get_stats()
+
+
+@router.get("/cold_starts", status_code=status.HTTP_200_OK)
+async def cold_starts():
+    return pause_metrics.get_cold_starts()
+
+
+@router.get("/demotion", status_code=status.HTTP_200_OK)
+async def demotion():
+    return app_lifecycle.last_demotion
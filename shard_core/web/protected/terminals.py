@@ -50,9 +50,9 @@ async def edit_terminal(id_: str, terminal: InputTerminal):
             await db_terminals.update(
                 conn, id_, {"name": terminal.name, "icon": terminal.icon}
             )
-            await on_terminals_update.send_async()
-        else:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not t:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    await on_terminals_update.send_async()
 
 
 @router.delete(
@@ -1,3 +1,9 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from shard_core.util.metrics import registry
+
 ALL_HTTP_METHODS = [
     "GET",
     "HEAD",
@@ -9,3 +15,46 @@ ALL_HTTP_METHODS = [
     "TRACE",
     "PATCH",
 ]
+
+ROUTERS = ("internal", "public", "protected", "management")
+
+requests_total = registry.counter(
+    "shard_core_http_requests_total",
+    "HTTP requests by router and status code.",
+    ["router", "status"],
+)
+request_seconds = registry.summary(
+    "shard_core_http_request_seconds",
+    "Time until an HTTP response is sent completely, by router.",
+    ["router"],
+    min_value=1e-6,
+)
+
+
+class RequestMetricsMiddleware:
+    """Counts and times HTTP requests per top-level router."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        segment = scope["path"].strip("/").split("/", 1)[0]
+        router = segment if segment in ROUTERS else "other"
+        status = 500
+        started = time.monotonic()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_total.inc(router=router, status=str(status))
+            request_seconds.observe(time.monotonic() - started, router=router)
@@ -0,0 +1,188 @@
+"""Throughput of /internal/auth, the request path of every app hit.
+
+Drives the endpoint through the full app (lifespan, Postgres, mock app store)
+with the request mixes Traefik forwards: a paired terminal's cookie, anonymous
+requests to a public path, peer-signed requests and hosts of unknown apps. For
+each mix, requests per second, p50/p99 latency and DB queries per request are
+printed; run with `-s` to see them. The query budgets are asserted, timings are
+only reported.
+"""
+
+import random
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import pytest
+from http_message_signatures import algorithms
+from httpx import AsyncClient, Request
+from psycopg import AsyncCursor
+from requests import Request as RequestsRequest
+from requests_http_signature import HTTPSignatureAuth
+from starlette import status
+
+from shard_core.data_model.identity import OutputIdentity
+from tests.util import (
+    install_app,
+    pair_new_terminal,
+    modify_request_like_traefik_forward_auth,
+)
+
+WARMUP_REQUESTS = 10
+MEASURED_REQUESTS = 200
+
+
+@dataclass
+class _Mix:
+    name: str
+    make_request: Callable[[int], Request]
+    expected_status: int
+    max_queries_per_request: float
+
+
+@dataclass
+class _Result:
+    name: str
+    rps: float
+    p50_ms: float
+    p99_ms: float
+    queries_per_request: float
+
+    def __str__(self):
+        return (
+            f"{self.name:<18} {self.rps:>8.0f} rps   p50 {self.p50_ms:>7.2f} ms"
+            f"   p99 {self.p99_ms:>7.2f} ms   {self.queries_per_request:>5.2f} queries/req"
+        )
+
+
+@pytest.fixture
+def db_query_counter(mocker):
+    counter = {"queries": 0}
+    original_execute = AsyncCursor.execute
+
+    async def counting_execute(self, *args, **kwargs):
+        counter["queries"] += 1
+        return await original_execute(self, *args, **kwargs)
+
+    mocker.patch.object(AsyncCursor, "execute", counting_execute)
+    return counter
+
+
+async def test_forward_auth_throughput(
+    api_client: AsyncClient, peer_mock_requests, db_query_counter
+):
+    await install_app(api_client, "mock_app")
+    domain = OutputIdentity(
+        **(await api_client.get("public/meta/whoareyou")).json()
+    ).domain
+
+    await pair_new_terminal(api_client, "T1")
+    terminal_cookie = api_client.cookies["authorization"]
+    api_client.cookies.clear()
+
+    peer = peer_mock_requests.identity
+    response = await api_client.put(
+        "protected/peers", json={"id": peer.short_id, "name": "peer"}
+    )
+    response.raise_for_status()
+    peer_auth = HTTPSignatureAuth(
+        signature_algorithm=algorithms.RSA_PSS_SHA512,
+        key_id=peer.short_id,
+        key=peer.private_key.encode(),
+    )
+
+    def forward_auth_request(host: str, uri: str, cookie: str = None) -> Request:
+        headers = {"X-Forwarded-Host": host, "X-Forwarded-Uri": uri}
+        if cookie:
+            headers["Cookie"] = f"authorization={cookie}"
+        return api_client.build_request("GET", "internal/auth", headers=headers)
+
+    def peer_request(i: int) -> Request:
+        signed = RequestsRequest(
+            method="GET", url=f"https://mock_app.{domain}/peer/{i}", auth=peer_auth
+        ).prepare()
+        return modify_request_like_traefik_forward_auth(signed)
+
+    mixes = [
+        _Mix(
+            "terminal cookie",
+            lambda i: forward_auth_request(
+                f"mock_app.{domain}", f"/private/{i}", terminal_cookie
+            ),
+            status.HTTP_200_OK,
+            max_queries_per_request=0.5,
+        ),
+        _Mix(
+            "anonymous public",
+            lambda i: forward_auth_request(f"mock_app.{domain}", f"/pub/{i}"),
+            status.HTTP_200_OK,
+            max_queries_per_request=0.5,
+        ),
+        _Mix(
+            "peer signature",
+            peer_request,
+            status.HTTP_200_OK,
+            max_queries_per_request=0.5,
+        ),
+        _Mix(
+            "unknown host",
+            lambda i: forward_auth_request(f"unknown{i}.{domain}", "/"),
+            status.HTTP_404_NOT_FOUND,
+            # every random subdomain is looked up once
+            max_queries_per_request=1.5,
+        ),
+    ]
+
+    # mostly terminal traffic, as in a typical shard
+    weights = [14, 2, 2, 2]
+    blended = _Mix(
+        "blended",
+        lambda i: random.choices(mixes, weights)[0].make_request(i),
+        -1,
+        max_queries_per_request=1.5,
+    )
+    runs = [*mixes, blended]
+
+    results = []
+    for mix in runs:
+        results.append(await _run_mix(api_client, mix, db_query_counter))
+
+    print("\n/internal/auth throughput")
+    for result in results:
+        print(result)
+
+    for mix, result in zip(runs, results, strict=True):
+        assert result.queries_per_request <= mix.max_queries_per_request, str(result)
+
+
+async def _run_mix(api_client: AsyncClient, mix: _Mix, db_query_counter) -> _Result:
+    # Requests are built ahead so that signing them is not measured.
+    requests = [mix.make_request(i) for i in range(WARMUP_REQUESTS + MEASURED_REQUESTS)]
+    for request in requests[:WARMUP_REQUESTS]:
+        await _send(api_client, request, mix)
+
+    latencies = []
+    queries_before = db_query_counter["queries"]
+    start = time.perf_counter()
+    for request in requests[WARMUP_REQUESTS:]:
+        t0 = time.perf_counter()
+        await _send(api_client, request, mix)
+        latencies.append(time.perf_counter() - t0)
+    duration = time.perf_counter() - start
+    queries = db_query_counter["queries"] - queries_before
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return _Result(
+        name=mix.name,
+        rps=MEASURED_REQUESTS / duration,
+        p50_ms=percentiles[49] * 1000,
+        p99_ms=percentiles[98] * 1000,
+        queries_per_request=queries / MEASURED_REQUESTS,
+    )
+
+
+async def _send(api_client: AsyncClient, request: Request, mix: _Mix):
+    response = await api_client.send(request)
+    if mix.expected_status != -1:
+        assert response.status_code == mix.expected_status, mix.name
@@ -34,7 +34,14 @@ from shard_core import app_factory
 from shard_core.data_model.identity import OutputIdentity, Identity
 from shard_core.data_model.profile import Profile
 from shard_core.database import database
-from shard_core.service import websocket, app_installation, telemetry
+from shard_core.service import (
+    websocket,
+    app_installation,
+    telemetry,
+    last_access_buffer,
+    peer_registry,
+    prewarm,
+)
 from shard_core.service.app_tools import get_installed_apps_path
 from shard_core.settings import Settings, set_settings, reset_settings
 from shard_core.web.internal.call_peer import _get_app_for_ip_address
@@ -182,6 +189,9 @@ async def api_client(requests_mock, mocker) -> AsyncGenerator[AsyncClient]:
     importlib.reload(websocket)
     importlib.reload(app_installation.worker)
     importlib.reload(telemetry)
+    importlib.reload(last_access_buffer)
+    importlib.reload(peer_registry)
+    importlib.reload(prewarm)
 
     # Mocks must be set up after modules are reloaded or else they will be overwritten
     mock_app_store(mocker)
@@ -214,6 +224,9 @@ async def app_client(mocker) -> AsyncGenerator[AsyncClient]:
     importlib.reload(websocket)
     importlib.reload(app_installation.worker)
     importlib.reload(telemetry)
+    importlib.reload(last_access_buffer)
+    importlib.reload(peer_registry)
+    importlib.reload(prewarm)
 
     # Initialize the database (migrations + pool) and create default identity
     await database.init_database()
@@ -14,7 +14,8 @@ import pytest
 from shard_core.data_model.app_meta import InstalledApp, Status
 from shard_core.database.connection import db_conn
 from shard_core.database import installed_apps as db_installed_apps
-from shard_core.service import app_tools
+from shard_core.service import app_tools, container_runtime
+from shard_core.service.container_runtime import ComposeRequired, ContainerRuntimeError
 from shard_core.util.subprocess import (
     ComposeFileNotFound,
     ComposeProjectNotAllowed,
@@ -95,6 +96,13 @@ def subprocess_mock():
         yield mock
 
 
+@pytest.fixture(autouse=True)
+def runtime_mock():
+    runtime = AsyncMock(spec=container_runtime.ContainerRuntime)
+    with patch.object(container_runtime, "get_container_runtime", return_value=runtime):
+        yield runtime
+
+
 @pytest.fixture(autouse=True)
 def reset_start_throttle():
     """start_app's @throttle(5) is per-app but persists across tests — a start
@@ -123,7 +131,7 @@ async def _insert_app(name: str, status: Status):
     ],
 )
 async def test_app_operation_without_compose_file_never_runs_compose(
-    db, tmp_path, subprocess_mock, operation, status
+    db, tmp_path, subprocess_mock, runtime_mock, operation, status
 ):
     _app_dir(tmp_path, "brokenapp", with_compose_file=False)
     await _insert_app("brokenapp", status)
@@ -133,25 +141,40 @@ async def test_app_operation_without_compose_file_never_runs_compose(
             await operation("brokenapp")
 
     subprocess_mock.assert_not_called()
+    assert not runtime_mock.method_calls
 
 
 async def test_app_operation_with_compose_file_pins_the_app_project(
     db, tmp_path, subprocess_mock
 ):
     app_dir = _app_dir(tmp_path, "brokenapp")
-    await _insert_app("brokenapp", Status.RUNNING)
+    await _insert_app("brokenapp", Status.DOWN)
 
     with settings_override({"path_root": str(tmp_path)}):
-        await app_tools.docker_stop_app("brokenapp")
+        await app_tools.docker_shutdown_app("brokenapp", force=True)
 
     command = subprocess_mock.await_args.args
-    assert command[-1] == "stop"
+    assert command[-1] == "down"
     assert "-p" in command and command[command.index("-p") + 1] == "brokenapp"
     assert "-f" in command and command[command.index("-f") + 1] == str(
         app_dir / "docker-compose.yml"
     )
 
 
+async def test_container_operations_act_on_the_app_project(
+    db, tmp_path, subprocess_mock, runtime_mock
+):
+    _app_dir(tmp_path, "My_App")
+    await _insert_app("My_App", Status.PAUSED)
+
+    with settings_override({"path_root": str(tmp_path)}):
+        await app_tools.docker_stop_app("My_App")
+
+    runtime_mock.unpause.assert_awaited_once_with("my_app")
+    runtime_mock.stop.assert_awaited_once_with("my_app")
+    subprocess_mock.assert_not_called()
+
+
 async def _status(name: str) -> str | None:
     async with db_conn() as conn:
         app = await db_installed_apps.get_by_name(conn, name)
@@ -199,11 +222,11 @@ async def test_get_app_container_state_missing_when_ps_fails(tmp_path, subproces
 
 
 async def test_start_app_revives_exited_app_even_when_db_says_paused(
-    db, tmp_path, subprocess_mock
+    db, tmp_path, subprocess_mock, runtime_mock
 ):
     """The #185 bug: db says PAUSED but the container exited (crash / OOM /
     core-upgrade converge). The old wake ran `unpause` and crashed; revive must
-    `up -d` instead."""
+    start the containers instead."""
     _app_dir(tmp_path, "exited_app")
     await _insert_app("exited_app", Status.PAUSED)
 
@@ -215,13 +238,35 @@ async def test_start_app_revives_exited_app_even_when_db_says_paused(
     ):
         await app_tools.start_app("exited_app")
 
-    commands = _issued_commands(subprocess_mock)
-    assert any(c[-2:] == ("up", "-d") for c in commands)
-    assert not any("unpause" in c for c in commands)
+    runtime_mock.start.assert_awaited_once_with("exited_app")
+    runtime_mock.unpause.assert_not_awaited()
+    subprocess_mock.assert_not_called()
     assert await _status("exited_app") == Status.RUNNING
 
 
-async def test_start_app_unpauses_a_genuinely_paused_app(db, tmp_path, subprocess_mock):
+async def test_start_app_uses_compose_when_containers_need_it(
+    db, tmp_path, subprocess_mock, runtime_mock
+):
+    _app_dir(tmp_path, "linked_app")
+    await _insert_app("linked_app", Status.STOPPED)
+    runtime_mock.start.side_effect = ComposeRequired("depends_on")
+
+    with (
+        settings_override({"path_root": str(tmp_path)}),
+        patch.object(
+            app_tools, "get_app_container_state", new=AsyncMock(return_value="exited")
+        ),
+    ):
+        await app_tools.start_app("linked_app")
+
+    commands = _issued_commands(subprocess_mock)
+    assert commands[-1][-2:] == ("up", "-d")
+    assert await _status("linked_app") == Status.RUNNING
+
+
+async def test_start_app_unpauses_a_genuinely_paused_app(
+    db, tmp_path, subprocess_mock, runtime_mock
+):
     _app_dir(tmp_path, "paused_app")
     await _insert_app("paused_app", Status.PAUSED)
 
@@ -233,9 +278,8 @@ async def test_start_app_unpauses_a_genuinely_paused_app(db, tmp_path, subproces
     ):
         await app_tools.start_app("paused_app")
 
-    commands = _issued_commands(subprocess_mock)
-    assert any(c[-1] == "unpause" for c in commands)
-    assert not any(c[-2:] == ("up", "-d") for c in commands)
+    runtime_mock.unpause.assert_awaited_once_with("paused_app")
+    subprocess_mock.assert_not_called()
     assert await _status("paused_app") == Status.RUNNING
 
 
@@ -257,6 +301,26 @@ async def test_start_app_running_container_is_a_noop_but_reconciles_status(
     assert await _status("running_app") == Status.RUNNING
 
 
+async def test_start_app_verifies_running_until_pause(db, tmp_path, subprocess_mock):
+    _app_dir(tmp_path, "verified_app")
+    await _insert_app("verified_app", Status.RUNNING)
+
+    with (
+        settings_override({"path_root": str(tmp_path)}),
+        patch.object(
+            app_tools, "get_app_container_state", new=AsyncMock(return_value="running")
+        ),
+        patch.object(
+            app_tools.memory_pressure, "reclaim_compose_stack", new=AsyncMock()
+        ),
+    ):
+        await app_tools.start_app("verified_app")
+        assert app_tools.is_verified_running("verified_app", max_age=10)
+
+        await app_tools.docker_pause_app("verified_app")
+        assert not app_tools.is_verified_running("verified_app", max_age=10)
+
+
 async def test_start_app_starts_a_missing_stack(db, tmp_path, subprocess_mock):
     _app_dir(tmp_path, "gone_app")
     await _insert_app("gone_app", Status.DOWN)
@@ -294,16 +358,15 @@ async def test_start_app_skips_non_revivable_status(
 
 
 async def test_start_app_falls_back_to_up_when_unpause_fails(
-    db, tmp_path, subprocess_mock
+    db, tmp_path, subprocess_mock, runtime_mock
 ):
     """A partially-paused stack (some containers already exited) can't be revived
     by unpause — start_app must fall back to `up -d` instead of crashing."""
     _app_dir(tmp_path, "mixed_app")
     await _insert_app("mixed_app", Status.PAUSED)
-    subprocess_mock.side_effect = [
-        SubprocessError("Container mixed_app is not paused"),  # unpause
-        "",  # up -d fallback
-    ]
+    runtime_mock.unpause.side_effect = ContainerRuntimeError(
+        "Container mixed_app is not paused"
+    )
 
     with (
         settings_override({"path_root": str(tmp_path)}),
@@ -313,9 +376,9 @@ async def test_start_app_falls_back_to_up_when_unpause_fails(
     ):
         await app_tools.start_app("mixed_app")
 
+    runtime_mock.unpause.assert_awaited_once_with("mixed_app")
     commands = _issued_commands(subprocess_mock)
-    assert commands[0][-1] == "unpause"
-    assert commands[-1][-2:] == ("up", "-d")
+    assert commands == [commands[0]] and commands[0][-2:] == ("up", "-d")
     assert await _status("mixed_app") == Status.RUNNING
 
 
@@ -336,7 +399,7 @@ async def test_start_app_recovers_stale_containers(
     with (
         settings_override({"path_root": str(tmp_path)}),
         patch.object(
-            app_tools, "get_app_container_state", new=AsyncMock(return_value="exited")
+            app_tools, "get_app_container_state", new=AsyncMock(return_value="missing")
         ),
     ):
         await app_tools.start_app("stale_app")
@@ -376,3 +439,41 @@ async def test_start_app_is_serialized_by_the_per_app_op_lock(
         finally:
             lock.release()
         await asyncio.wait_for(task, timeout=1)
+
+
+async def test_start_app_prefetches_after_the_unpause_without_the_lock(
+    db, tmp_path, subprocess_mock, runtime_mock
+):
+    """The swap-in prefetch may take a while; the woken app is marked running and
+    the op lock released before it, so neither the access nor a teardown waits."""
+    _app_dir(tmp_path, "paused_app")
+    await _insert_app("paused_app", Status.PAUSED)
+    prefetch_done = asyncio.Event()
+
+    async def slow_prefetch(name):
+        assert await _status(name) == Status.RUNNING
+        await prefetch_done.wait()
+        return 0
+
+    with (
+        settings_override(
+            {
+                "path_root": str(tmp_path),
+                "apps": {"lifecycle": {"prefetch_enabled": True}},
+            }
+        ),
+        patch.object(
+            app_tools, "get_app_container_state", new=AsyncMock(return_value="paused")
+        ),
+        patch.object(
+            app_tools.memory_pressure, "prefetch_compose_stack", new=slow_prefetch
+        ),
+    ):
+        await asyncio.wait_for(app_tools.start_app("paused_app"), timeout=1)
+        assert not app_tools.app_op_lock("paused_app").locked()
+        assert len(app_tools._prefetches) == 1
+
+        prefetch_done.set()
+        await asyncio.gather(*app_tools._prefetches)
+
+    assert await _status("paused_app") == Status.RUNNING
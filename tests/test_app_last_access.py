@@ -5,6 +5,7 @@ from typing import Optional
 from shard_core.database.connection import db_conn
 from shard_core.database import installed_apps as db_installed_apps
 from shard_core.data_model.app_meta import InstalledApp
+from shard_core.service import app_lifecycle, last_access_buffer
 
 
 async def test_app_last_access_is_set(api_client):
@@ -72,7 +73,26 @@ async def _get_last_access_time_delta(app_name: str) -> Optional[float]:
 
 
 async def _get_last_access_time(app_name: str) -> Optional[datetime]:
+    await last_access_buffer.flush_last_access()
     async with db_conn() as conn:
         row = await db_installed_apps.get_by_name(conn, app_name)
     app = InstalledApp(**row)
     return app.last_access
+
+
+async def test_last_access_is_restored_into_lifecycle(db):
+    accessed = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    async with db_conn() as conn:
+        await db_installed_apps.insert(
+            conn, InstalledApp(name="accessed", last_access=accessed).model_dump()
+        )
+        await db_installed_apps.insert(
+            conn, InstalledApp(name="never_accessed").model_dump()
+        )
+    app_lifecycle.last_access_dict.pop("accessed", None)
+    app_lifecycle.last_access_dict.pop("never_accessed", None)
+
+    await app_lifecycle.restore_last_access()
+
+    assert app_lifecycle.last_access_dict["accessed"] == accessed.timestamp()
+    assert "never_accessed" not in app_lifecycle.last_access_dict
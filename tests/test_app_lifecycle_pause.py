@@ -17,7 +17,7 @@ from shard_core.data_model.app_meta import (
     Lifecycle,
     Status,
 )
-from shard_core.service import app_lifecycle
+from shard_core.service import app_lifecycle, app_tools, memory_pressure
 from tests.conftest import settings_override
 
 
@@ -50,8 +50,10 @@ def docker_mocks():
 @pytest.fixture(autouse=True)
 def clean_last_access():
     app_lifecycle.last_access_dict.clear()
+    app_tools._verified_running.clear()
     yield
     app_lifecycle.last_access_dict.clear()
+    app_tools._verified_running.clear()
 
 
 def _app(name: str, status: Status, idle: float) -> InstalledApp:
@@ -87,6 +89,26 @@ async def test_wake_routes_every_status_through_start_app(docker_mocks, status):
     docker_mocks["start"].assert_awaited_once_with("a")
 
 
+async def test_wake_of_verified_running_app_only_records_access(docker_mocks):
+    app = _app("a", Status.RUNNING, idle=100)
+    app_tools._set_verified_running("a")
+    with (
+        patch.object(
+            app_lifecycle, "get_app_metadata", side_effect=AssertionError
+        ) as get_meta,
+        patch.object(
+            app_lifecycle.disk,
+            "current_disk_usage",
+            app_lifecycle.disk.DiskUsage(total_gb=10, free_gb=9, disk_space_low=False),
+        ),
+    ):
+        await app_lifecycle.ensure_app_is_running(app)
+        await asyncio.sleep(0)
+    get_meta.assert_not_called()
+    docker_mocks["start"].assert_not_awaited()
+    assert time.time() - app_lifecycle.last_access_dict["a"] < 1
+
+
 async def test_running_app_pauses_after_t1(docker_mocks):
     app = _app("a", Status.RUNNING, idle=7)
     with (
@@ -301,3 +323,118 @@ async def test_demote_lru_demotes_exactly_one_app_per_cycle(docker_mocks):
         await app_lifecycle._demote_lru(apps)
     assert docker_mocks["pause"].await_count == 1
     docker_mocks["pause"].assert_awaited_once_with("a")
+
+
+async def test_demote_lru_prefers_the_app_that_frees_the_most_memory(docker_mocks):
+    mib = 2**20
+    usage = {
+        "small_old": memory_pressure.StackMemory(current=30 * mib),
+        "big_newer": memory_pressure.StackMemory(current=2048 * mib),
+    }
+    apps = [
+        _app("small_old", Status.RUNNING, idle=600),
+        _app("big_newer", Status.RUNNING, idle=120),
+    ]
+    with (
+        patch.object(
+            app_lifecycle, "get_app_metadata", return_value=_meta(Lifecycle())
+        ),
+        patch.object(memory_pressure, "read_stack_memory", side_effect=usage.get),
+    ):
+        await app_lifecycle._demote_lru(apps)
+    docker_mocks["pause"].assert_awaited_once_with("big_newer")
+    assert app_lifecycle.last_demotion["victim"] == "big_newer"
+    scores = {c["app_name"]: c for c in app_lifecycle.last_demotion["candidates"]}
+    assert scores["big_newer"]["benefit_bytes"] == 2048 * mib
+    assert scores["big_newer"]["score"] > scores["small_old"]["score"]
+
+
+@pytest.mark.parametrize(
+    "status, lifecycle, pause_enabled, expected_idle",
+    [
+        (Status.RUNNING, Lifecycle(), True, 5),
+        (Status.PAUSED, Lifecycle(), True, 12),
+        (Status.STOPPED, Lifecycle(), True, None),
+        (Status.RUNNING, Lifecycle(), False, 12),
+        (Status.PAUSED, Lifecycle(), False, None),
+        (Status.RUNNING, Lifecycle(skip_pause=True), True, 12),
+        (Status.RUNNING, Lifecycle(always_on=True), True, None),
+        (Status.RUNNING, Lifecycle(idle_for_pause=60), True, 60),
+    ],
+)
+def test_next_deadline_matches_control_thresholds(
+    status, lifecycle, pause_enabled, expected_idle
+):
+    app = _app("a", status, idle=0)
+    deadline = app_lifecycle._next_deadline(app, _meta(lifecycle), pause_enabled)
+    if expected_idle is None:
+        assert deadline is None
+    else:
+        assert deadline == app_lifecycle.last_access_dict["a"] + expected_idle
+
+
+def test_scheduler_keeps_only_the_latest_deadline_per_app():
+    scheduler = app_lifecycle.LifecycleScheduler()
+    with (
+        settings_override(PAUSE_ON),
+        patch.object(
+            app_lifecycle, "get_app_metadata", return_value=_meta(Lifecycle())
+        ),
+    ):
+        scheduler._schedule(_app("a", Status.RUNNING, idle=4))
+        scheduler._schedule(_app("b", Status.RUNNING, idle=2))
+        assert scheduler.next_deadline() == app_lifecycle.last_access_dict["a"] + 5
+
+        # an access moved a's deadline behind b's
+        scheduler._schedule(_app("a", Status.RUNNING, idle=0))
+        assert scheduler.next_deadline() == app_lifecycle.last_access_dict["b"] + 5
+
+        scheduler._schedule(_app("b", Status.STOPPED, idle=0))
+        assert scheduler.next_deadline() == app_lifecycle.last_access_dict["a"] + 5
+
+
+async def test_scheduler_backs_off_when_controlling_an_app_fails():
+    scheduler = app_lifecycle.LifecycleScheduler()
+    app = _app("a", Status.RUNNING, idle=100)
+    row = app.model_dump()
+
+    class _Conn:
+        async def __aenter__(self):
+            return None
+
+        async def __aexit__(self, *_):
+            return False
+
+    with (
+        settings_override(PAUSE_ON),
+        patch.object(
+            app_lifecycle, "get_app_metadata", return_value=_meta(Lifecycle())
+        ),
+        patch.object(app_lifecycle, "db_conn", _Conn),
+        patch.object(
+            app_lifecycle.db_installed_apps,
+            "get_by_name",
+            new=AsyncMock(return_value=row),
+        ),
+        patch.object(
+            app_lifecycle,
+            "_control_app_time",
+            new=AsyncMock(side_effect=RuntimeError("broken compose file")),
+        ) as control,
+    ):
+        scheduler._schedule(app)
+        await scheduler._run_due()
+        assert control.await_count == 1
+        first_retry = scheduler.next_deadline()
+        assert first_retry >= time.time() + 1
+
+        # the retry is not due yet, and a resync does not bring the past deadline back
+        scheduler._schedule(app)
+        await scheduler._run_due()
+        assert control.await_count == 1
+
+        scheduler._failures["a"] = (1, time.time())
+        scheduler._schedule(app)
+        await scheduler._run_due()
+        assert control.await_count == 2
+        assert scheduler.next_deadline() > first_retry
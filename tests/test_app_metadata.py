@@ -0,0 +1,97 @@
+import json
+import os
+
+import pytest
+
+from shard_core.service import app_tools
+from shard_core.service.app_tools import (
+    MetadataNotFound,
+    get_app_metadata,
+    get_installed_apps_path,
+    load_all_app_metadata,
+)
+
+
+def _write_app_meta(app_name: str, v: str = "1.3", **extra):
+    app_dir = get_installed_apps_path() / app_name
+    app_dir.mkdir(parents=True, exist_ok=True)
+    values = {
+        "v": v,
+        "app_version": "1.0.0",
+        "name": app_name,
+        "pretty_name": app_name.title(),
+        "icon": "icon.svg",
+        "entrypoints": [],
+        "paths": {"": {"access": "public"}},
+        **extra,
+    }
+    meta_file = app_dir / "app_meta.json"
+    meta_file.write_text(json.dumps(values))
+    return meta_file
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    app_tools._app_meta_registry.clear()
+    yield
+    app_tools._app_meta_registry.clear()
+
+
+def test_unchanged_file_is_served_from_registry():
+    _write_app_meta("foo")
+    assert get_app_metadata("foo") is get_app_metadata("foo")
+
+
+def test_changed_file_is_reloaded():
+    meta_file = _write_app_meta("foo")
+    first = get_app_metadata("foo")
+
+    _write_app_meta("foo", app_version="2.0.0")
+    stat = meta_file.stat()
+    os.utime(meta_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    second = get_app_metadata("foo")
+    assert second is not first
+    assert second.app_version == "2.0.0"
+
+
+def test_removed_file_raises_and_drops_entry():
+    meta_file = _write_app_meta("foo")
+    get_app_metadata("foo")
+    meta_file.unlink()
+
+    with pytest.raises(MetadataNotFound):
+        get_app_metadata("foo")
+    assert "foo" not in app_tools._app_meta_registry
+
+
+def test_missing_app_raises():
+    with pytest.raises(MetadataNotFound):
+        get_app_metadata("does_not_exist")
+
+
+def test_migrated_metadata_is_written_back():
+    meta_file = _write_app_meta(
+        "foo", v="1.2", lifecycle={"always_on": False, "idle_time_for_shutdown": 600}
+    )
+
+    meta = get_app_metadata("foo")
+    assert meta.v == "1.3"
+    assert meta.lifecycle.idle_for_pause == 600
+
+    stored = json.loads(meta_file.read_text())
+    assert stored["v"] == "1.3"
+    assert stored["lifecycle"] == {"always_on": False, "idle_for_pause": 600}
+    assert get_app_metadata("foo") is meta
+
+
+async def test_load_all_app_metadata_skips_broken_apps():
+    _write_app_meta("foo")
+    _write_app_meta("bar")
+    broken = get_installed_apps_path() / "broken"
+    broken.mkdir()
+    (broken / "app_meta.json").write_text("{not json")
+
+    await load_all_app_metadata()
+
+    assert set(app_tools._app_meta_registry) == {"foo", "bar"}
@@ -81,8 +81,8 @@ async def test_full_tier_cycle_and_fast_wake(requests_mock, api_client):
         assert wake_wall_time < 10
 
         # the compose unpause itself must be fast (design target: <=2s p95)
-        assert pause_metrics.unpause_latencies_ms
-        assert pause_metrics.unpause_latencies_ms[-1] < 2000
+        assert pause_metrics.unpause_latencies_ms.count
+        assert pause_metrics.unpause_latencies_ms.max < 2000
 
         # T2: after another T1 the app re-pauses, after idle >= 12s it stops
         await retry_async(assert_paused, timeout=20, retry_errors=[AssertionError])
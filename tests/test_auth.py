@@ -113,3 +113,26 @@ async def test_fail_unknown_app(api_client: AsyncClient):
             },
         )
     ).status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_cached_decision_follows_terminal_delete(api_client: AsyncClient):
+    await install_app(api_client, "mock_app")
+    await pair_new_terminal(api_client, "T1")
+
+    async def auth_private():
+        return await api_client.get(
+            "internal/auth",
+            headers={
+                "X-Forwarded-Host": "mock_app.myshard.org",
+                "X-Forwarded-Uri": "/private",
+            },
+        )
+
+    assert (await auth_private()).status_code == status.HTTP_200_OK
+    assert (await auth_private()).status_code == status.HTTP_200_OK
+
+    t_id = (await api_client.get("protected/terminals/name/T1")).json()["id"]
+    response = await api_client.delete(f"protected/terminals/id/{t_id}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    assert (await auth_private()).status_code == status.HTTP_401_UNAUTHORIZED
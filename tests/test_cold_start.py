@@ -0,0 +1,84 @@
+import asyncio
+
+import httpx
+import pytest
+
+from shard_core.data_model.app_meta import (
+    AppMeta,
+    Entrypoint,
+    EntrypointPort,
+    Lifecycle,
+)
+from shard_core.service import cold_start, pause_metrics
+
+
+def _meta(name: str, entrypoints: list[Entrypoint]) -> AppMeta:
+    return AppMeta(
+        v="1.3",
+        app_version="1.0.0",
+        name=name,
+        pretty_name=name,
+        icon="icon.svg",
+        entrypoints=entrypoints,
+        paths={},
+        lifecycle=Lifecycle(),
+    )
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """An upstream that answers 502 twice before it serves."""
+    responses = [502, 502, 200]
+    requested = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        return httpx.Response(responses.pop(0) if len(responses) > 1 else 200)
+
+    monkeypatch.setattr(cold_start, "_wakes", {})
+    monkeypatch.setattr(cold_start, "PROBE_INTERVAL", 0)
+    monkeypatch.setattr(
+        cold_start,
+        "_client",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(handle)),
+    )
+    monkeypatch.setattr(pause_metrics, "cold_starts", {})
+    return requested
+
+
+async def _probes_done():
+    await asyncio.gather(*cold_start._probes)
+
+
+async def test_cold_start_is_measured_until_upstream_serves(upstream):
+    entrypoint = Entrypoint(
+        container_name="app1-web",
+        container_port=8080,
+        entrypoint_port=EntrypointPort.HTTPS_443,
+    )
+    cold_start.begin(_meta("app1", [entrypoint]))
+    cold_start.reviving("app1")
+    cold_start.started("app1", cold_start.UNPAUSE)
+    await _probes_done()
+
+    assert upstream == ["http://app1-web:8080/"] * 3
+    histogram = pause_metrics.get_cold_starts()["app1"][cold_start.UNPAUSE]
+    assert histogram["count"] == 1
+    assert histogram["p50"] == histogram["max"] < 1000
+    assert cold_start._wakes == {}
+
+
+async def test_only_woken_apps_are_measured(upstream):
+    cold_start.started("app1", cold_start.START)
+
+    cold_start.begin(_meta("app2", []))
+    cold_start.cancel("app2")
+    cold_start.started("app2", cold_start.START)
+
+    # without an http entrypoint, the containers being up is the end of the wait
+    cold_start.begin(_meta("app3", []))
+    cold_start.started("app3", cold_start.RECREATE)
+    await _probes_done()
+
+    assert upstream == []
+    assert list(pause_metrics.get_cold_starts()) == ["app3"]
@@ -0,0 +1,100 @@
+import json
+
+import httpx
+import pytest
+
+from shard_core.service.container_runtime import (
+    COMPOSE_DEPENDS_ON_LABEL,
+    COMPOSE_PROJECT_LABEL,
+    ComposeRequired,
+    ContainerRuntimeError,
+    DockerEngineRuntime,
+)
+
+
+class _FakeEngine:
+    def __init__(self, containers: list[dict]):
+        self.containers = containers
+        self.requests: list[tuple[str, str]] = []
+        self.list_filters = None
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/containers/json":
+            self.list_filters = json.loads(request.url.params["filters"])
+            return httpx.Response(200, json=self.containers)
+        self.requests.append((request.method, request.url.path))
+        return httpx.Response(204)
+
+
+def _container(id_: str, state: str, labels: dict | None = None) -> dict:
+    return {
+        "Id": id_,
+        "State": state,
+        "Labels": {COMPOSE_PROJECT_LABEL: "app", **(labels or {})},
+    }
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = _FakeEngine([])
+    runtime = DockerEngineRuntime("unix:///var/run/docker.sock")
+    monkeypatch.setattr(
+        runtime,
+        "_client",
+        lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(engine.handle), base_url="http://docker"
+        ),
+    )
+    engine.runtime = runtime
+    return engine
+
+
+async def test_pause_acts_on_running_containers_of_the_project(engine):
+    engine.containers = [_container("a", "running"), _container("b", "exited")]
+
+    await engine.runtime.pause("app")
+
+    assert engine.requests == [("POST", "/containers/a/pause")]
+    assert f"{COMPOSE_PROJECT_LABEL}=app" in engine.list_filters["label"]
+
+
+async def test_unpause_skips_exited_containers(engine):
+    engine.containers = [_container("a", "paused"), _container("b", "exited")]
+
+    await engine.runtime.unpause("app")
+
+    assert engine.requests == [("POST", "/containers/a/unpause")]
+
+
+async def test_unpause_of_partially_paused_project_raises(engine):
+    engine.containers = [_container("a", "paused"), _container("b", "running")]
+
+    with pytest.raises(ContainerRuntimeError):
+        await engine.runtime.unpause("app")
+
+    assert engine.requests == [("POST", "/containers/a/unpause")]
+
+
+async def test_start_requires_compose_for_missing_or_dependent_containers(engine):
+    with pytest.raises(ComposeRequired):
+        await engine.runtime.start("app")
+
+    engine.containers = [
+        _container("a", "exited"),
+        _container("b", "exited", {COMPOSE_DEPENDS_ON_LABEL: "a:service_started"}),
+    ]
+    with pytest.raises(ComposeRequired):
+        await engine.runtime.start("app")
+    assert engine.requests == []
+
+
+async def test_start_and_stop(engine):
+    engine.containers = [_container("a", "exited"), _container("b", "running")]
+
+    await engine.runtime.start("app")
+    await engine.runtime.stop("app")
+
+    assert engine.requests == [
+        ("POST", "/containers/a/start"),
+        ("POST", "/containers/b/stop"),
+    ]
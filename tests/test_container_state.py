@@ -0,0 +1,145 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from shard_core.service import app_tools, container_state, memory_pressure
+from shard_core.service.container_runtime import COMPOSE_PROJECT_LABEL
+from shard_core.web.internal.app_error import get_container_status
+
+
+def _container(id_: str, project: str, state: str, name: str = None) -> dict:
+    return {
+        "Id": id_,
+        "Names": [f"/{name or id_}"],
+        "Labels": {COMPOSE_PROJECT_LABEL: project},
+        "State": state,
+    }
+
+
+def _event(action: str, id_: str, project: str, name: str = None) -> dict:
+    return {
+        "Type": "container",
+        "Action": action,
+        "Actor": {
+            "ID": id_,
+            "Attributes": {
+                COMPOSE_PROJECT_LABEL: project,
+                "name": name or id_,
+            },
+        },
+    }
+
+
+@pytest.fixture
+def live_state(monkeypatch):
+    monkeypatch.setattr(container_state, "_projects", {})
+    monkeypatch.setattr(container_state, "_live", True)
+    with patch.object(app_tools, "subprocess", new=AsyncMock()) as subprocess_mock:
+        yield subprocess_mock
+
+
+async def test_state_is_read_from_seed_and_events(live_state):
+    container_state._seed(
+        [
+            _container("a1", "app1", "running"),
+            _container("a2", "app1", "running"),
+            _container("b1", "app2", "exited"),
+        ]
+    )
+    assert await app_tools.get_app_container_state("app1") == "running"
+    assert await app_tools.get_app_container_state("app2") == "exited"
+    assert await app_tools.get_app_container_state("app3") == "missing"
+
+    container_state._apply_event(_event("pause", "a1", "app1"))
+    assert await app_tools.get_app_container_state("app1") == "paused"
+
+    container_state._apply_event(_event("start", "b1", "app2"))
+    assert await app_tools.get_app_container_state("app2") == "running"
+
+    container_state._apply_event(_event("create", "c1", "app3"))
+    assert await app_tools.get_app_container_state("app3") == "exited"
+    container_state._apply_event(_event("destroy", "c1", "app3"))
+    assert await app_tools.get_app_container_state("app3") == "missing"
+
+    live_state.assert_not_called()
+
+
+def test_unrelated_events_are_ignored(live_state):
+    container_state._seed([_container("a1", "app1", "running")])
+
+    container_state._apply_event(_event("exec_start: sh", "a1", "app1"))
+    container_state._apply_event({"Action": "start", "Actor": {"ID": "x"}})
+
+    assert container_state.get_project_containers("app1")[0].state == "running"
+    assert container_state.get_project_containers("x") == []
+
+
+async def test_reclaim_uses_cached_container_ids(live_state):
+    container_state._seed(
+        [
+            _container("a1", "app1", "paused"),
+            _container("a2", "app1", "exited"),
+        ]
+    )
+    with (
+        patch.object(memory_pressure, "subprocess", new=AsyncMock()) as ps,
+        patch.object(memory_pressure, "_reclaim_container", return_value=0) as reclaim,
+    ):
+        await memory_pressure.reclaim_compose_stack("app1")
+
+    ps.assert_not_called()
+    reclaim.assert_called_once()
+    assert reclaim.call_args.args[0] == "a1"
+
+
+def test_splash_status_is_read_from_cache(live_state):
+    container_state._seed([_container("a1", "app1", "paused", name="app1")])
+
+    assert get_container_status("app1") == "paused"
+    assert get_container_status("app2") == "unknown"
+
+
+def test_nothing_is_served_while_not_live(monkeypatch):
+    monkeypatch.setattr(container_state, "_live", False)
+    assert container_state.get_project_containers("app1") is None
+    assert container_state.get_project_container_ids("app1", ("running",)) is None
+
+
+async def test_watcher_seeds_from_the_engine_and_follows_events(monkeypatch):
+    monkeypatch.setattr(container_state, "_projects", {})
+    monkeypatch.setattr(container_state, "_live", False)
+    requested = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requested.append(request.url.path)
+        filters = json.loads(request.url.params["filters"])
+        assert filters["label"] == [COMPOSE_PROJECT_LABEL]
+        if request.url.path == "/events":
+            lines = [_event("pause", "a1", "app1"), _event("die", "a2", "app1")]
+            return httpx.Response(
+                200, content="".join(json.dumps(e) + "\n" for e in lines)
+            )
+        return httpx.Response(
+            200,
+            json=[
+                _container("a1", "app1", "running"),
+                _container("a2", "app1", "running"),
+            ],
+        )
+
+    monkeypatch.setattr(
+        container_state,
+        "_client",
+        lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(handle), base_url="http://docker"
+        ),
+    )
+
+    await container_state.ContainerStateWatcher()._watch()
+
+    assert requested == ["/events", "/containers/json"]
+    assert container_state.is_live()
+    states = {c.name: c.state for c in container_state.get_project_containers("app1")}
+    assert states == {"a1": "paused", "a2": "exited"}
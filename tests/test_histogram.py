@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from shard_core.util.histogram import LogHistogram
+
+
+def test_quantiles_are_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(5, 2) for _ in range(10000)]
+    histogram = LogHistogram(relative_accuracy=0.01)
+    for value in values:
+        histogram.record(value)
+
+    ordered = sorted(values)
+    for fraction in (0.0, 0.5, 0.95, 0.99, 1.0):
+        exact = ordered[round(fraction * (len(ordered) - 1))]
+        assert histogram.quantile(fraction) == pytest.approx(exact, rel=0.01)
+    assert histogram.count == len(values)
+    assert histogram.min == min(values)
+    assert histogram.max == max(values)
+    assert histogram.mean == pytest.approx(sum(values) / len(values))
+
+
+def test_merge_adds_counts():
+    a, b = LogHistogram(), LogHistogram()
+    for value in (1, 2, 3):
+        a.record(value)
+    for value in (0, 400):
+        b.record(value)
+
+    a.merge(b)
+
+    assert a.count == 5
+    assert a.sum == 406
+    assert (a.min, a.max) == (0, 400)
+    assert a.quantile(0) == 0
+    assert a.quantile(0.5) == pytest.approx(2, rel=0.01)
+    assert a.quantile(1) == 400
+
+    with pytest.raises(ValueError):
+        a.merge(LogHistogram(relative_accuracy=0.05))
+
+
+def test_empty_histogram_and_invalid_input():
+    histogram = LogHistogram()
+
+    assert histogram.quantile(0.5) is None
+    assert histogram.mean is None
+    assert histogram.to_dict()["min"] is None
+    with pytest.raises(ValueError):
+        histogram.quantile(95)
+    with pytest.raises(ValueError):
+        histogram.quantile(-0.1)
+    with pytest.raises(ValueError):
+        histogram.record(-1)
@@ -1,8 +1,13 @@
+import requests
 from starlette import status
 
-from shard_core.data_model.identity import OutputIdentity
+from shard_core.data_model.identity import Identity, OutputIdentity
 from httpx import AsyncClient
 
+from shard_core.service import crypto, identity_keys
+from shard_core.util import signals
+from tests.util import verify_signature_auth
+
 
 async def test_add_and_get(app_client: AsyncClient):
     second_identity = {"name": "second id", "email": "hello@freeshard.net"}
@@ -97,3 +102,32 @@ async def test_invalid_email(app_client: AsyncClient):
 
     response = await app_client.get("protected/identities/default")
     assert response.json()["email"] is None
+
+
+async def test_key_material_is_memoized_until_identity_update():
+    identity = Identity.create("I1")
+    material = identity.key_material
+    assert identity.public_key_pem == material.public_key_pem
+    assert Identity(**identity.model_dump()).key_material is material
+    assert material.hash_id == identity.id
+    assert (
+        material.public_key_pem
+        == crypto.PrivateKey(identity.private_key).get_public_key().to_bytes().decode()
+    )
+
+    await signals.on_identity_update.send_async()
+    assert identity.key_material is not material
+    assert identity.key_material.public_key_pem == material.public_key_pem
+
+
+def test_cached_signature_auth_signs_verifiably():
+    identity = Identity.create("I1")
+    auth = identity_keys.get_key_material(
+        identity.id, identity.private_key
+    ).signature_auth
+    for body in [b"foo", b"bar"]:
+        request = requests.Request(
+            "POST", "https://example.com/foo", data=body, auth=auth
+        ).prepare()
+        result = verify_signature_auth(request, identity.public_key)
+        assert result.parameters["keyid"] == identity.short_id
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from shard_core.database import database
+from shard_core.database.kv_cache import KvCache, MISS
+
+
+def test_read_through_counts_hits_and_misses():
+    cache = KvCache(default_ttl=None)
+    assert cache.get("a") is MISS
+    cache.put("a", {"x": 1})
+    assert cache.get("a") == {"x": 1}
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_cached_values_are_copies():
+    cache = KvCache(default_ttl=None)
+    cache.put("a", {"x": [1]})
+    cache.get("a")["x"].append(2)
+    assert cache.get("a") == {"x": [1]}
+
+
+def test_values_are_stored_as_json():
+    cache = KvCache(default_ttl=None)
+    now = datetime.now(timezone.utc)
+    cache.write("a", {"t": now})
+    assert cache.get("a") == {"t": now.isoformat()}
+
+
+def test_cached_absence_raises_key_error():
+    cache = KvCache(default_ttl=None)
+    cache.put_missing("a")
+    with pytest.raises(KeyError):
+        cache.get("a")
+
+
+def test_ttl_expiry_and_per_key_override():
+    cache = KvCache(default_ttl=-1)
+    cache.set_ttl("forever", None)
+    cache.set_ttl("never", 0)
+    cache.put("a", 1)
+    cache.put("forever", 2)
+    cache.put("never", 3)
+    assert cache.get("a") is MISS
+    assert cache.get("forever") == 2
+    assert cache.get("never") is MISS
+
+
+def test_stale_read_through_does_not_overwrite_write():
+    cache = KvCache(default_ttl=None)
+    version = cache.version("a")
+    cache.write("a", "new")
+    cache.put("a", "old", version)
+    assert cache.get("a") == "new"
+
+
+async def test_database_wrappers_write_through(db):
+    database.kv_cache.clear()
+    with pytest.raises(KeyError):
+        await database.get_value("foo")
+    hits = database.kv_cache.hits
+    with pytest.raises(KeyError):
+        await database.get_value("foo")
+    assert database.kv_cache.hits == hits + 1
+
+    await database.set_value("foo", "bar")
+    assert await database.get_value("foo") == "bar"
+    assert database.kv_cache.hits == hits + 2
+
+    assert await database.remove_value("foo")
+    with pytest.raises(KeyError):
+        await database.get_value("foo")
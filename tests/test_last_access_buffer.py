@@ -0,0 +1,81 @@
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+from shard_core.database.connection import db_conn
+from shard_core.database import installed_apps as db_installed_apps
+from shard_core.database import terminals as db_terminals
+from shard_core.service import last_access_buffer
+
+
+@pytest.fixture(autouse=True)
+def clean_buffer():
+    last_access_buffer._app_last_access.clear()
+    last_access_buffer._terminal_last_connection.clear()
+
+
+async def test_flush_writes_latest_timestamps_in_one_batch(db):
+    async with db_conn() as conn:
+        for name in ["foo", "bar"]:
+            await db_installed_apps.insert(
+                conn,
+                {
+                    "name": name,
+                    "installation_reason": "unknown",
+                    "status": "stopped",
+                    "last_access": None,
+                },
+            )
+        await db_terminals.insert(
+            conn, {"id": "t1", "name": "T1", "icon": "unknown", "last_connection": None}
+        )
+
+    t0 = datetime.now(timezone.utc)
+    for i in range(50):
+        last_access_buffer.record_app_access("foo", t0 + timedelta(seconds=i))
+        last_access_buffer.record_terminal_connection("t1", t0 + timedelta(seconds=i))
+    last_access_buffer.record_app_access("removed_meanwhile", t0)
+
+    await last_access_buffer.flush_last_access()
+
+    async with db_conn() as conn:
+        foo = await db_installed_apps.get_by_name(conn, "foo")
+        bar = await db_installed_apps.get_by_name(conn, "bar")
+        t1 = await db_terminals.get_by_id(conn, "t1")
+    assert foo["last_access"] == t0 + timedelta(seconds=49)
+    assert bar["last_access"] is None
+    assert t1["last_connection"] == t0 + timedelta(seconds=49)
+    assert not last_access_buffer._app_last_access
+    assert not last_access_buffer._terminal_last_connection
+
+
+async def test_failed_flush_keeps_newest_pending(mocker):
+    t0 = datetime.now(timezone.utc)
+    last_access_buffer.record_app_access("foo", t0)
+    last_access_buffer.record_app_access("bar", t0)
+
+    async def fail(*_):
+        last_access_buffer.record_app_access("bar", t0 + timedelta(seconds=1))
+        raise ConnectionError()
+
+    mocker.patch(
+        "shard_core.service.last_access_buffer.db_installed_apps.update_last_access_many",
+        fail,
+    )
+    mocker.patch("shard_core.service.last_access_buffer.db_conn", _fake_conn)
+
+    with pytest.raises(ConnectionError):
+        await last_access_buffer.flush_last_access()
+
+    assert last_access_buffer._app_last_access == {
+        "foo": t0,
+        "bar": t0 + timedelta(seconds=1),
+    }
+
+
+class _fake_conn:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *_):
+        return False
@@ -1,11 +1,14 @@
+import asyncio
 import errno
 import logging
+import os
+import select
 from pathlib import Path
 from unittest.mock import AsyncMock, patch
 
 import pytest
 
-from shard_core.service import memory_pressure
+from shard_core.service import container_state, memory_pressure
 from shard_core.settings import settings
 
 
@@ -44,10 +47,32 @@ def test_read_memory_pressure_malformed_returns_zero(tmp_path, monkeypatch):
 
 @pytest.fixture
 def fake_cgroup_root(tmp_path, monkeypatch):
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text("MemAvailable:  1048576 kB\nSwapFree:  4194304 kB\n")
+    monkeypatch.setattr(memory_pressure, "MEMINFO_PATH", meminfo)
+    monkeypatch.setattr(memory_pressure, "PSI_PATH", tmp_path / "no-psi")
     monkeypatch.setattr(memory_pressure, "CGROUP_ROOT", tmp_path)
     return tmp_path
 
 
+@pytest.fixture
+def reclaiming_kernel(monkeypatch):
+    """memory.reclaim writes free the requested bytes and are recorded."""
+    writes = []
+    write_text = Path.write_text
+
+    def reclaim(self, data, *args, **kwargs):
+        if self.name == "memory.reclaim" and data:
+            writes.append(int(data))
+            current = self.parent / "memory.current"
+            freed = int(current.read_text()) - int(data)
+            return write_text(current, f"{max(0, freed)}\n")
+        return write_text(self, data, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "write_text", reclaim)
+    return writes
+
+
 def _make_cgroup(root, relative: str, memory_current: int):
     cgroup = root / relative
     cgroup.mkdir(parents=True)
@@ -56,12 +81,50 @@ def _make_cgroup(root, relative: str, memory_current: int):
     return cgroup
 
 
-def test_reclaim_container_writes_rss_systemd_driver(fake_cgroup_root):
-    cgroup = _make_cgroup(
-        fake_cgroup_root, "system.slice/docker-abc123.scope", 104857600
-    )
-    memory_pressure._reclaim_container("abc123")
-    assert (cgroup / "memory.reclaim").read_text() == "104857600\n"
+def test_reclaim_container_reclaims_rss_in_chunks_systemd_driver(
+    fake_cgroup_root, reclaiming_kernel
+):
+    mib = 2**20
+    _make_cgroup(fake_cgroup_root, "system.slice/docker-abc123.scope", 100 * mib)
+
+    reclaimed = memory_pressure._reclaim_container("abc123")
+
+    assert reclaiming_kernel == [16 * mib] * 6 + [4 * mib]
+    assert reclaimed == 100 * mib
+
+
+def test_reclaim_chunks_grow_with_pressure_and_shrink_with_swap(
+    fake_cgroup_root, monkeypatch
+):
+    mib = 2**20
+    psi_file = fake_cgroup_root / "psi"
+    psi_file.write_text("some avg10=20.00 avg60=5.00 avg300=1.00 total=1\n")
+    monkeypatch.setattr(memory_pressure, "PSI_PATH", psi_file)
+    assert memory_pressure._reclaim_chunk_size() == 256 * mib
+
+    (fake_cgroup_root / "meminfo").write_text("SwapFree:  131072 kB\n")
+    assert memory_pressure._reclaim_chunk_size() == 32 * mib
+
+
+def test_reclaim_container_stops_without_swap_headroom(
+    fake_cgroup_root, reclaiming_kernel
+):
+    _make_cgroup(fake_cgroup_root, "docker/abc123", 100 * 2**20)
+    (fake_cgroup_root / "meminfo").write_text("SwapFree:  4096 kB\n")
+
+    assert memory_pressure._reclaim_container("abc123") == 0
+    assert reclaiming_kernel == []
+
+
+def test_reclaim_container_stops_at_deadline_or_relief(
+    fake_cgroup_root, reclaiming_kernel
+):
+    _make_cgroup(fake_cgroup_root, "docker/abc123", 100 * 2**20)
+
+    assert memory_pressure._reclaim_container("abc123", deadline=0) == 0
+    # PSI reads 0, below the 10.0 that the reclaim was started over
+    assert memory_pressure._reclaim_container("abc123", relieved_below=10.0) == 0
+    assert reclaiming_kernel == []
 
 
 def test_reclaim_container_writes_rss_cgroupfs_driver(fake_cgroup_root):
@@ -116,13 +179,169 @@ def test_reclaim_container_other_oserror_warns(fake_cgroup_root, caplog, monkeyp
     )
 
 
-async def test_reclaim_compose_stack_reclaims_each_container(fake_cgroup_root):
-    cgroup_a = _make_cgroup(fake_cgroup_root, "docker/aaa", 100)
-    cgroup_b = _make_cgroup(fake_cgroup_root, "docker/bbb", 200)
+async def test_reclaim_compose_stack_reclaims_each_container(
+    fake_cgroup_root, reclaiming_kernel, monkeypatch
+):
+    monkeypatch.setattr(memory_pressure.pause_metrics, "reclaimed_bytes", {})
+    _make_cgroup(fake_cgroup_root, "docker/aaa", 100)
+    _make_cgroup(fake_cgroup_root, "docker/bbb", 200)
     _make_app_compose_file("someapp")
     with patch.object(
         memory_pressure, "subprocess", new=AsyncMock(return_value="aaa\nbbb\n\n")
     ):
         await memory_pressure.reclaim_compose_stack("someapp")
-    assert (cgroup_a / "memory.reclaim").read_text() == "100\n"
-    assert (cgroup_b / "memory.reclaim").read_text() == "200\n"
+    assert sorted(reclaiming_kernel) == [100, 200]
+    assert memory_pressure.pause_metrics.reclaimed_bytes == {"someapp": 300}
+
+
+def test_read_stack_memory_sums_container_cgroups(fake_cgroup_root, monkeypatch):
+    monkeypatch.setattr(container_state, "_live", True)
+    monkeypatch.setattr(
+        container_state,
+        "_projects",
+        {
+            "someapp": {
+                "aaa": container_state.ContainerInfo("someapp-web", "paused"),
+                "bbb": container_state.ContainerInfo("someapp-db", "running"),
+                "ccc": container_state.ContainerInfo("someapp-init", "exited"),
+            }
+        },
+    )
+    for container_id, current, anon, swap in [
+        ("aaa", 100, 60, 1000),
+        ("bbb", 200, 150, 0),
+    ]:
+        cgroup = _make_cgroup(fake_cgroup_root, f"docker/{container_id}", current)
+        (cgroup / "memory.stat").write_text(f"anon {anon}\nfile 40\n")
+        (cgroup / "memory.swap.current").write_text(f"{swap}\n")
+
+    usage = memory_pressure.read_stack_memory("someapp")
+
+    assert usage == memory_pressure.StackMemory(current=300, anon=210, swap=1000)
+    monkeypatch.setattr(container_state, "_live", False)
+    assert memory_pressure.read_stack_memory("someapp") is None
+
+
+def test_psi_trigger_is_written_to_pressure_file(tmp_path, monkeypatch):
+    psi_file = tmp_path / "memory"
+    psi_file.write_text(PSI_SAMPLE)
+    monkeypatch.setattr(memory_pressure, "PSI_PATH", psi_file)
+
+    os.close(memory_pressure.open_psi_trigger(10.0))
+
+    assert psi_file.read_bytes().startswith(b"some 200000 2000000\0")
+
+
+@pytest.fixture
+def psi_eventfd(monkeypatch):
+    """An eventfd in place of the PSI trigger; writing to it reports a stall."""
+    efd = os.eventfd(0, os.EFD_NONBLOCK)
+    monkeypatch.setattr(memory_pressure, "open_psi_trigger", lambda _: os.dup(efd))
+    monkeypatch.setattr(
+        memory_pressure, "PSI_TRIGGER_EVENTS", select.EPOLLIN | select.EPOLLET
+    )
+    monkeypatch.setattr(memory_pressure, "PSI_TRIGGER_WINDOW_US", 50_000)
+    yield efd
+    os.close(efd)
+
+
+async def _run_monitor(on_pressure) -> memory_pressure.PsiMonitor:
+    monitor = memory_pressure.PsiMonitor(on_pressure)
+    monitor.start()
+    await asyncio.sleep(0.01)
+    assert monitor.is_active
+    return monitor
+
+
+async def test_psi_monitor_demotes_once_when_pressure_recovers(psi_eventfd):
+    on_pressure = AsyncMock(return_value=True)
+    monitor = await _run_monitor(on_pressure)
+
+    os.eventfd_write(psi_eventfd, 1)
+    await asyncio.sleep(0.2)
+
+    monitor.stop()
+    await monitor.wait()
+    assert on_pressure.await_count == 1
+    assert not monitor.is_active
+
+
+async def test_psi_monitor_demotes_again_while_stalls_continue(psi_eventfd):
+    async def demote_without_relief():
+        if on_pressure.await_count < 3:
+            os.eventfd_write(psi_eventfd, 1)
+        return True
+
+    on_pressure = AsyncMock(side_effect=demote_without_relief)
+    monitor = await _run_monitor(on_pressure)
+
+    os.eventfd_write(psi_eventfd, 1)
+    await asyncio.sleep(0.4)
+
+    monitor.stop()
+    await monitor.wait()
+    assert on_pressure.await_count == 3
+    assert monitor.demotions == 3
+
+
+async def test_psi_monitor_is_inactive_without_trigger(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_pressure, "PSI_PATH", tmp_path / "does-not-exist")
+    monitor = memory_pressure.PsiMonitor(AsyncMock())
+
+    monitor.start()
+    await monitor.wait()
+
+    assert not monitor.is_active
+
+
+MAPS_SAMPLE = """\
+55d0c0000000-55d0c0001000 r-xp 00000000 08:01 1234 /usr/bin/app
+55d0c0200000-55d0c0204000 rw-p 00000000 00:00 0 [heap]
+7f0000000000-7f0000100000 rw-p 00000000 00:00 0
+7f0000200000-7f0000201000 rw-s 00000000 00:05 99 /dev/shm/x
+7f0000300000-7f0000302000 rw-p 00002000 08:01 1234 /usr/lib/libc.so
+7ffd00000000-7ffd00021000 rw-p 00000000 00:00 0 [stack]
+"""
+
+
+def test_anon_regions_are_private_writable_anonymous_mappings():
+    assert memory_pressure._anon_regions(MAPS_SAMPLE, 2**40) == [
+        (0x55D0C0200000, 0x4000),
+        (0x7F0000000000, 0x100000),
+        (0x7FFD00000000, 0x21000),
+    ]
+    assert memory_pressure._anon_regions(MAPS_SAMPLE, 0x5000) == [
+        (0x55D0C0200000, 0x4000),
+        (0x7F0000000000, 0x1000),
+    ]
+
+
+@pytest.fixture
+def own_process_as_app(fake_cgroup_root, monkeypatch):
+    """An app whose one container holds this test process, with 64 MiB swapped."""
+    cgroup = _make_cgroup(fake_cgroup_root, "docker/self", 2**20)
+    (cgroup / "cgroup.procs").write_text(f"0\n{os.getpid()}\n")
+    (cgroup / "memory.swap.current").write_text(f"{64 * 2**20}\n")
+    monkeypatch.setattr(container_state, "_live", True)
+    monkeypatch.setattr(
+        container_state,
+        "_projects",
+        {"someapp": {"self": container_state.ContainerInfo("someapp", "running")}},
+    )
+    return fake_cgroup_root
+
+
+async def test_prefetch_advises_the_stack_up_to_its_swap(own_process_as_app):
+    advised = await memory_pressure.prefetch_compose_stack("someapp")
+    assert 0 < advised <= 64 * 2**20
+
+
+async def test_prefetch_is_bounded_by_pressure_and_free_memory(
+    own_process_as_app, monkeypatch
+):
+    (own_process_as_app / "meminfo").write_text("MemAvailable:  200000 kB\n")
+    assert await memory_pressure.prefetch_compose_stack("someapp") == 0
+
+    monkeypatch.setattr(memory_pressure, "read_memory_pressure", lambda: 50.0)
+    (own_process_as_app / "meminfo").write_text("MemAvailable:  8388608 kB\n")
+    assert await memory_pressure.prefetch_compose_stack("someapp") == 0
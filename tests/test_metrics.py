@@ -0,0 +1,104 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from shard_core.app_factory import create_app
+from shard_core.util.metrics import (
+    CONTENT_TYPE,
+    Counter,
+    Gauge,
+    Registry,
+    Summary,
+    registry,
+)
+
+
+def test_registry_renders_text_format():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests.", ["router"])
+    requests.inc(router="public")
+    requests.inc(2, router='a "b"')
+    latency = registry.summary("latency_seconds", "Latency.", divisor=1000)
+    for milliseconds in (100, 300):
+        latency.observe(milliseconds)
+
+    @registry.register_collector
+    def collect():
+        gauge = Gauge("queue_length", "Queue\nlength.")
+        gauge.set(3)
+        return [gauge]
+
+    assert registry.render() == (
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{router="public"} 1\n'
+        'requests_total{router="a \\"b\\""} 2\n'
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds summary\n"
+        'latency_seconds{quantile="0.5"} 0.1\n'
+        'latency_seconds{quantile="0.95"} 0.3\n'
+        'latency_seconds{quantile="0.99"} 0.3\n'
+        "latency_seconds_sum 0.4\n"
+        "latency_seconds_count 2\n"
+        "# HELP queue_length Queue\\nlength.\n"
+        "# TYPE queue_length gauge\n"
+        "queue_length 3\n"
+    )
+
+
+def test_summary_resolves_sub_millisecond_values():
+    registry = Registry()
+    latency = registry.summary("latency_seconds", "Latency.", min_value=1e-6)
+    for seconds in [0.0002] * 90 + [0.0009] * 9 + [0.05]:
+        latency.observe(seconds)
+
+    rendered = dict(
+        line.rsplit(" ", 1)
+        for line in registry.render().splitlines()
+        if not line.startswith("#")
+    )
+    assert float(rendered['latency_seconds{quantile="0.5"}']) == pytest.approx(
+        0.0002, rel=0.01
+    )
+    assert float(rendered['latency_seconds{quantile="0.95"}']) == pytest.approx(
+        0.0009, rel=0.01
+    )
+    assert float(rendered['latency_seconds{quantile="0.99"}']) == pytest.approx(
+        0.0009, rel=0.01
+    )
+
+
+def test_metrics_check_their_labels():
+    registry = Registry()
+    counter = registry.counter("c_total", "C.", ["a"])
+    with pytest.raises(ValueError):
+        counter.inc(b="x")
+    with pytest.raises(ValueError):
+        counter.inc(-1, a="x")
+    with pytest.raises(ValueError):
+        registry.register(Counter("c_total", "C again."))
+    assert "nan" not in Summary("s", "S.").render().lower()
+
+
+async def test_metrics_endpoint_counts_requests():
+    app = create_app()
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://shard_core"
+    ) as client:
+        await client.get("/public/health")
+        response = await client.get("/internal/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+    assert 'shard_core_http_requests_total{router="public",status="200"}' in (
+        response.text
+    )
+    assert "shard_core_websocket_connections 0" in response.text
+    assert "# TYPE shard_core_app_transitions_total counter" in response.text
+
+
+def test_psi_snapshots_are_exported():
+    from shard_core.service import pause_metrics
+
+    pause_metrics.record_psi_snapshot(12.5)
+
+    assert "shard_core_memory_psi_some_avg10_count" in registry.render()
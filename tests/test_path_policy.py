@@ -0,0 +1,88 @@
+from shard_core.data_model.app_meta import Access, Path
+from shard_core.data_model.auth import AuthState
+from shard_core.data_model.identity import SafeIdentity
+from shard_core.service.path_policy import CompiledPath, PathPolicy
+
+
+def _policy() -> PathPolicy:
+    return PathPolicy(
+        {
+            "": Path(access=Access.PRIVATE),
+            "/pub": Path(access=Access.PUBLIC),
+            "/public": Path(access=Access.PUBLIC, headers={"X-Ptl-Foo": "baz"}),
+            "/peer": Path(access=Access.PEER),
+        }
+    )
+
+
+def test_longest_prefix_wins():
+    policy = _policy()
+    assert policy.match("/public/index.html").headers == {"X-Ptl-Foo": "baz"}
+    assert policy.match("/pub/index.html").access == Access.PUBLIC
+    assert policy.match("/pub").access == Access.PUBLIC
+    assert policy.match("/peer/x").access == Access.PEER
+
+
+def test_empty_prefix_is_fallback():
+    policy = _policy()
+    assert policy.match("/private").access == Access.PRIVATE
+    assert policy.match("").access == Access.PRIVATE
+
+
+def test_uri_shorter_than_prefix():
+    policy = _policy()
+    assert policy.match("/pu").access == Access.PRIVATE
+
+
+def test_no_match():
+    policy = PathPolicy({"/api": Path(access=Access.PUBLIC)})
+    assert policy.match("/other") is None
+
+
+def _portal() -> SafeIdentity:
+    return SafeIdentity(
+        domain="abcdef.freeshard.cloud", id="abcdefgh", public_key_pem=""
+    )
+
+
+def test_render_headers():
+    compiled = CompiledPath(
+        Path(
+            access=Access.PUBLIC,
+            headers={
+                "X-Ptl-Client-Type": "{{ auth.client_type }}",
+                "X-Ptl-Client-Name": "{{ auth.client_name }}",
+                "X-Ptl-ID": "{{ portal.id }}",
+                "X-Ptl-Foo": "bar",
+            },
+        )
+    )
+    terminal = AuthState(
+        x_ptl_client_type=AuthState.ClientType.TERMINAL,
+        x_ptl_client_id="t1",
+        x_ptl_client_name="T1",
+    )
+    anonymous = AuthState(x_ptl_client_type=AuthState.ClientType.ANONYMOUS)
+
+    assert compiled.render_headers(terminal, _portal()) == {
+        "X-Ptl-Client-Type": "terminal",
+        "X-Ptl-Client-Name": "T1",
+        "X-Ptl-ID": "abcdefgh",
+        "X-Ptl-Foo": "bar",
+    }
+    assert compiled.render_headers(anonymous, _portal())["X-Ptl-Client-Name"] == ""
+    assert compiled.render_headers(terminal, _portal())["X-Ptl-Client-Name"] == "T1"
+
+
+def test_render_headers_is_sandboxed():
+    compiled = CompiledPath(
+        Path(access=Access.PUBLIC, headers={"X-Bad": "{{ portal.__class__ }}"})
+    )
+    anonymous = AuthState(x_ptl_client_type=AuthState.ClientType.ANONYMOUS)
+    assert compiled.render_headers(anonymous, _portal()) == {"X-Bad": ""}
+
+
+def test_no_headers():
+    compiled = CompiledPath(Path(access=Access.PUBLIC))
+    anonymous = AuthState(x_ptl_client_type=AuthState.ClientType.ANONYMOUS)
+    assert compiled.render_headers(anonymous, _portal()) == {}
@@ -0,0 +1,56 @@
+import pytest
+
+from shard_core.database.connection import db_conn
+from shard_core.database import peers as db_peers
+from shard_core.data_model.identity import Identity
+from shard_core.service import peer_registry
+from shard_core.util import signals
+
+
+@pytest.fixture(autouse=True)
+async def clean_registry():
+    await peer_registry._invalidate_peer_registry(None)
+
+
+async def _insert_peer(identity: Identity, public_bytes_b64=None):
+    async with db_conn() as conn:
+        await db_peers.insert(
+            conn,
+            {
+                "id": identity.id,
+                "name": identity.name,
+                "public_bytes_b64": public_bytes_b64 or identity.public_key_pem,
+                "is_reachable": True,
+            },
+        )
+
+
+async def test_registry_holds_parsed_keys(db):
+    identity = Identity.create("peer")
+    await _insert_peer(identity)
+
+    entries = await peer_registry.get_peer_entries()
+    entry = entries[identity.short_id]
+    assert entry.peer.id == identity.id
+    assert entry.public_key.public_numbers() == identity.public_key.key.public_numbers()
+    assert await peer_registry.get_peer_entries() is entries
+
+
+async def test_registry_is_reloaded_on_peers_update(db):
+    entries = await peer_registry.get_peer_entries()
+    assert entries == {}
+
+    identity = Identity.create("peer")
+    await _insert_peer(identity)
+    assert await peer_registry.get_peer_entries() is entries
+
+    await signals.on_peers_update.send_async()
+    assert identity.short_id in await peer_registry.get_peer_entries()
+
+
+async def test_peer_with_mismatching_key_is_ignored(db):
+    identity = Identity.create("peer")
+    other = Identity.create("other")
+    await _insert_peer(identity, public_bytes_b64=other.public_key_pem)
+
+    assert await peer_registry.get_peer_entries() == {}
@@ -0,0 +1,179 @@
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from shard_core.data_model.app_meta import AppMeta, InstalledApp, Lifecycle, Status
+from shard_core.service import app_lifecycle, prewarm
+from tests.conftest import settings_override
+
+PREWARM_ON = {"apps": {"lifecycle": {"prewarm_enabled": True}}}
+WEEK = 7 * 86400
+
+
+def _meta(name: str) -> AppMeta:
+    return AppMeta(
+        v="1.3",
+        app_version="1.0.0",
+        name=name,
+        pretty_name=name,
+        icon="icon.svg",
+        entrypoints=[],
+        paths={},
+        lifecycle=Lifecycle(),
+    )
+
+
+def _weekly_habit(now: float, weeks: int) -> prewarm.AccessHistogram:
+    """Accessed every week in the hour that starts PREWARM_LEAD from now."""
+    histogram = prewarm.AccessHistogram(first_seen=now - weeks * WEEK)
+    for week in range(weeks, 0, -1):
+        histogram.record(now + prewarm.PREWARM_LEAD - week * WEEK)
+    return histogram
+
+
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch):
+    monkeypatch.setattr(prewarm, "_histograms", {})
+    monkeypatch.setattr(prewarm, "_pending", {})
+    monkeypatch.setattr(prewarm, "_prewarmed_slot", {})
+    monkeypatch.setattr(prewarm, "_stats", prewarm.PrewarmStats())
+    monkeypatch.setattr(prewarm, "_save_histograms", AsyncMock())
+    monkeypatch.setattr(app_lifecycle, "keep_alive_until", {})
+
+
+@pytest.fixture
+def prewarm_mocks():
+    with (
+        settings_override(PREWARM_ON),
+        patch.object(prewarm, "start_app", new=AsyncMock()) as start,
+        patch.object(prewarm, "get_app_metadata", side_effect=_meta),
+        patch.object(prewarm, "size_is_compatible", new=AsyncMock(return_value=True)),
+        patch.object(
+            prewarm.disk,
+            "current_disk_usage",
+            prewarm.disk.DiskUsage(total_gb=10, free_gb=9, disk_space_low=False),
+        ),
+        patch.object(
+            prewarm,
+            "_get_installed_apps",
+            new=AsyncMock(
+                return_value={
+                    "a": {"name": "a", "status": Status.STOPPED},
+                    "b": {"name": "b", "status": Status.RUNNING},
+                    "c": {"name": "c", "status": Status.PAUSED},
+                }
+            ),
+        ),
+        patch.object(prewarm.memory_pressure, "read_memory_pressure", return_value=0),
+        patch.object(
+            prewarm.memory_pressure, "read_mem_available_kib", return_value=2**21
+        ),
+    ):
+        yield start
+
+
+def test_probability_from_access_history():
+    now = time.time()
+    histogram = _weekly_habit(now, weeks=3)
+    target = now + prewarm.PREWARM_LEAD
+
+    assert histogram.probability(target, now) == pytest.approx(1.0)
+    assert histogram.probability(target + 6 * 3600, now) == 0.0
+
+    # repeated accesses within the same hour count once
+    assert not histogram.record(now + prewarm.PREWARM_LEAD - WEEK)
+
+    young = prewarm.AccessHistogram(first_seen=now - 86400)
+    young.record(target - 86400)
+    assert young.probability(target, now) == 0.0
+
+
+async def test_likely_app_is_prewarmed_once_per_slot(prewarm_mocks):
+    now = time.time()
+    prewarm._histograms.update(
+        a=_weekly_habit(now, weeks=3), b=_weekly_habit(now, weeks=3)
+    )
+
+    await prewarm.prewarm_apps()
+    await prewarm.prewarm_apps()
+
+    prewarm_mocks.assert_awaited_once_with("a")
+    assert prewarm.get_stats()["prewarms"] == 1
+
+
+async def test_failed_prewarm_does_not_stop_the_others(prewarm_mocks):
+    now = time.time()
+    prewarm._histograms.update(
+        a=_weekly_habit(now, weeks=3), c=_weekly_habit(now, weeks=3)
+    )
+    prewarm_mocks.side_effect = [RuntimeError("compose failed"), None]
+
+    await prewarm.prewarm_apps()
+
+    assert [c.args[0] for c in prewarm_mocks.await_args_list] == ["a", "c"]
+    assert "a" not in prewarm._prewarmed_slot
+    assert "a" not in app_lifecycle.keep_alive_until
+    assert "c" in app_lifecycle.keep_alive_until
+    assert prewarm.get_stats()["prewarms"] == 1
+
+
+async def test_no_prewarm_without_headroom(prewarm_mocks):
+    prewarm._histograms["a"] = _weekly_habit(time.time(), weeks=3)
+
+    with patch.object(
+        prewarm.memory_pressure, "read_mem_available_kib", return_value=1024
+    ):
+        await prewarm.prewarm_apps()
+    with patch.object(prewarm.memory_pressure, "read_memory_pressure", return_value=50):
+        await prewarm.prewarm_apps()
+
+    prewarm_mocks.assert_not_awaited()
+
+
+async def test_hits_and_wasted_prewarms_are_counted():
+    now = time.time()
+    prewarm._pending.update(a=now, b=now - prewarm.PREWARM_HIT_WINDOW - 1)
+
+    await prewarm.record_access(InstalledApp(name="a", status=Status.RUNNING))
+    with settings_override(PREWARM_ON):
+        with patch.object(
+            prewarm.disk,
+            "current_disk_usage",
+            prewarm.disk.DiskUsage(total_gb=10, free_gb=0, disk_space_low=True),
+        ):
+            await prewarm.prewarm_apps()
+
+    stats = prewarm.get_stats()
+    assert (stats["hits"], stats["wasted"], stats["pending"]) == (1, 1, 0)
+    assert stats["hit_rate"] == 0.5
+    assert prewarm._histograms["a"].last_hour == int(time.time() // 3600)
+
+
+async def test_prewarmed_app_is_not_paused_before_the_predicted_hour(prewarm_mocks):
+    now = time.time()
+    prewarm._histograms["c"] = _weekly_habit(now, weeks=3)
+    app_lifecycle.last_access_dict["c"] = now - 86400
+
+    await prewarm.prewarm_apps()
+
+    prewarm_mocks.assert_awaited_once_with("c")
+    target = now + prewarm.PREWARM_LEAD
+    running = InstalledApp(name="c", status=Status.RUNNING)
+    with (
+        settings_override({"apps": {"lifecycle": {"pause_enabled": True}}}),
+        patch.object(app_lifecycle, "get_app_metadata", side_effect=_meta),
+        patch.object(app_lifecycle, "docker_pause_app", new=AsyncMock()) as pause,
+        patch.object(
+            app_lifecycle.disk,
+            "current_disk_usage",
+            prewarm.disk.DiskUsage(total_gb=10, free_gb=9, disk_space_low=False),
+        ),
+    ):
+        assert app_lifecycle._next_deadline(running, _meta("c"), True) > target
+        await app_lifecycle._control_app_time(running, True)
+        pause.assert_not_awaited()
+
+        app_lifecycle.keep_alive_until["c"] = time.time() - 1
+        await app_lifecycle._control_app_time(running, True)
+        pause.assert_awaited_once_with("c")
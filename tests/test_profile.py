@@ -1,3 +1,5 @@
+import asyncio
+import json
 from datetime import datetime, timezone
 
 from httpx import AsyncClient
@@ -7,7 +9,9 @@ from shard_core.data_model.backend.shard_model import (
     ShardSubscriptionSummary,
 )
 from shard_core.data_model.backend.subscription_model import SubscriptionStatus
+from shard_core.data_model import profile as profile_module
 from shard_core.data_model.profile import Profile
+from shard_core.service import portal_controller
 from tests import conftest
 
 
@@ -75,3 +79,70 @@ async def test_profile_includes_volume_size_gb(requests_mock, app_client: AsyncC
     profile = Profile.model_validate(response.json())
     assert profile.volume_size_gb == conftest.mock_shard.volume_size_gb
     assert profile.volume_size_gb == 30
+
+
+class _SlowController:
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, path, method="GET", body=None):
+        self.calls += 1
+        await self.release.wait()
+        return _ShardResponse()
+
+
+class _ShardResponse:
+    status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(conftest._shard_self_response_body(conftest.mock_shard))
+
+
+async def test_concurrent_refreshes_are_coalesced(db, mocker):
+    controller = _SlowController()
+    mocker.patch.object(portal_controller, "_call_freeshard_controller", controller)
+
+    refreshes = [
+        asyncio.create_task(portal_controller.refresh_profile()) for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    controller.release.set()
+    profiles = await asyncio.gather(*refreshes)
+
+    assert controller.calls == 1
+    assert all(p == Profile.from_shard(conftest.mock_shard) for p in profiles)
+
+
+async def test_stale_profile_is_served_while_refreshing(db, mocker):
+    stale = Profile.from_shard(conftest.mock_shard).model_copy(
+        update={"owner": "stale"}
+    )
+    await profile_module.set_profile(stale)
+    controller = _SlowController()
+    mocker.patch.object(portal_controller, "_call_freeshard_controller", controller)
+
+    assert await portal_controller.get_profile() == stale
+    assert controller.calls == 0
+
+    mocker.patch.object(portal_controller, "PROFILE_MAX_AGE", -1)
+    assert await portal_controller.get_profile() == stale
+    await asyncio.sleep(0)
+    assert controller.calls == 1
+
+    controller.release.set()
+    await portal_controller.refresh_profile()
+    assert controller.calls == 1
+    assert (await portal_controller.get_profile()).owner != "stale"
+
+
+async def test_profile_is_read_from_memory(db, mocker):
+    expected = Profile.from_shard(conftest.mock_shard)
+    await profile_module.set_profile(expected)
+    get_value = mocker.patch.object(profile_module, "get_value")
+
+    assert (await profile_module.get_profile()).vm_size == expected.vm_size
+    get_value.assert_not_called()
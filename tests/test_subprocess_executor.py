@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from shard_core.util import subprocess as subprocess_module
+from shard_core.util.subprocess import (
+    Priority,
+    SubprocessExecutor,
+    SubprocessTimeout,
+    priority,
+)
+
+
+@pytest.fixture
+def fake_commands(monkeypatch):
+    """Commands that finish when their event is set, recording the start order."""
+    started: list[str] = []
+    done: dict[str, asyncio.Event] = {}
+
+    async def run(args, cwd, timeout):
+        name = args[0]
+        started.append(name)
+        done[name] = asyncio.Event()
+        await done[name].wait()
+        return name
+
+    monkeypatch.setattr(subprocess_module, "_run", run)
+    return started, done
+
+
+async def _finish(done: dict[str, asyncio.Event], name: str):
+    done[name].set()
+    await asyncio.sleep(0.01)
+
+
+async def test_queued_commands_run_by_priority(fake_commands):
+    started, done = fake_commands
+    executor = SubprocessExecutor(max_concurrency=1)
+
+    async def submit(name: str, p: Priority):
+        with priority(p):
+            return await executor.run(name)
+
+    tasks = [asyncio.create_task(submit("first", Priority.CONTROL))]
+    await asyncio.sleep(0.01)
+    for name, p in [
+        ("prune", Priority.MAINTENANCE),
+        ("tick", Priority.CONTROL),
+        ("wake", Priority.WAKE),
+    ]:
+        tasks.append(asyncio.create_task(submit(name, p)))
+    await asyncio.sleep(0.01)
+    assert started == ["first"]
+    assert executor.queued == 3
+
+    for name in ["first", "wake", "tick", "prune"]:
+        await _finish(done, name)
+    assert await asyncio.gather(*tasks) == ["first", "prune", "tick", "wake"]
+    assert started == ["first", "wake", "tick", "prune"]
+    assert executor.stats[Priority.CONTROL].commands == 2
+    assert executor.stats[Priority.MAINTENANCE].queue_wait.max > 0
+
+
+async def test_concurrency_is_bounded_and_cancelled_waiters_are_skipped(
+    fake_commands,
+):
+    started, done = fake_commands
+    executor = SubprocessExecutor(max_concurrency=2)
+
+    tasks = {name: asyncio.create_task(executor.run(name)) for name in "abcd"}
+    await asyncio.sleep(0.01)
+    assert started == ["a", "b"]
+
+    tasks["c"].cancel()
+    await _finish(done, "a")
+    assert started == ["a", "b", "d"]
+
+    await _finish(done, "b")
+    await _finish(done, "d")
+    assert executor.running == 0
+
+
+async def test_command_is_killed_after_timeout():
+    executor = SubprocessExecutor(timeout=0.1)
+
+    with pytest.raises(SubprocessTimeout):
+        await executor.run("sleep", "5")
+
+    assert executor.stats[Priority.CONTROL].timeouts == 1
+    assert executor.running == 0
+
+
+async def test_commands_that_pull_images_get_the_pull_timeout(monkeypatch):
+    timeouts = []
+
+    async def run(args, cwd, timeout):
+        timeouts.append(timeout)
+        return ""
+
+    monkeypatch.setattr(subprocess_module, "_run", run)
+    executor = SubprocessExecutor(timeout=600, pull_timeout=None)
+
+    await executor.run("docker", "compose", "ps")
+    await executor.run("docker", "compose", "up", "-d", pulls_images=True)
+    executor.configure(3, 600, 3600)
+    await executor.run("docker", "compose", "up", "-d", pulls_images=True)
+
+    assert timeouts == [600, None, 3600]
+
+
+async def test_shutdown_commands_are_not_limited(fake_commands):
+    started, done = fake_commands
+    executor = SubprocessExecutor(max_concurrency=1)
+
+    async def submit(name: str, p: Priority):
+        with priority(p):
+            return await executor.run(name)
+
+    tasks = [asyncio.create_task(submit("tick", Priority.CONTROL))]
+    await asyncio.sleep(0.01)
+    tasks.append(asyncio.create_task(submit("prune", Priority.MAINTENANCE)))
+    tasks += [asyncio.create_task(submit(n, Priority.SHUTDOWN)) for n in "abc"]
+    await asyncio.sleep(0.01)
+    assert started == ["tick", "a", "b", "c"]
+
+    # the queued command gets a slot only once the limit is kept again
+    for name in ["tick", "a", "b"]:
+        await _finish(done, name)
+    assert "prune" not in started
+    await _finish(done, "c")
+    assert started[-1] == "prune"
+    await _finish(done, "prune")
+    await asyncio.gather(*tasks)
+    assert executor.running == 0
@@ -1,5 +1,7 @@
 import json
 
+import pytest
+
 from shard_core.data_model.backend.telemetry_model import Telemetry
 from shard_core.service import telemetry
 from unittest.mock import AsyncMock, patch
@@ -75,13 +77,16 @@ async def test_telemetry_pause_tier_roundtrip(
     assert tel.pause_tier is not None
     assert tel.pause_tier.transitions["immich"]["running_to_paused"] == 2
     assert tel.pause_tier.transitions["immich"]["paused_to_running"] == 1
-    assert tel.pause_tier.pause_latency_ms_p50 in (100.0, 300.0)
+    assert tel.pause_tier.pause_latency_ms_p50 in (
+        pytest.approx(100.0, rel=0.01),
+        pytest.approx(300.0, rel=0.01),
+    )
     assert tel.pause_tier.unpause_latency_ms_p50 == 50.0
     assert tel.pause_tier.psi_some_avg10_snapshots == [2.5, 11.0]
 
     # accumulators reset after a successful send
     assert pause_metrics.app_transitions == {}
-    assert pause_metrics.pause_latencies_ms == []
+    assert pause_metrics.pause_latencies_ms.count == 0
     assert pause_metrics.psi_snapshots == []
 
 
@@ -98,13 +103,3 @@ async def test_telemetry_without_pause_activity_omits_pause_tier(
     body = mock_call_freeshard_controller.await_args_list[0].kwargs["body"]
     tel = Telemetry.model_validate(json.loads(body.decode()))
     assert tel.pause_tier is None
-
-
-def test_percentile_rejects_out_of_range_fraction():
-    import pytest
-
-    with pytest.raises(ValueError):
-        telemetry._percentile([1.0, 2.0], 95)
-    with pytest.raises(ValueError):
-        telemetry._percentile([1.0, 2.0], -0.1)
-    assert telemetry._percentile([1.0, 2.0, 3.0], 0.5) == 2.0
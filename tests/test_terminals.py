@@ -7,6 +7,7 @@ from shard_core.data_model.backend.shard_model import ShardDb
 from shard_core.database.connection import db_conn
 from shard_core.database import terminals as db_terminals
 from shard_core.data_model.terminal import Terminal, Icon
+from shard_core.service import last_access_buffer
 from tests.conftest import requests_mock_context, mock_shard
 from tests.util import get_pairing_code, add_terminal, pair_new_terminal
 
@@ -81,6 +82,27 @@ async def test_pairing_happy(requests_mock, app_client: AsyncClient):
     assert response.json()["email"] == "testowner@foobar.com"
 
 
+async def test_cached_terminal_auth_follows_rename_and_delete(app_client: AsyncClient):
+    await pair_new_terminal(app_client, "T1")
+    response = await app_client.get("internal/authenticate_terminal")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["X-Ptl-Client-Name"] == "T1"
+    t_id = response.headers["X-Ptl-Client-Id"]
+
+    response = await app_client.put(
+        f"protected/terminals/id/{t_id}", json={"name": "T2", "icon": "notebook"}
+    )
+    assert response.status_code == 200
+    response = await app_client.get("internal/authenticate_terminal")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["X-Ptl-Client-Name"] == "T2"
+
+    response = await _delete_terminal(app_client, t_id)
+    assert response.status_code == 204
+    response = await app_client.get("internal/authenticate_terminal")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 async def test_pairing_two(app_client: AsyncClient):
     t1_name = "T1"
     t2_name = "T2"
@@ -247,6 +269,7 @@ async def test_last_connection(api_client: AsyncClient):
             },
         )
     ).status_code == status.HTTP_200_OK
+    await last_access_buffer.flush_last_access()
     last_connection_1 = Terminal(
         **(await api_client.get(f"protected/terminals/name/{t_name}")).json()
     ).last_connection
@@ -268,6 +291,7 @@ async def test_last_connection(api_client: AsyncClient):
             },
         )
     ).status_code == status.HTTP_200_OK
+    await last_access_buffer.flush_last_access()
     last_connection_3 = Terminal(
         **(await api_client.get(f"protected/terminals/name/{t_name}")).json()
     ).last_connection